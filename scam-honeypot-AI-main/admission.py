@@ -0,0 +1,223 @@
+import asyncio
+import collections
+import math
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from metrics import ADMISSION_QUEUED, ADMISSION_SHED, DEGRADED_TURNS
+
+# =========================================================
+# CONFIG
+# =========================================================
+# Turns handled at once per worker; the rest wait in a bounded queue.
+# 0 turns admission control off.
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "128"))
+# Longest a turn waits for a slot before it is shed with a 503.
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+# Turns one API key may have admitted or queued at once (0 = no quota),
+# with per-key overrides as "key=limit,key=limit".
+ADMISSION_KEY_LIMIT = int(os.getenv("ADMISSION_KEY_LIMIT", "0"))
+ADMISSION_KEY_LIMITS = os.getenv("ADMISSION_KEY_LIMITS", "")
+# Degraded mode: once a live LLM call has waited this long in the LLM
+# queue, turns are answered from the stall bank for at least DEGRADE_HOLD
+# seconds. 0 turns degraded mode off.
+DEGRADE_LLM_WAIT = float(os.getenv("DEGRADE_LLM_WAIT", "3"))
+DEGRADE_HOLD = float(os.getenv("DEGRADE_HOLD", "5"))
+
+
+def parse_key_limits(spec: str) -> Dict[str, int]:
+    limits = {}
+    for part in spec.split(","):
+        key, sep, limit = part.strip().rpartition("=")
+        if sep and key:
+            limits[key] = int(limit)
+    return limits
+
+
+class Overloaded(Exception):
+    """A turn was not admitted; the handler answers `status_code` with Retry-After."""
+
+    def __init__(self, reason: str, retry_after: int, status_code: int = 503):
+        super().__init__(f"Turn not admitted: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(self.retry_after)}
+
+# =========================================================
+# ADMISSION CONTROLLER
+# =========================================================
+class AdmissionTicket:
+    """An admitted turn. release() frees its slot; calling it twice is harmless."""
+
+    __slots__ = ("controller", "key", "released")
+
+    def __init__(self, controller: "AdmissionController", key: str):
+        self.controller = controller
+        self.key = key
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.controller._release(self.key)
+
+
+class AdmissionController:
+    """
+    Bounds the turns a worker works on at once, in front of everything
+    else a turn does (parsing, extraction, the LLM).
+
+    - Up to `max_in_flight` turns run; the next `max_queue` wait in FIFO
+      order for up to `queue_timeout` seconds. Past that a turn is shed
+      with 503 and Retry-After instead of joining a pile-up in which every
+      turn times out together.
+    - A key over its quota gets 429 straight away, so one caller cannot
+      take every slot.
+    - degraded() turns true while live LLM calls wait longer than
+      `degrade_wait` (read from `wait_probe`). Admitted turns then get a
+      stall reply instead of an LLM call, and still run extraction and
+      callbacks.
+
+    Used from one event loop per worker, so the counters need no lock.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+        key_limit: int = ADMISSION_KEY_LIMIT,
+        key_limits: Optional[Dict[str, int]] = None,
+        degrade_wait: float = DEGRADE_LLM_WAIT,
+        degrade_hold: float = DEGRADE_HOLD,
+        wait_probe: Optional[Callable[[], float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.key_limit = key_limit
+        self.key_limits = parse_key_limits(ADMISSION_KEY_LIMITS) if key_limits is None else key_limits
+        self.degrade_wait = degrade_wait
+        self.degrade_hold = degrade_hold
+        self.wait_probe = wait_probe
+        self.clock = clock
+        self.in_flight = 0
+        self._waiters: collections.deque = collections.deque()
+        self._per_key: Dict[str, int] = {}
+        self._degraded_until = 0.0
+        self.stats = {"admitted": 0, "queued": 0, "shed": 0, "quota": 0, "timeouts": 0,
+                      "degradedPeriods": 0, "degradedReplies": 0}
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for fut in self._waiters if not fut.done())
+
+    def retry_after(self) -> int:
+        # Roughly how long the queue in front needs to clear, at least 1s.
+        return max(1, math.ceil(self.queue_timeout or 1))
+
+    def _shed(self, reason: str, status_code: int = 503) -> Overloaded:
+        self.stats["quota" if reason == "quota" else "shed"] += 1
+        ADMISSION_SHED.labels(reason).inc()
+        return Overloaded(reason, self.retry_after(), status_code)
+
+    def _key_limit(self, key: str) -> int:
+        return self.key_limits.get(key, self.key_limit)
+
+    async def admit(self, key: str = "") -> AdmissionTicket:
+        """Waits for a slot. Raises Overloaded when the turn is shed."""
+        limit = self._key_limit(key)
+        if limit and self._per_key.get(key, 0) >= limit:
+            raise self._shed("quota", 429)
+        if self.max_in_flight <= 0 or (self.in_flight < self.max_in_flight and not self.queue_depth):
+            self.in_flight += 1
+            return self._grant(key)
+        if self.queue_depth >= self.max_queue:
+            raise self._shed("queue_full")
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        self._per_key[key] = self._per_key.get(key, 0) + 1
+        self.stats["queued"] += 1
+        ADMISSION_QUEUED.inc()
+        granted = False
+        try:
+            await asyncio.wait_for(fut, self.queue_timeout if self.queue_timeout > 0 else None)
+            granted = True
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise self._shed("queue_timeout")
+        finally:
+            self._drop_key(key)
+            if not granted:
+                if fut.done() and not fut.cancelled():
+                    self._handoff()  # handed a slot as we gave up: pass it on
+                else:
+                    fut.cancel()
+                    try:
+                        self._waiters.remove(fut)
+                    except ValueError:
+                        pass
+        # The releasing turn handed over its slot: in_flight is unchanged.
+        return self._grant(key)
+
+    def _grant(self, key: str) -> AdmissionTicket:
+        self._per_key[key] = self._per_key.get(key, 0) + 1
+        self.stats["admitted"] += 1
+        return AdmissionTicket(self, key)
+
+    def _drop_key(self, key: str):
+        left = self._per_key.get(key, 0) - 1
+        if left > 0:
+            self._per_key[key] = left
+        else:
+            self._per_key.pop(key, None)
+
+    def _release(self, key: str):
+        self._drop_key(key)
+        self._handoff()
+
+    def _handoff(self):
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.in_flight -= 1
+
+    # -----------------------------------------------------
+    # Degraded mode
+    # -----------------------------------------------------
+    def degraded(self) -> bool:
+        if self.degrade_wait <= 0 or self.wait_probe is None:
+            return False
+        now = self.clock()
+        try:
+            waited = float(self.wait_probe())
+        except Exception:
+            waited = 0.0
+        if waited >= self.degrade_wait:
+            if now >= self._degraded_until:
+                self.stats["degradedPeriods"] += 1
+                print(f"🐢 LLM queue wait {waited:.1f}s: answering from the stall bank for {self.degrade_hold:.0f}s")
+            self._degraded_until = now + self.degrade_hold
+        return now < self._degraded_until
+
+    def count_degraded(self):
+        self.stats["degradedReplies"] += 1
+        DEGRADED_TURNS.inc()
+
+    def snapshot_stats(self) -> dict:
+        return dict(
+            self.stats,
+            in_flight=self.in_flight,
+            queue_depth=self.queue_depth,
+            degraded=self.clock() < self._degraded_until,
+        )
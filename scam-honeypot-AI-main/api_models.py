@@ -0,0 +1,131 @@
+import json
+import os
+from typing import Any, Optional
+
+from fastapi import HTTPException, Request, Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional: same behaviour, slower
+    orjson = None
+
+# =========================================================
+# CONFIG
+# =========================================================
+# Largest /honey-pot-entry body accepted. A 100-turn GUVI history is
+# around 30 KB, so this leaves plenty of room.
+MAX_BODY_BYTES = int(os.getenv("MAX_BODY_BYTES", str(1024 * 1024)))
+
+DEFAULT_SESSION_ID = "guvi-session"
+DEFAULT_TEXT = "Hello"
+
+# =========================================================
+# JSON BACKEND
+# =========================================================
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+
+    def loads(data):
+        return orjson.loads(data)
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+else:
+    JSON_BACKEND = "json"
+
+    def loads(data):
+        return json.loads(data)
+
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# =========================================================
+# REQUEST
+# =========================================================
+class EntryRequest:
+    """
+    A /honey-pot-entry body, parsed leniently: anything malformed falls
+    back to defaults instead of failing the turn.
+
+    `history` is the decoded conversationHistory list, untouched. Items are
+    only converted where they are used (the context window's tail, and
+    extraction on a session's first contact), so a turn only pays for the
+    decode, and most turns need nothing but `history_len`.
+    """
+
+    __slots__ = ("session_id", "text", "history")
+
+    def __init__(self, session_id: str = DEFAULT_SESSION_ID, text: str = DEFAULT_TEXT,
+                 history: Optional[list] = None):
+        self.session_id = session_id
+        self.text = text
+        self.history = history if history is not None else []
+
+    @property
+    def history_len(self) -> int:
+        return len(self.history)
+
+    @classmethod
+    def parse(cls, raw_body: bytes) -> "EntryRequest":
+        """Never raises."""
+        try:
+            body = loads(raw_body) if raw_body else {}
+        except Exception as e:
+            print(f"Body parsing error: {e}")
+            body = {}
+        if not isinstance(body, dict):
+            body = {}
+
+        message = body.get("message", {})
+        if isinstance(message, dict):
+            text = message.get("text", "")
+        else:
+            text = str(message)  # Fallback if message is just a string
+        if not text:
+            text = DEFAULT_TEXT
+
+        history = body.get("conversationHistory")
+        if not isinstance(history, list):
+            history = []
+
+        return cls(str(body.get("sessionId", DEFAULT_SESSION_ID)), str(text), history)
+
+
+async def read_body(request: Request, limit: Optional[int] = None) -> bytes:
+    """The request body, or 413 once it passes `limit` (default MAX_BODY_BYTES; 0 = no limit)."""
+    limit = MAX_BODY_BYTES if limit is None else limit
+    if limit <= 0:
+        return await request.body()
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > limit:
+        raise HTTPException(status_code=413, detail=f"Body larger than {limit} bytes")
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise HTTPException(status_code=413, detail=f"Body larger than {limit} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+# =========================================================
+# RESPONSES
+# =========================================================
+class EntryReply(BaseModel):
+    """Documents the /honey-pot-entry response; the handler serializes it directly."""
+    status: str = "success"
+    reply: str
+
+
+class JSONBytesResponse(Response):
+    """
+    JSON response rendered straight to bytes with the fast backend,
+    skipping FastAPI's jsonable_encoder and response-model passes. Only
+    for content that is already plain dicts, lists and strings.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -4,6 +4,13 @@ import json
 import requests
 from groq import Groq
 
+from cassette import install_cassette
+from llm_client import USAGE
+from llm_scheduler import SCHEDULER, PRIORITY_SIMULATION, request_tokens
+from extraction import Intelligence, extract_intelligence
+from scenarios import SCENARIOS
+from transcript_store import SIM_TRANSCRIPT_LOG, TranscriptStore, indicator_hits
+
 # Configuration
 API_URL = "http://127.0.0.1:8000/honey-pot-entry"
 API_KEY = "team_top_250_secret"
@@ -15,37 +22,32 @@ if not GROQ_API_KEY:
     print("Error: GROQ_API_KEY not found.")
     exit(1)
 
-spammer_client = Groq(api_key=GROQ_API_KEY)
-
-# Scenarios
-SCENARIOS = {
-    "Level 1: Lottery Scam": {
-        "system": "You are a persistent scammer trying to convince the user they won a $1M lottery. You need them to pay a small processing fee via UPI or Bank Transfer. Be pushy but realistic. Do not give up. Ask for payment details repeatedly.",
-        "first_message": "CONGRATULATIONS! You have won $1,000,000 in the International Global Lottery! To claim your prize, reply immediately!"
-    },
-    "Level 2: Tech Support Scam": {
-        "system": "You are a 'Microsoft Tech Support' agent. You detected a virus on the user's computer. You need them to download 'AnyDesk' or 'TeamViewer' so you can fix it. Be authoritative and urgent. Ask them to go to a specific URL to download it.",
-        "first_message": "ALERT: Your Windows computer is infected with a critical virus. Microsoft has blocked your IP. Call us or reply immediately to unlock your device."
-    },
-    "Level 3: KYC Update Scam": {
-        "system": "You are a bank official (SBI/HDFC). The user's account is blocked due to pending KYC. You need them to click a link or share OTP to unblock it. Threaten that the account will be frozen permanently if they don't act now.",
-        "first_message": "Dear Customer, Your SBI account will be blocked today due to incomplete KYC. Please update your PAN immediately to avoid suspension."
-    }
-}
+spammer_client = install_cassette(Groq(api_key=GROQ_API_KEY, max_retries=0))
+
 
 def generate_spammer_reply(history, system_prompt):
     messages = [{"role": "system", "content": system_prompt}] + history
-    try:
+
+    def attempt():
+        start = time.perf_counter()
         completion = spammer_client.chat.completions.create(
-             model="llama-3.3-70b-versatile",
-             messages=messages,
-             temperature=0.7,
-             max_tokens=150
+            model="llama-3.3-70b-versatile",
+            messages=messages,
+            temperature=0.7,
+            max_tokens=150
         )
+        USAGE.record_completion(messages, completion, time.perf_counter() - start)
+        return completion
+
+    try:
+        completion = SCHEDULER.call(attempt, request_tokens(messages, 150), PRIORITY_SIMULATION, max_wait=0)
         return completion.choices[0].message.content
     except Exception as e:
         return f"[Spammer AI Error]: {e}"
 
+transcripts = TranscriptStore(SIM_TRANSCRIPT_LOG)
+
+
 def run_level(level_name, config):
     print(f"\n{'='*60}")
     print(f"STARTING {level_name.upper()}")
@@ -74,6 +76,11 @@ def run_level(level_name, config):
                 "sessionId": session_id
             }
             headers = {"x-api-key": API_KEY}
+            turn_intel = Intelligence()
+            extract_intelligence(spammer_msg, turn_intel)
+            transcripts.append(session_id, "scammer", spammer_msg, hits=indicator_hits(turn_intel),
+                               scenario=level_name, turn=i + 1)
+            start = time.perf_counter()
             response = requests.post(API_URL, json=payload, headers=headers)
             
             if response.status_code != 200:
@@ -82,7 +89,9 @@ def run_level(level_name, config):
                 
             data = response.json()
             honeypot_reply = data["reply"]
-            last_intel = data["extractedIntelligence"]
+            last_intel = data.get("extractedIntelligence", last_intel)
+            transcripts.append(session_id, "honeypot", honeypot_reply,
+                               latency_ms=(time.perf_counter() - start) * 1000, scenario=level_name, turn=i + 1)
             
             print(f"🟢 HONEYPOT: {honeypot_reply}")
             print("-" * 30)
@@ -114,7 +123,8 @@ def main():
         run_level(level, config)
         time.sleep(2)
 
-    print("\n✅ Simulation Complete.")
+    transcripts.stop()
+    print(f"\n✅ Simulation Complete. Transcripts appended to {SIM_TRANSCRIPT_LOG}")
 
 if __name__ == "__main__":
     main()
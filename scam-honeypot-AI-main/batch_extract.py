@@ -0,0 +1,178 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+
+from blocklist import load_blocklist
+from classifier import detect_scam, load_classifier
+from extraction import Intelligence, extract_intelligence
+
+# =========================================================
+# CONFIG
+# =========================================================
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", str(os.cpu_count() or 2)))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "500"))
+# Largest /extract/batch body accepted (0 = no limit). Around 100k SMS.
+BATCH_MAX_BODY_BYTES = int(os.getenv("BATCH_MAX_BODY_BYTES", str(32 * 1024 * 1024)))
+# Batches one server worker runs at once; as many more may wait for a
+# slot, then the rest get a 503. Live turns have their own admission.
+BATCH_MAX_IN_FLIGHT = int(os.getenv("BATCH_MAX_IN_FLIGHT", "2"))
+
+# =========================================================
+# INPUT PARSING
+# =========================================================
+Item = Tuple[Optional[str], str]  # (id, text)
+
+def _to_item(obj) -> Item:
+    if isinstance(obj, dict):
+        message = obj.get("message", obj.get("text", ""))
+        if isinstance(message, dict):
+            message = message.get("text", "")
+        item_id = obj.get("id", obj.get("sessionId"))
+        return (None if item_id is None else str(item_id)), str(message or "")
+    return None, str(obj)
+
+def parse_messages(raw: bytes) -> List[Item]:
+    """
+    Accepts a JSON array or JSONL. Each entry may be a plain string, a
+    GUVI-style {"sessionId", "message": {"text"}} object, or {"id", "text"}.
+    JSONL lines that are not valid JSON are taken as raw message text, so
+    plain SMS dumps work too.
+    """
+    text = raw.decode("utf-8", errors="replace").lstrip("\ufeff")
+    if text.lstrip().startswith("["):
+        return [_to_item(obj) for obj in json.loads(text)]
+    return list(iter_jsonl(text.splitlines()))
+
+def iter_jsonl(lines: Iterable[str]) -> Iterator[Item]:
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield _to_item(json.loads(line))
+        except ValueError:
+            yield None, line
+
+# =========================================================
+# EXTRACTION WORKERS
+# =========================================================
+# scamDetected follows the live rule (classifier.detect_scam), with the
+# same classifier and blocklist: main.py hands over its own for inline
+# batches. Pool workers (which do not fork from the server) and the CLI
+# load them from CLASSIFIER_MODEL / BLOCKLIST_PATH on first use.
+_detection = None
+
+def use_detection(classifier, blocklist):
+    global _detection
+    _detection = (classifier, blocklist)
+
+def _get_detection():
+    if _detection is None:
+        use_detection(load_classifier(), load_blocklist())
+    return _detection
+
+def extract_record(index: int, item_id: Optional[str], text: str) -> dict:
+    classifier, blocklist = _get_detection()
+    intel = Intelligence()
+    extract_intelligence(text, intel)
+    record = {"index": index}
+    if item_id is not None:
+        record["id"] = item_id
+    record["scamDetected"] = detect_scam(intel, (text,), classifier, blocklist)
+    record["extractedIntelligence"] = intel.extracted()
+    if intel.knownBadIndicators:
+        record["knownBadIndicators"] = list(intel.knownBadIndicators)
+    return record
+
+def extract_chunk(start: int, items: List[Item]) -> str:
+    """Runs in a pool worker. Returns the chunk as ready-to-send NDJSON."""
+    lines = []
+    for offset, (item_id, text) in enumerate(items):
+        lines.append(json.dumps(extract_record(start + offset, item_id, text)))
+    return "\n".join(lines) + "\n"
+
+def chunked(items: List[Item], size: int) -> Iterator[Tuple[int, List[Item]]]:
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def _pool_context():
+    # The pool is created on the first request, when the server already
+    # runs its writer threads; a forked child could inherit one of their
+    # locks held. Forkserver workers fork from a clean, single-threaded
+    # process (spawn where there is no forkserver).
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS, mp_context=_pool_context())
+    return _pool
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+# =========================================================
+# STREAMING DRIVERS
+# =========================================================
+async def stream_ndjson(items: List[Item], chunk_size: int = BATCH_CHUNK_SIZE) -> AsyncIterator[str]:
+    """
+    Yields NDJSON in input order. Chunks are fanned out to the process pool
+    with at most two per worker in flight, so a huge upload does not queue
+    every chunk's results in memory at once.
+    """
+    if len(items) <= chunk_size:
+        # Not worth a round-trip through the pool; still off the event loop.
+        yield await asyncio.to_thread(extract_chunk, 0, items) if items else ""
+        return
+
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    window = 2 * BATCH_WORKERS
+    chunks = chunked(items, chunk_size)
+    inflight = []
+    for start, chunk in chunks:
+        inflight.append(loop.run_in_executor(pool, extract_chunk, start, chunk))
+        if len(inflight) >= window:
+            yield await inflight.pop(0)
+    for future in inflight:
+        yield await future
+
+def run_batch(items: List[Item], out, workers: int, chunk_size: int):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        starts, chunks = zip(*chunked(items, chunk_size)) if items else ((), ())
+        for block in pool.map(extract_chunk, starts, chunks):
+            out.write(block)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract scam intelligence from a JSON/JSONL message dump.")
+    parser.add_argument("input", help="JSON array or JSONL file ('-' for stdin)")
+    parser.add_argument("-o", "--output", help="NDJSON output file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    raw = sys.stdin.buffer.read() if args.input == "-" else open(args.input, "rb").read()
+    items = parse_messages(raw)
+    # Loaded once, before the pool forks; their notices stay out of the NDJSON.
+    with contextlib.redirect_stdout(sys.stderr):
+        _get_detection()
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        run_batch(items, out, args.workers, args.chunk_size)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"✅ Extracted {len(items)} messages", file=sys.stderr)
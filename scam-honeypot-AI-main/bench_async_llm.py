@@ -0,0 +1,74 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mock_llm_server import ServerThread, create_app
+
+# =========================================================
+# BENCHMARK: BLOCKING VS ASYNC LLM PATH
+# =========================================================
+# Drives /honey-pot-entry in-process against a local mock LLM and compares
+# the old blocking call (sync Groq client on the event loop) with the
+# async pipeline. Run: python bench_async_llm.py --latency 0.1
+
+
+async def drive(app, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i):
+            r = await client.post(
+                "/honey-pot-entry",
+                json={"sessionId": f"bench-{i}", "message": {"text": "Hello, how are you?"}},
+                headers={"x-api-key": main.API_KEY},
+            )
+            r.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(concurrency)))
+        return time.perf_counter() - start
+
+
+async def blocking_reply(user_text: str, *args) -> str:
+    # Reproduces the previous handler, which called the sync client inline.
+    return main.generate_ai_reply(user_text)
+
+
+async def run(levels):
+    async_reply = main.generate_ai_reply_async
+    results = []
+    for concurrency in levels:
+        row = {"concurrency": concurrency}
+        for mode, fn in (("blocking", blocking_reply), ("async", async_reply)):
+            main.generate_ai_reply_async = fn
+            elapsed = await drive(main.app, concurrency)
+            row[mode] = concurrency / elapsed
+        main.generate_ai_reply_async = async_reply
+        results.append(row)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.1, help="mock LLM latency in seconds")
+    parser.add_argument("--levels", type=int, nargs="+", default=[50, 200])
+    args = parser.parse_args()
+
+    with ServerThread(create_app(latency=args.latency)) as llm:
+        os.environ["GROQ_BASE_URL"] = llm.url
+        os.environ.setdefault("GROQ_API_KEY", "bench-key")
+        # Measure the app, not the provider's rate limits.
+        os.environ.setdefault("LLM_RPM", "0")
+        os.environ.setdefault("LLM_TPM", "0")
+        import main
+
+        print(f"Mock LLM latency: {args.latency * 1000:.0f} ms")
+        print(f"{'concurrency':>12} {'blocking req/s':>16} {'async req/s':>14} {'speedup':>9}")
+        for row in asyncio.run(run(args.levels)):
+            print(f"{row['concurrency']:>12} {row['blocking']:>16.1f} {row['async']:>14.1f} "
+                  f"{row['async'] / row['blocking']:>8.1f}x")
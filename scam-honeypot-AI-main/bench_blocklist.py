@@ -0,0 +1,132 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from blocklist import BLOCKLIST_FP_RATE, blocklist_key, compile_lists, load_blocklist
+
+# =========================================================
+# BENCHMARK: BLOCKLIST MEMORY AND LOOKUP LATENCY
+# =========================================================
+# Compiles synthetic domain, UPI and phone lists of --entries lines in
+# total, then reports compile time, file size, load time, resident memory
+# and lookup latency, next to a plain Python set of the same keys.
+# Run: python bench_blocklist.py --entries 1000000
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def write_lists(tmp: str, entries: int) -> dict:
+    third = entries // 3
+    lists = {
+        "domain": (os.path.join(tmp, "domains.txt"), lambda i: f"https://login.kyc-update-{i}.co.in/verify"),
+        "upi": (os.path.join(tmp, "upi.txt"), lambda i: f"refund.desk{i}@okaxis"),
+        "phone": (os.path.join(tmp, "phones.txt"), lambda i: f"+91 9{i:09d}"),
+    }
+    for kind, (path, make) in lists.items():
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("# synthetic\n")
+            f.writelines(make(i) + "\n" for i in range(third))
+    return {kind: [path] for kind, (path, _) in lists.items()}
+
+
+def per_call_ns(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e9
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--fp-rate", type=float, default=BLOCKLIST_FP_RATE)
+    parser.add_argument("--probes", type=int, default=200_000, help="known-absent keys for the false-positive rate")
+    parser.add_argument("--no-set", action="store_true", help="skip the Python set comparison")
+    parser.add_argument("-o", "--output", default="bench_blocklist.json")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = write_lists(tmp, args.entries)
+        path = os.path.join(tmp, "blocklist.bloom")
+        report = compile_lists(sources, path, args.fp_rate)
+        print(f"compile: {report['entries']:,} entries in {report['seconds']}s -> {report['bytes'] / 1e6:.1f} MB "
+              f"({report['bytes'] * 8 / report['entries']:.1f} bits/entry)")
+
+        rss_before = rss_bytes()
+        start = time.perf_counter()
+        blocklist = load_blocklist(path)
+        load_ms = (time.perf_counter() - start) * 1000
+        rss_loaded = rss_bytes()
+
+        bloom = blocklist.bloom
+        hit_key = blocklist_key("upi", "refund.desk7@okaxis")
+        miss_key = blocklist_key("upi", "someone.else@ybl")
+        latency = {
+            "containsHitNs": per_call_ns(lambda: hit_key in bloom, 100_000),
+            "containsMissNs": per_call_ns(lambda: miss_key in bloom, 100_000),
+            "checkUpiNs": per_call_ns(lambda: blocklist.check("upi", "Refund.Desk7@OKAXIS"), 100_000),
+            "checkPhoneNs": per_call_ns(lambda: blocklist.check("phone", "+91-9000000007"), 100_000),
+            "checkDomainNs": per_call_ns(
+                lambda: blocklist.check("domain", "http://login.kyc-update-7.co.in/verify"), 50_000),
+        }
+        false_hits = sum(f"upi:probe{i}@ybl".encode("utf-8") in bloom for i in range(args.probes))
+        # Every page touched by now: the worst case for resident memory.
+        for offset in range(0, bloom.size_bytes, 4096):
+            bloom._mm[offset]
+        rss_touched = rss_bytes()
+
+        result = {
+            "entries": report["entries"],
+            "fpTarget": args.fp_rate,
+            "fpMeasured": false_hits / args.probes,
+            "fileBytes": report["bytes"],
+            "compileSeconds": report["seconds"],
+            "loadMs": round(load_ms, 2),
+            "rssOnLoadBytes": rss_loaded - rss_before,
+            "rssAllPagesBytes": rss_touched - rss_before,
+            "latency": {k: round(v, 1) for k, v in latency.items()},
+        }
+        bloom.close()
+
+        if not args.no_set:
+            tracemalloc.start()
+            start = time.perf_counter()
+            keys = set()
+            for kind, paths in sources.items():
+                for p in paths:
+                    with open(p, encoding="utf-8") as f:
+                        for line in f:
+                            if not line.startswith("#"):
+                                keys.add(blocklist_key(kind, line.strip()))
+            set_seconds = time.perf_counter() - start
+            set_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            result["pythonSet"] = {
+                "bytes": set_bytes,
+                "loadSeconds": round(set_seconds, 2),
+                "containsNs": round(per_call_ns(lambda: hit_key in keys, 100_000), 1),
+            }
+
+    print(f"load: {result['loadMs']} ms, resident +{result['rssOnLoadBytes'] / 1e6:.1f} MB on load, "
+          f"+{result['rssAllPagesBytes'] / 1e6:.1f} MB with every page touched")
+    print(f"false positives: {result['fpMeasured']:.5f} (target {args.fp_rate})")
+    for name, ns in result["latency"].items():
+        print(f"{name:>15}: {ns:8.1f} ns")
+    if "pythonSet" in result:
+        s = result["pythonSet"]
+        print(f"python set: {s['bytes'] / 1e6:.1f} MB, {s['loadSeconds']}s to load, {s['containsNs']} ns lookup")
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"📄 Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
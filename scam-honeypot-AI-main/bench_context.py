@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from context_manager import ContextManager, estimate_tokens
+from prompts import SYSTEM_PROMPT
+
+# =========================================================
+# BENCHMARK: PROMPT SIZE PER TURN
+# =========================================================
+# Replays one long synthetic engagement through the context manager and
+# reports the prompt size it would send at selected turns, next to the
+# size of sending the whole history. Run: python bench_context.py
+
+SCAMMER_LINES = [
+    "Sir your account is blocked, update KYC now or it will be frozen permanently.",
+    "Pay the Rs 499 verification fee to kyc.update@okaxis and send screenshot.",
+    "Why are you delaying? Open the link http://sbi-kyc-update.in/verify immediately.",
+    "Call our senior officer on +91-9876543210 if you have any doubt.",
+]
+VICTIM_LINES = [
+    "Oh no sir, which account? I have two, one in SBI and one in post office.",
+    "The app is loading very slow, can you wait one minute please.",
+    "My son usually does this, what should I press after opening?",
+]
+
+
+def history_at(turn: int) -> list:
+    history = []
+    for i in range(turn):
+        history.append({"sender": "scammer", "text": SCAMMER_LINES[i % len(SCAMMER_LINES)]})
+        history.append({"sender": "user", "text": VICTIM_LINES[i % len(VICTIM_LINES)]})
+    return history
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, nargs="+", default=[1, 5, 20, 50, 200])
+    args = parser.parse_args()
+
+    manager = ContextManager()
+    system_tokens = estimate_tokens(SYSTEM_PROMPT)
+    print(f"System prompt ~{system_tokens} tokens, context budget {manager.budget_tokens} tokens")
+    print(f"{'turn':>6} {'full history':>13} {'managed':>9} {'recent':>7} {'summarized':>11} {'build us':>9}")
+    for turn in range(1, max(args.turns) + 1):
+        history = history_at(turn - 1)
+        text = SCAMMER_LINES[turn % len(SCAMMER_LINES)]
+        start = time.perf_counter()
+        result = manager.build("bench", SYSTEM_PROMPT, history, text)
+        elapsed = (time.perf_counter() - start) * 1e6
+        if turn in args.turns:
+            full = system_tokens + sum(estimate_tokens(h["text"]) + 4 for h in history) + estimate_tokens(text) + 8
+            print(f"{turn:>6} {full:>13} {result.prompt_tokens:>9} {result.recent_messages:>7} "
+                  f"{result.summarized_messages:>11} {elapsed:>9.0f}")
@@ -0,0 +1,203 @@
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from extraction import Intelligence, extract_intelligence
+from scam_corpus import CORPUS_VERSION, INDICATOR_FIELDS, Sample, generate, read_corpus
+
+# =========================================================
+# BENCHMARK: EXTRACTION THROUGHPUT AND ACCURACY ON THE CORPUS
+# =========================================================
+# Runs extract_intelligence over a synthetic corpus (scam_corpus.py) and
+# reports messages per second, MB per second and per-message latency,
+# overall and per category, peak memory, and precision/recall per
+# indicator field against the planted ground truth. Only the extraction
+# call is timed; generating the corpus and scoring are not.
+#
+# Results go to JSON. With --gate, a previous result is the baseline and
+# the run fails (exit 1) if throughput drops by more than --max-slowdown
+# or any field's precision or recall drops by more than --max-accuracy-drop:
+#
+#   python bench_corpus.py --messages 1000000 -o bench_corpus_baseline.json
+#   ... change extraction.py ...
+#   python bench_corpus.py --messages 1000000 --gate bench_corpus_baseline.json
+
+
+def _pct(sorted_ns: List[int], p: float) -> float:
+    if not sorted_ns:
+        return 0.0
+    return sorted_ns[min(len(sorted_ns) - 1, int(p / 100 * len(sorted_ns)))] / 1000
+
+
+def _ratios(tp: int, fp: int, fn: int) -> dict:
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"tp": tp, "fp": fp, "fn": fn, "precision": round(precision, 5), "recall": round(recall, 5),
+            "f1": round(f1, 5)}
+
+
+def run(samples: Iterable[Sample]) -> dict:
+    counts = {f: [0, 0, 0] for f in INDICATOR_FIELDS}  # tp, fp, fn
+    categories: Dict[str, dict] = {}
+    latencies = array("q")
+    total_ns = 0
+    chars = 0
+    largest: Optional[Sample] = None
+    clock = time.perf_counter_ns
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    for sample in samples:
+        text = sample.text
+        intel = Intelligence()
+        start = clock()
+        extract_intelligence(text, intel)
+        elapsed = clock() - start
+
+        latencies.append(elapsed)
+        total_ns += elapsed
+        chars += len(text)
+        if largest is None or len(text) > len(largest.text):
+            largest = sample
+        cat = categories.get(sample.category)
+        if cat is None:
+            cat = categories[sample.category] = {"messages": 0, "chars": 0, "ns": 0, "maxNs": 0,
+                                                 "tp": 0, "fp": 0, "fn": 0}
+        cat["messages"] += 1
+        cat["chars"] += len(text)
+        cat["ns"] += elapsed
+        cat["maxNs"] = max(cat["maxNs"], elapsed)
+
+        expected = sample.expected
+        for field in INDICATOR_FIELDS:
+            got = getattr(intel, field)
+            want = expected.get(field, ())
+            if not got and not want:
+                continue
+            got, want = set(got), set(want)
+            tp, fp, fn = len(got & want), len(got - want), len(want - got)
+            c = counts[field]
+            c[0] += tp
+            c[1] += fp
+            c[2] += fn
+            cat["tp"] += tp
+            cat["fp"] += fp
+            cat["fn"] += fn
+
+    messages = len(latencies)
+    seconds = total_ns / 1e9
+    ordered = sorted(latencies)
+    totals = [sum(c[i] for c in counts.values()) for i in range(3)]
+    result = {
+        "messages": messages,
+        "chars": chars,
+        "extractSeconds": round(seconds, 3),
+        "messagesPerSecond": round(messages / seconds, 1) if seconds else None,
+        "mbPerSecond": round(chars / 1e6 / seconds, 2) if seconds else None,
+        "latencyUs": {"p50": _pct(ordered, 50), "p99": _pct(ordered, 99), "p999": _pct(ordered, 99.9),
+                      "max": ordered[-1] / 1000 if ordered else 0.0},
+        "accuracy": dict({f: _ratios(*c) for f, c in counts.items()}, overall=_ratios(*totals)),
+        "byCategory": {
+            name: {
+                "messages": c["messages"],
+                "avgChars": round(c["chars"] / c["messages"]),
+                "messagesPerSecond": round(c["messages"] / (c["ns"] / 1e9), 1) if c["ns"] else None,
+                "maxUs": c["maxNs"] / 1000,
+                **{k: v for k, v in _ratios(c["tp"], c["fp"], c["fn"]).items() if k in ("precision", "recall")},
+            }
+            for name, c in sorted(categories.items())
+        },
+    }
+    del ordered, latencies
+
+    # Memory: the process high-water mark over the run, and what one call
+    # allocates at peak on the largest message.
+    memory = {"maxRssBytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+              "rssGrowthBytes": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) * 1024}
+    if largest is not None:
+        tracemalloc.start()
+        extract_intelligence(largest.text, Intelligence())
+        memory["largestMessageChars"] = len(largest.text)
+        memory["largestMessagePeakAllocBytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    result["memory"] = memory
+    return result
+
+
+def gate(result: dict, baseline: dict, max_slowdown: float, max_accuracy_drop: float) -> List[str]:
+    """Reasons the result is worse than the baseline; empty when it passes."""
+    failures = []
+    if baseline.get("corpus") != result.get("corpus"):
+        failures.append(f"different corpus: {result.get('corpus')} vs baseline {baseline.get('corpus')}")
+    base_mps, mps = baseline.get("messagesPerSecond"), result.get("messagesPerSecond")
+    if base_mps and mps is not None and mps < base_mps * (1 - max_slowdown):
+        failures.append(f"throughput {mps:,.0f} msg/s is more than {max_slowdown:.0%} below {base_mps:,.0f}")
+    for field, base in baseline.get("accuracy", {}).items():
+        now = result["accuracy"].get(field)
+        for metric in ("precision", "recall"):
+            if now is None or now[metric] < base[metric] - max_accuracy_drop:
+                failures.append(f"{field} {metric} {now and now[metric]} < baseline {base[metric]}")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-long-kb", type=int, default=128)
+    parser.add_argument("--corpus", help="read a corpus written by scam_corpus.py instead of generating one")
+    parser.add_argument("--gate", metavar="BASELINE", help="fail if worse than this earlier result")
+    parser.add_argument("--max-slowdown", type=float, default=0.15, help="allowed throughput drop (fraction)")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.0005,
+                        help="allowed precision/recall drop per field")
+    parser.add_argument("-o", "--output", default="bench_corpus.json")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        samples = read_corpus(args.corpus)
+        corpus = {"path": args.corpus}
+    else:
+        samples = generate(args.messages, args.seed, args.max_long_kb)
+        corpus = {"version": CORPUS_VERSION, "messages": args.messages, "seed": args.seed,
+                  "maxLongKb": args.max_long_kb}
+    start = time.perf_counter()
+    result = dict(corpus=corpus, **run(samples))
+    result["wallSeconds"] = round(time.perf_counter() - start, 1)
+
+    print(f"📊 {result['messages']:,} messages ({result['chars'] / 1e6:.0f} MB) in {result['extractSeconds']}s "
+          f"of extraction: {result['messagesPerSecond']:,.0f} msg/s, {result['mbPerSecond']} MB/s")
+    lat = result["latencyUs"]
+    print(f"   latency p50 {lat['p50']:.1f} us, p99 {lat['p99']:.1f} us, p99.9 {lat['p999']:.1f} us, "
+          f"max {lat['max'] / 1000:.1f} ms; max RSS {result['memory']['maxRssBytes'] / 1e6:.0f} MB")
+    for field, acc in result["accuracy"].items():
+        print(f"{field:>14}: precision {acc['precision']:.4f} recall {acc['recall']:.4f} "
+              f"(tp {acc['tp']:,} fp {acc['fp']:,} fn {acc['fn']:,})")
+    for name, cat in result["byCategory"].items():
+        print(f"{name:>20}: {cat['messages']:>8,} msgs, {cat['avgChars']:>7,} chars avg, "
+              f"{cat['messagesPerSecond']:>10,.0f} msg/s, max {cat['maxUs'] / 1000:7.2f} ms, "
+              f"P {cat['precision']:.3f} R {cat['recall']:.3f}")
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"📄 Results written to {args.output}")
+
+    if args.gate:
+        with open(args.gate, encoding="utf-8") as f:
+            failures = gate(result, json.load(f), args.max_slowdown, args.max_accuracy_drop)
+        for failure in failures:
+            print(f"❌ {failure}")
+        if failures:
+            return 1
+        print(f"✅ Within the gate of {args.gate}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
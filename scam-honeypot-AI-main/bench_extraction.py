@@ -0,0 +1,74 @@
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from extraction import Intelligence, extract_intelligence
+
+# =========================================================
+# MICRO-BENCHMARK: EXTRACTION ENGINE
+# =========================================================
+# Compares the compiled single-pass engine with the original
+# extract_intelligence (three findall passes + eight text.lower() calls).
+# Run: python bench_extraction.py
+
+MESSAGES = [
+    "CONGRATULATIONS! You verify won $1,000,000! Reply now to claim!",
+    "ALERT: VIRUS DETECTED on your computer. Call Microsoft Support immediately.",
+    "Dear Customer, your Bank Account is blocked due to pending KYC. Update immediately.",
+    "Pay the $50 processing fee to scammer@upi right now, it is urgent.",
+    "Download AnyDesk from http://bad-link.com/anydesk.exe or call +91-9876543210.",
+    "Transfer to A/C 123456789012 IFSC SBIN0001234 and share the OTP to verify.",
+    "Hello sir, I am just checking if you got my previous message about the refund.",
+    "Okay thank you, I will wait for your reply.",
+]
+
+
+class LegacyIntelligence:
+    def __init__(self):
+        self.scamDetected = False
+        self.upiIds = []
+        self.bankAccounts = []
+        self.phishingLinks = []
+        self.phoneNumbers = []
+        self.suspiciousKeywords = []
+
+
+def legacy_extract_intelligence(text, intel):
+    if not text:
+        return
+    intel.upiIds += re.findall(r"[a-zA-Z0-9.\-_]{2,}@[a-zA-Z]{2,}", text)
+    intel.phoneNumbers += re.findall(r"\b\d{10}\b", text)
+    intel.phishingLinks += re.findall(r"https?://[^\s]+", text)
+    keywords = ["urgent", "verify", "blocked", "otp", "account", "refund", "pay", "money"]
+    for k in keywords:
+        if k in text.lower():
+            intel.suspiciousKeywords.append(k)
+    if intel.upiIds or intel.phishingLinks or intel.phoneNumbers or intel.suspiciousKeywords:
+        intel.scamDetected = True
+
+
+def measure(fn, factory, messages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in messages:
+            fn(text, factory())
+    elapsed = time.perf_counter() - start
+    return repeat * len(messages) / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    long_message = " ".join(MESSAGES) * 20
+    suites = [("short messages", MESSAGES), ("long message (~10 KB)", [long_message])]
+    for name, messages in suites:
+        repeat = args.repeat if len(messages) > 1 else args.repeat // 50
+        legacy = measure(legacy_extract_intelligence, LegacyIntelligence, messages, repeat)
+        engine = measure(extract_intelligence, Intelligence, messages, repeat)
+        print(f"{name:>24}: legacy {legacy:>10,.0f} msg/s | engine {engine:>10,.0f} msg/s | {engine / legacy:.2f}x")
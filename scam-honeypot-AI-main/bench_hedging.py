@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from llm_client import AsyncLLMClient
+from llm_router import GroqProvider, LLMRouter
+from llm_scheduler import LLMScheduler
+from mock_llm_server import ServerThread, create_app
+
+# =========================================================
+# BENCHMARK: TAIL LATENCY WITH AND WITHOUT HEDGING
+# =========================================================
+# Two local stand-in providers: a primary with a heavy-tailed (lognormal)
+# latency and a steadier backup. Sends the same sequence of requests to the
+# primary alone and through the hedging router, and compares percentiles.
+# Run: python bench_hedging.py --requests 300 --hedge-delay 0.4
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda p: ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+    return {"p50": pick(50), "p95": pick(95), "p99": pick(99), "mean": statistics.mean(ordered) * 1000}
+
+
+async def drive(llm, requests: int, concurrency: int):
+    messages = [{"role": "user", "content": "Your account is blocked, share OTP"}]
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await llm.chat(messages)
+            samples.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return samples
+
+
+def client(url: str) -> AsyncLLMClient:
+    return AsyncLLMClient(api_key="bench-key", base_url=url, scheduler=LLMScheduler(rpm=0, tpm=0))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--primary-latency", type=float, default=0.2, help="median of the lognormal primary (s)")
+    parser.add_argument("--primary-spread", type=float, default=1.0, help="lognormal sigma of the primary")
+    parser.add_argument("--backup-latency", type=float, default=0.35, help="backup latency (s), uniform +/-20%")
+    parser.add_argument("--hedge-delay", type=float, default=0.4)
+    args = parser.parse_args()
+
+    primary_app = create_app(latency=args.primary_latency, latency_dist="lognormal",
+                             latency_spread=args.primary_spread, seed=1)
+    backup_app = create_app(latency=args.backup_latency, latency_dist="uniform", latency_spread=0.2, seed=2)
+
+    with ServerThread(primary_app) as primary, ServerThread(backup_app) as backup:
+        plain = client(primary.url)
+        router = LLMRouter(
+            [GroqProvider(client(primary.url), "primary"), GroqProvider(client(backup.url), "backup")],
+            hedge_delay=args.hedge_delay,
+        )
+        rows = {
+            "primary only": asyncio.run(drive(plain, args.requests, args.concurrency)),
+            f"hedged @{args.hedge_delay * 1000:.0f}ms": asyncio.run(drive(router, args.requests, args.concurrency)),
+        }
+
+        print(f"{'mode':>16} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+        for mode, samples in rows.items():
+            p = percentiles(samples)
+            print(f"{mode:>16} {p['p50']:>8.0f} {p['p95']:>8.0f} {p['p99']:>8.0f} {p['mean']:>8.0f}")
+        stats = router.snapshot_stats()
+        extra = stats["hedged"] / max(stats["requests"], 1)
+        print(f"Hedged {stats['hedged']} of {stats['requests']} requests ({extra:.0%} extra provider calls), "
+              f"backup won {stats['hedge_wins']}")
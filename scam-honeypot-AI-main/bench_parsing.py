@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.encoders import jsonable_encoder
+
+from api_models import JSON_BACKEND, EntryRequest, dumps
+
+# =========================================================
+# MICRO-BENCHMARK: REQUEST PARSING AND RESPONSE ENCODING
+# =========================================================
+# Per-request cost of turning a /honey-pot-entry body into (session,
+# text, history) and the reply dict into bytes, for short and long
+# GUVI histories. "legacy" is json.loads plus the old fallbacks and
+# FastAPI's default jsonable_encoder + json.dumps response path.
+# Run: python bench_parsing.py
+
+REPLY = {"status": "success", "reply": "Oh okay sir, which app should I open for this? My son usually does this."}
+
+
+def make_body(turns: int) -> bytes:
+    history = []
+    for i in range(turns):
+        history.append({"sender": "scammer", "text": f"Sir pay Rs 499 to kyc.update@okaxis now, turn {i}. Urgent!",
+                        "timestamp": 1770005528731 + i})
+        history.append({"sender": "user", "text": "Which app should I open? The screen is loading very slow.",
+                        "timestamp": 1770005528731 + i})
+    return json.dumps({
+        "sessionId": "wertyu-dfghj-ertyui",
+        "message": {"sender": "scammer", "text": "Your bank account will be blocked today. Verify immediately.",
+                    "timestamp": 1770005528731},
+        "conversationHistory": history,
+        "metadata": {"channel": "SMS", "language": "English", "locale": "IN"},
+    }).encode()
+
+
+def legacy_parse(raw_body: bytes):
+    try:
+        body = json.loads(raw_body) if raw_body else {}
+    except Exception:
+        body = {}
+    if not isinstance(body, dict):
+        body = {}
+    message_data = body.get("message", {})
+    if isinstance(message_data, dict):
+        user_text = message_data.get("text", "")
+    else:
+        user_text = str(message_data)
+    if not user_text:
+        user_text = "Hello"
+    session_id = body.get("sessionId", "guvi-session")
+    history = body.get("conversationHistory", [])
+    if not isinstance(history, list):
+        history = []
+    return session_id, str(user_text), history
+
+
+def legacy_render(content) -> bytes:
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def measure(fn, arg, repeat: int) -> float:
+    """Microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"JSON backend: {JSON_BACKEND}")
+    print(f"{'history':>8} {'body':>9} {'parse legacy':>13} {'parse new':>10} "
+          f"{'encode legacy':>14} {'encode new':>11} {'total speedup':>14}")
+    encode_legacy = measure(legacy_render, REPLY, args.repeat)
+    encode_new = measure(dumps, REPLY, args.repeat)
+    for turns in (1, 100):
+        body = make_body(turns)
+        repeat = args.repeat if turns < 10 else max(1, args.repeat // 10)
+        parse_legacy = measure(legacy_parse, body, repeat)
+        parse_new = measure(EntryRequest.parse, body, repeat)
+        speedup = (parse_legacy + encode_legacy) / (parse_new + encode_new)
+        print(f"{turns:>8} {len(body):>8}B {parse_legacy:>11.1f}µs {parse_new:>8.1f}µs "
+              f"{encode_legacy:>12.1f}µs {encode_new:>9.1f}µs {speedup:>13.1f}x")
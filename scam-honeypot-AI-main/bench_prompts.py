@@ -0,0 +1,130 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from llm_client import AsyncLLMClient, UsageLedger
+from llm_scheduler import LLMScheduler
+from prompts import PROMPTS, get_prompt
+from scenarios import SCENARIOS
+from simulation_engine import SIM_TURNS, AgentTarget, SpammerAgent, aggregate, run_simulations
+
+# =========================================================
+# BENCHMARK: SYSTEM PROMPT VARIANTS ON A REPLAYED SCENARIO SUITE
+# =========================================================
+# Runs the same scenario x seed conversations once per prompt variant and
+# reports, per variant, the honeypot's prompt and completion tokens per
+# call (from the provider's usage blocks), provider time per call, turn
+# latency, cost, and the extraction numbers as a check that the shorter
+# prompt did not cost engagement. Spammer calls are counted separately.
+#
+# Offline (default) both agents talk to the local mock LLM: token counts
+# and cost are real, latency only reflects the mock. --online uses Groq
+# (GROQ_API_KEY), where prompt size also shows up in latency.
+# Run: python bench_prompts.py --seeds 3
+
+# Groq list prices for llama-3.3-70b-versatile, USD per million tokens.
+PRICE_PROMPT = 0.59
+PRICE_COMPLETION = 0.79
+
+
+async def run_variant(variant: str, args, base_url) -> dict:
+    compiled = get_prompt(variant)
+    ledger = UsageLedger(log=False)
+    scheduler = LLMScheduler(rpm=0, tpm=0, max_wait=0) if base_url else LLMScheduler(max_wait=0)
+    llm = AsyncLLMClient(api_key=os.getenv("GROQ_API_KEY") or "offline", base_url=base_url,
+                         scheduler=scheduler, ledger=ledger)
+    seeds = list(range(args.seeds))
+    start = time.perf_counter()
+    try:
+        results = await run_simulations(AgentTarget(llm, compiled.text), SpammerAgent(llm), SCENARIOS, seeds,
+                                        args.turns, args.concurrency)
+    finally:
+        await llm.aclose()
+    elapsed = time.perf_counter() - start
+
+    usage = ledger.snapshot_stats()
+    honeypot = usage.get(compiled.id, {"calls": 0, "promptTokens": 0, "completionTokens": 0})
+    overall = aggregate(results)
+    cost = (honeypot["promptTokens"] * args.price_prompt + honeypot["completionTokens"] * args.price_completion) / 1e6
+    return {
+        "id": compiled.id,
+        "fingerprint": compiled.fingerprint,
+        "systemPromptChars": len(compiled.text),
+        "systemPromptTokensLocal": compiled.tokens,
+        "elapsedSeconds": round(elapsed, 2),
+        "honeypot": honeypot,
+        "spammer": usage.get("unversioned"),
+        "costUsd": round(cost, 6),
+        "costUsdPer1kTurns": round(cost / honeypot["calls"] * 1000, 4) if honeypot["calls"] else None,
+        "turnLatencyMs": overall["turnLatencyMs"],
+        "extractionRate": overall["extractionRate"],
+        "indicatorsPerConversation": overall["indicatorsPerConversation"],
+        "errors": overall["errors"],
+    }
+
+
+def savings(base: dict, other: dict) -> dict:
+    def pct(a, b):
+        return round((1 - b / a) * 100, 1) if a else None
+
+    return {
+        "promptTokensPerCallPct": pct(base["honeypot"]["promptTokensAvg"], other["honeypot"]["promptTokensAvg"]),
+        "costPct": pct(base["costUsd"], other["costUsd"]),
+        "callMsAvgPct": pct(base["honeypot"]["callMsAvg"], other["honeypot"]["callMsAvg"]),
+    }
+
+
+async def main_async(args) -> dict:
+    mock = None
+    base_url = None
+    if not args.online:
+        from mock_llm_server import ServerThread, create_app
+        mock = ServerThread(create_app(latency=args.mock_latency, latency_dist="lognormal", seed=0)).start()
+        base_url = mock.url
+    elif not os.getenv("GROQ_API_KEY"):
+        raise SystemExit("GROQ_API_KEY is not set (or drop --online)")
+    try:
+        variants = [await run_variant(v, args, base_url) for v in args.variants]
+    finally:
+        if mock:
+            mock.stop()
+    return {
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "variants": variants,
+        "savingsVsFirst": {v["id"]: savings(variants[0], v) for v in variants[1:]},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--variants", nargs="+", default=list(PROMPTS), choices=sorted(PROMPTS),
+                        help="first one is the baseline for savings")
+    parser.add_argument("--seeds", type=int, default=3, help="conversations per scenario")
+    parser.add_argument("--turns", type=int, default=SIM_TURNS)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--online", action="store_true", help="call Groq instead of the local mock")
+    parser.add_argument("--mock-latency", type=float, default=0.05)
+    parser.add_argument("--price-prompt", type=float, default=PRICE_PROMPT, help="USD per million prompt tokens")
+    parser.add_argument("--price-completion", type=float, default=PRICE_COMPLETION,
+                        help="USD per million completion tokens")
+    parser.add_argument("-o", "--output", default="bench_prompts.json")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    print(f"\n{'variant':>12} {'sys tok':>8} {'prompt/call':>12} {'compl/call':>11} {'call ms':>8} "
+          f"{'turn p95':>9} {'$/1k turns':>11} {'extract':>8}")
+    for v in report["variants"]:
+        h = v["honeypot"]
+        print(f"{v['id']:>12} {v['systemPromptTokensLocal']:>8} {h['promptTokensAvg']:>12} "
+              f"{h['completionTokensAvg']:>11} {h['callMsAvg']:>8} {v['turnLatencyMs']['p95']:>9} "
+              f"{v['costUsdPer1kTurns']:>11} {v['extractionRate']:>8}")
+    for variant_id, saved in report["savingsVsFirst"].items():
+        print(f"💰 {variant_id} vs {report['variants'][0]['id']}: {saved}")
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Results written to {args.output}")
@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import mock_callback_server
+import mock_llm_server
+from load_test import API_KEY, SCRIPT, free_port
+from mock_llm_server import ServerThread
+
+# =========================================================
+# BENCHMARK: COLD START
+# =========================================================
+# Starts the app in a fresh uvicorn process, as an autoscaled instance
+# would, against the mock LLM and callback endpoints, and measures:
+#
+#   - healthy:  process spawn -> first 200 from the health path
+#   - ready:    process spawn -> first 200 from /readyz (if it exists)
+#   - first:    latency of the first /honey-pot-entry once healthy
+#   - second:   latency of the next one, for comparison
+#
+# --app-dir points at another checkout, to measure a baseline:
+#
+#   git worktree add /tmp/baseline <commit>
+#   python bench_startup.py --app-dir /tmp/baseline/scam-honeypot-AI-main --health-path / --no-ready
+#   python bench_startup.py
+#
+# The mocks are plain HTTP on localhost, so provider DNS and TLS setup,
+# which pre-warming also takes off the first request, do not show here.
+
+
+def poll(url: str, deadline: float, proc: subprocess.Popen, interval: float = 0.005) -> float:
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"App exited with {proc.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return time.monotonic()
+        except httpx.HTTPError:
+            pass
+        time.sleep(interval)
+    raise RuntimeError(f"{url} did not answer 200 in time")
+
+
+def entry(url: str, session_id: str, text: str) -> float:
+    start = time.perf_counter()
+    r = httpx.post(url + "/honey-pot-entry", headers={"x-api-key": API_KEY}, timeout=30,
+                   json={"sessionId": session_id, "message": {"sender": "scammer", "text": text}})
+    r.raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+def cold_start(app_dir: str, env: dict, health_path: str, wait_ready: bool) -> dict:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+           "--log-level", "warning"]
+    with tempfile.TemporaryFile() as log:
+        spawned = time.monotonic()
+        proc = subprocess.Popen(cmd, cwd=app_dir, env={**os.environ, **env}, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            healthy = poll(url + health_path, spawned + 60, proc)
+            row = {"healthyMs": (healthy - spawned) * 1000}
+            if wait_ready:
+                row["readyMs"] = (poll(url + "/readyz", spawned + 60, proc) - spawned) * 1000
+            row["firstMs"] = entry(url, "cold-1", SCRIPT[1])
+            row["secondMs"] = entry(url, "cold-2", SCRIPT[2])
+            return row
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cold-start timings for the app.")
+    parser.add_argument("--app-dir", default=os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument("--health-path", default="/healthz")
+    parser.add_argument("--no-ready", action="store_true", help="skip /readyz (apps without it)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("-o", "--output", default="bench_startup.json")
+    args = parser.parse_args(argv)
+
+    llm_app = mock_llm_server.create_app(latency=args.llm_latency)
+    callback_app = mock_callback_server.create_app(latency=0.0)
+    runs = []
+    with ServerThread(llm_app) as llm, ServerThread(callback_app) as callback, \
+            tempfile.TemporaryDirectory() as tmp:
+        env = {
+            "GROQ_API_KEY": "bench-key",
+            "GROQ_BASE_URL": llm.url,
+            "GUVI_CALLBACK_URL": callback.url + "/callback",
+            "CALLBACK_SPOOL": os.path.join(tmp, "callback_spool.jsonl"),
+            "TRANSCRIPT_LOG": os.path.join(tmp, "transcript_log.jsonl"),
+            "REPLY_CACHE_SIZE": "0",
+        }
+        for i in range(args.runs):
+            row = cold_start(args.app_dir, env, args.health_path, not args.no_ready)
+            runs.append(row)
+            print(f"run {i + 1}: " + "  ".join(f"{k} {v:7.1f}" for k, v in row.items()))
+
+    summary = {k: round(statistics.median(r[k] for r in runs), 1) for k in runs[0]}
+    print("median: " + "  ".join(f"{k} {v:7.1f}" for k, v in summary.items()))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"config": vars(args), "median": summary, "runs": runs}, f, indent=2)
+    print(f"📄 Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mock_llm_server import ServerThread, create_app
+
+# =========================================================
+# BENCHMARK: TIME TO FIRST BYTE, STREAMED VS PLAIN
+# =========================================================
+# Serves the app over real HTTP against a mock LLM with a first-token
+# delay and a per-token delay, then compares /honey-pot-entry with
+# /honey-pot-entry/stream. Run: python bench_streaming.py
+
+
+def measure(client, path: str, body: dict, headers: dict):
+    start = time.perf_counter()
+    first = None
+    with client.stream("POST", path, json=body, headers=headers) as r:
+        r.raise_for_status()
+        for _ in r.iter_bytes():
+            if first is None:
+                first = time.perf_counter()
+    end = time.perf_counter()
+    return (first - start) * 1000, (end - start) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.3, help="mock time to first token (s)")
+    parser.add_argument("--token-delay", type=float, default=0.05, help="mock delay per extra token (s)")
+    parser.add_argument("--requests", type=int, default=10)
+    args = parser.parse_args()
+
+    with ServerThread(create_app(latency=args.latency, token_delay=args.token_delay)) as llm:
+        os.environ["GROQ_BASE_URL"] = llm.url
+        os.environ.setdefault("GROQ_API_KEY", "bench-key")
+        # Measure the app, not the provider's rate limits.
+        os.environ.setdefault("LLM_RPM", "0")
+        os.environ.setdefault("LLM_TPM", "0")
+        import main
+
+        # Every request must reach the LLM.
+        main.reply_cache = main.ReplyCache(pool_size=sys.maxsize)
+
+        with ServerThread(main.app) as api, httpx.Client(base_url=api.url, timeout=30) as client:
+            headers = {"x-api-key": main.API_KEY}
+            print(f"Mock LLM: first token {args.latency * 1000:.0f} ms, +{args.token_delay * 1000:.0f} ms/token")
+            print(f"{'endpoint':>24} {'TTFB p50 ms':>12} {'total p50 ms':>13}")
+            for path in ("/honey-pot-entry", "/honey-pot-entry/stream"):
+                rows = [
+                    measure(client, path, {"sessionId": f"bench-{i}", "message": {"text": "Hello sir"}}, headers)
+                    for i in range(args.requests)
+                ]
+                ttfb = statistics.median(r[0] for r in rows)
+                total = statistics.median(r[1] for r in rows)
+                print(f"{path:>24} {ttfb:>12.0f} {total:>13.0f}")
@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import mock_callback_server
+import mock_llm_server
+from load_test import AppProcess, run_level
+from mock_llm_server import ServerThread
+
+# =========================================================
+# BENCHMARK: 1 / 2 / 4 UVICORN WORKERS
+# =========================================================
+# Runs the app with 1, 2 and 4 workers against the mock LLM and mock GUVI
+# callback endpoint, for each session backend, and reports throughput,
+# latency and session consistency:
+#
+#   - callbacks/session: GUVI callbacks per conversation. A worker that
+#     has not seen a session rebuilds it from conversationHistory and
+#     re-sends the callback, so with the memory backend this grows with
+#     the worker count; with sqlite it should not move.
+#   - db: for sqlite, whether every turn made it into the shared
+#     database: the message_counts must add up to 2 per answered request.
+#
+# Throughput only scales with workers when the box has the cores for
+# them; `cpus` is recorded with the results.
+#
+#   python bench_workers.py --workers 1 2 4 --concurrency 50 --requests 1000
+
+TURNS = 5
+
+
+def check_db(path: str, answered: int) -> dict:
+    db = sqlite3.connect(path)
+    try:
+        counts = Counter(n for (n,) in db.execute("SELECT message_count FROM sessions"))
+    finally:
+        db.close()
+    messages = sum(n * c for n, c in counts.items())
+    return {"sessions": sum(counts.values()), "messages": messages, "consistent": messages == 2 * answered,
+            "messageCounts": {str(k): v for k, v in sorted(counts.items())}}
+
+
+def run(workers: int, backend: str, args) -> dict:
+    llm_app = mock_llm_server.create_app(latency=args.llm_latency, seed=1)
+    callback_app = mock_callback_server.create_app(latency=0.0)
+    with ServerThread(llm_app) as llm, ServerThread(callback_app) as callback, \
+            tempfile.TemporaryDirectory() as tmp:
+        env = {
+            "GROQ_API_KEY": "bench-key",
+            "GROQ_BASE_URL": llm.url,
+            "GUVI_CALLBACK_URL": callback.url + "/callback",
+            "CALLBACK_SPOOL": os.path.join(tmp, "callback_spool.jsonl"),
+            "TRANSCRIPT_LOG": os.path.join(tmp, "transcript_log.jsonl"),
+            "SESSION_BACKEND": backend,
+            "SESSION_DB": os.path.join(tmp, "sessions.db"),
+            "LLM_RPM": "0",
+            "LLM_TPM": "0",
+            "REPLY_CACHE_SIZE": "0",
+        }
+        app = AppProcess(env, workers=workers)
+        try:
+            app.wait_ready()
+            row = asyncio.run(run_level(app.url, args.concurrency, args.requests, TURNS, 30.0))
+            time.sleep(1.0)  # callbacks and session writes drain
+        finally:
+            app.stop()
+
+        sessions = {payload["sessionId"] for payload in callback_app.state.received}
+        result = {
+            "workers": workers,
+            "backend": backend,
+            "throughputRps": row["throughputRps"],
+            "p50Ms": row["latencyMs"]["p50"],
+            "p95Ms": row["latencyMs"]["p95"],
+            "errors": row["errors"],
+            "callbacksPerSession": round(len(callback_app.state.received) / max(len(sessions), 1), 2),
+        }
+        if backend == "sqlite":
+            result["db"] = check_db(env["SESSION_DB"], row["ok"])
+        return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Multi-worker throughput and session consistency.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--backends", nargs="+", choices=["memory", "sqlite"], default=["memory", "sqlite"])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("-o", "--output", default="bench_workers.json")
+    args = parser.parse_args(argv)
+
+    results = []
+    for backend in args.backends:
+        for workers in args.workers:
+            r = run(workers, backend, args)
+            results.append(r)
+            db = r.get("db")
+            print(f"{backend:<6} x{workers}  {r['throughputRps']:>7.1f} req/s  p50 {r['p50Ms']:>6.1f}  "
+                  f"p95 {r['p95Ms']:>6.1f} ms  errors {r['errors']}  callbacks/session {r['callbacksPerSession']}"
+                  + (f"  db {db['messages']} msgs, consistent={db['consistent']}" if db else ""))
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"cpus": os.cpu_count(), "config": vars(args), "results": results}, f, indent=2)
+    print(f"📄 Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+import argparse
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# =========================================================
+# CONFIG
+# =========================================================
+# Compiled by `python blocklist.py compile`. A missing file means no
+# blocklist: extracted indicators are simply not checked.
+BLOCKLIST_PATH = os.getenv("BLOCKLIST_PATH", "blocklist.bloom")
+# False-positive rate the compiler sizes the filter for.
+BLOCKLIST_FP_RATE = float(os.getenv("BLOCKLIST_FP_RATE", "0.0001"))
+
+# =========================================================
+# NORMALIZATION
+# =========================================================
+# Registrable domain = public suffix + one label. These are the
+# multi-label suffixes scam links actually use; anything else is taken to
+# be a one-label suffix ("evil.com", "evil.xyz").
+MULTI_LABEL_SUFFIXES = frozenset((
+    "co.in", "net.in", "org.in", "firm.in", "gen.in", "ind.in", "gov.in", "nic.in", "ac.in", "edu.in", "res.in",
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "com.au", "net.au", "org.au", "co.nz", "co.za", "com.br", "com.cn",
+    "com.sg", "com.my", "com.pk", "com.bd", "com.np", "com.ng", "co.ke", "co.jp", "co.id", "co.kr", "com.tr",
+    "blogspot.com", "github.io", "web.app", "firebaseapp.com", "herokuapp.com", "netlify.app", "vercel.app",
+    "pages.dev", "workers.dev", "000webhostapp.com", "weebly.com", "wixsite.com", "ngrok.io", "ngrok-free.app",
+))
+# Hosts shared by everyone (URL shorteners, site and form builders, chat
+# links): the host is not bad, one path on it is. Their links are keyed
+# by host and path ("bit.ly/3xYz"), with the path's case kept.
+SHARED_HOSTS = frozenset((
+    "bit.ly", "tinyurl.com", "goo.gl", "t.co", "cutt.ly", "is.gd", "rb.gy", "shorturl.at", "tiny.cc", "ow.ly",
+    "rebrand.ly", "t.ly", "s.id", "v.gd", "wa.me", "t.me", "forms.gle", "sites.google.com", "docs.google.com",
+    "drive.google.com", "forms.office.com", "1drv.ms", "linktr.ee",
+))
+_IPV4 = re.compile(r"\d{1,3}(?:\.\d{1,3}){3}\Z")
+_UPI = re.compile(r"[a-z0-9.\-_]{2,256}@[a-z]{2,64}\Z")
+
+
+def normalize_domain(value: str) -> Optional[str]:
+    """
+    Registrable domain of a link, with or without a scheme:
+    "HTTPS://login.Evil.co.in:8443/kyc" -> "evil.co.in",
+    "bücher.de/x" -> "xn--bcher-kva.de", and host and path on a shared
+    host: "https://bit.ly/3xYz?x=1" -> "bit.ly/3xYz". None when there is
+    no usable host.
+    """
+    value = value.strip()
+    scheme, sep, rest = value.partition("://")
+    host, *after = re.split(r"([/?#\\])", rest if sep else value, 1)
+    host = host.lower().rpartition("@")[2]   # user:pass@host
+    if host.startswith("["):
+        return None                          # IPv6 literal
+    host = host.partition(":")[0].strip(".")
+    if not host:
+        return None
+    try:
+        host = host.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+    if _IPV4.match(host):
+        return host
+    if host.startswith("www."):
+        host = host[4:]
+    if host in SHARED_HOSTS:
+        path = "".join(after) if after and after[0] == "/" else ""
+        return host + re.split(r"[?#]", path, 1)[0].rstrip("/")
+    labels = host.split(".")
+    if len(labels) < 2:
+        return None
+    n = 3 if ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES else 2
+    return ".".join(labels[-n:])
+
+
+def normalize_upi(value: str) -> Optional[str]:
+    value = value.strip().lower()
+    return value if _UPI.match(value) else None
+
+
+def normalize_phone(value: str) -> Optional[str]:
+    """Ten-digit Indian number from "+91 98765-43210", "098765 43210", "919876543210"."""
+    digits = "".join(ch for ch in value if ch.isdigit())
+    if len(digits) == 12 and digits.startswith("91"):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+    return digits if len(digits) == 10 else None
+
+
+NORMALIZERS = {"domain": normalize_domain, "upi": normalize_upi, "phone": normalize_phone}
+# Intelligence field -> blocklist kind.
+FIELD_KINDS = {"phishingLinks": "domain", "upiIds": "upi", "phoneNumbers": "phone"}
+
+# =========================================================
+# BLOOM FILTER
+# =========================================================
+# Blocked Bloom filter: every key sets its k bits inside one 64-byte
+# block (one cache line). A 16-byte blake2b hash picks the block and three
+# bit patterns out of fixed tables of 1024 each, so building the mask is
+# three table lookups and two ORs rather than k shifts; a lookup is one
+# hash, one 64-byte slice of the mapping and one big-int AND. The file is
+# a header and the raw bit array, so "loading" is an mmap: nothing is
+# parsed, and pages come in on first touch.
+#
+#   magic "HPBLOOM1" | version u32 | k u32 | blocks u64 | entries u64 | bit array
+_HEADER = struct.Struct("<8sIIQQ")
+_MAGIC = b"HPBLOOM1"
+_VERSION = 1
+_BLOCK_BYTES = 64
+_PATTERNS = 1024
+_MAX_K = 24  # 8 bits per pattern table
+
+_pattern_tables: Dict[int, Tuple[List[int], ...]] = {}
+
+
+def _patterns(k: int) -> Tuple[List[int], ...]:
+    """
+    Three tables of 512-bit masks splitting k bits between them. Drawn
+    from a fixed SHAKE-256 stream, so every process builds the same ones.
+    """
+    tables = _pattern_tables.get(k)
+    if tables is None:
+        stream = hashlib.shake_256(b"HPBLOOM1 patterns").digest(3 * _PATTERNS * 16)
+        tables = []
+        for t, bits in enumerate(((k + 2) // 3, (k + 1) // 3, k // 3)):
+            table = []
+            for i in range(_PATTERNS):
+                base = (t * _PATTERNS + i) * 16
+                mask = 0
+                for j in range(base, base + 2 * bits, 2):
+                    mask |= 1 << (int.from_bytes(stream[j:j + 2], "little") & 511)
+                table.append(mask)
+            tables.append(table)
+        tables = _pattern_tables[k] = tuple(tables)
+    return tables
+
+
+_HASH = struct.Struct("<QQ")
+_blake2b = hashlib.blake2b
+
+
+def _locate(key: bytes, blocks: int, tables: Tuple[List[int], ...]) -> Tuple[int, int]:
+    """(block index, bit mask) of a key. BloomFilter.__contains__ inlines the same steps."""
+    low, high = _HASH.unpack(_blake2b(key, digest_size=16).digest())
+    a, b, c = tables
+    return high % blocks, a[low & 1023] | b[(low >> 10) & 1023] | c[(low >> 20) & 1023]
+
+
+def bloom_size(entries: int, fp_rate: float) -> Tuple[int, int]:
+    """(blocks, k) for `entries` keys at roughly `fp_rate`."""
+    entries = max(1, entries)
+    bits = -entries * math.log(fp_rate) / (math.log(2) ** 2)
+    # Blocks fill unevenly, and patterns are drawn from finite tables; 50%
+    # more bits than a classic filter brings the measured rate back to target.
+    bits *= 1.5
+    k = max(2, min(_MAX_K, round(-math.log2(fp_rate))))
+    return max(1, math.ceil(bits / (_BLOCK_BYTES * 8))), k
+
+
+class BloomFilter:
+    """A compiled filter, memory-mapped read-only. `key in bloom` for lookups."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.k, self.blocks, self.entries = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._mm.close()
+            raise ValueError(f"{path}: not a v{_VERSION} blocklist filter")
+        if len(self._mm) != _HEADER.size + self.blocks * _BLOCK_BYTES:
+            self._mm.close()
+            raise ValueError(f"{path}: truncated filter")
+        self._tables = _patterns(self.k)
+
+    def __contains__(self, key: bytes) -> bool:
+        low, high = _HASH.unpack(_blake2b(key, digest_size=16).digest())
+        a, b, c = self._tables
+        mask = a[low & 1023] | b[(low >> 10) & 1023] | c[(low >> 20) & 1023]
+        offset = _HEADER.size + (high % self.blocks) * _BLOCK_BYTES
+        return int.from_bytes(self._mm[offset:offset + _BLOCK_BYTES], "little") & mask == mask
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._mm)
+
+    def close(self):
+        self._mm.close()
+
+    @staticmethod
+    def write(path: str, keys: Iterable[bytes], entries: int, fp_rate: float = BLOCKLIST_FP_RATE) -> int:
+        """
+        Builds a filter sized for `entries` keys (an upper bound is fine)
+        and writes it atomically. Returns the number of keys added.
+        """
+        blocks, k = bloom_size(entries, fp_rate)
+        tables = _patterns(k)
+        bits = bytearray(blocks * _BLOCK_BYTES)
+        added = 0
+        for key in keys:
+            block, mask = _locate(key, blocks, tables)
+            offset = block * _BLOCK_BYTES
+            current = int.from_bytes(bits[offset:offset + _BLOCK_BYTES], "little")
+            bits[offset:offset + _BLOCK_BYTES] = (current | mask).to_bytes(_BLOCK_BYTES, "little")
+            added += 1
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, k, blocks, added))
+            f.write(bits)
+        os.replace(tmp, path)
+        return added
+
+# =========================================================
+# BLOCKLIST
+# =========================================================
+def blocklist_key(kind: str, value: str) -> Optional[bytes]:
+    """Filter key of a raw indicator, or None when it does not normalize."""
+    normalized = NORMALIZERS[kind](value)
+    return None if normalized is None else f"{kind}:{normalized}".encode("utf-8")
+
+
+class Blocklist:
+    """
+    Known-bad domains, UPI handles and phone numbers, behind one Bloom
+    filter keyed "kind:normalized value". A hit can be a false positive
+    (at about the compiled rate); a miss is certain.
+    """
+
+    def __init__(self, bloom: Optional[BloomFilter] = None):
+        self.bloom = bloom
+        self.stats = {"checks": 0, "hits": 0}
+
+    def check(self, kind: str, value: str) -> Optional[str]:
+        """"kind:normalized" when `value` is listed, else None."""
+        if self.bloom is None:
+            return None
+        key = blocklist_key(kind, value)
+        if key is None:
+            return None
+        self.stats["checks"] += 1
+        if key in self.bloom:
+            self.stats["hits"] += 1
+            return key.decode("utf-8")
+        return None
+
+    def check_intel(self, intel) -> List[str]:
+        """Listed indicators among an Intelligence's links, UPI IDs and phones."""
+        if self.bloom is None:
+            return []
+        found = []
+        for field, kind in FIELD_KINDS.items():
+            for value in getattr(intel, field):
+                hit = self.check(kind, value)
+                if hit is not None and hit not in found:
+                    found.append(hit)
+        return found
+
+    def snapshot_stats(self) -> dict:
+        if self.bloom is None:
+            return {"loaded": False}
+        return dict(
+            self.stats,
+            loaded=True,
+            entries=self.bloom.entries,
+            bytes=self.bloom.size_bytes,
+            hashes=self.bloom.k,
+        )
+
+
+def load_blocklist(path: str = BLOCKLIST_PATH) -> Blocklist:
+    if not path or not os.path.exists(path):
+        print(f"⚠️ No blocklist at {path!r}; indicators are not checked against known-bad lists.")
+        return Blocklist()
+    try:
+        bloom = BloomFilter(path)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not load blocklist {path!r}: {e}")
+        return Blocklist()
+    print(f"🛡️ Blocklist: {bloom.entries:,} entries, {bloom.size_bytes / 1e6:.1f} MB mapped")
+    return Blocklist(bloom)
+
+# =========================================================
+# COMPILER CLI
+# =========================================================
+# Sources are plain text, one entry per line, "#" for comments; raw
+# entries are fine ("https://Login.Evil.co.in/x", "+91 98765 43210"), the
+# compiler normalizes them like live indicators.
+#
+#   python blocklist.py compile --domains domains.txt --upi upi.txt --phones phones.txt -o blocklist.bloom
+#   python blocklist.py check blocklist.bloom domain http://login.evil.co.in/kyc
+
+
+def read_entries(path: str) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+def count_lines(paths: Iterable[str]) -> int:
+    total = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            total += sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b"")) + 1
+    return total
+
+
+def compile_lists(sources: Dict[str, List[str]], output: str, fp_rate: float = BLOCKLIST_FP_RATE) -> dict:
+    """sources: kind -> list files. Sized from a line count, so the lists are read twice, never held in memory."""
+    start = time.perf_counter()
+    skipped = {kind: 0 for kind in sources}
+
+    def keys():
+        for kind, paths in sources.items():
+            for path in paths:
+                for entry in read_entries(path):
+                    key = blocklist_key(kind, entry)
+                    if key is None:
+                        skipped[kind] += 1
+                    else:
+                        yield key
+
+    upper_bound = count_lines(p for paths in sources.values() for p in paths)
+    added = BloomFilter.write(output, keys(), upper_bound, fp_rate)
+    return {
+        "entries": added,
+        "skipped": skipped,
+        "bytes": os.path.getsize(output),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compile and query scam indicator blocklists.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("compile", help="compile list files into a Bloom filter")
+    build.add_argument("--domains", action="append", default=[], help="domain / URL list (repeatable)")
+    build.add_argument("--upi", action="append", default=[], help="UPI handle list (repeatable)")
+    build.add_argument("--phones", action="append", default=[], help="phone number list (repeatable)")
+    build.add_argument("--fp-rate", type=float, default=BLOCKLIST_FP_RATE)
+    build.add_argument("-o", "--output", default=BLOCKLIST_PATH)
+    query = sub.add_parser("check", help="look values up in a compiled filter")
+    query.add_argument("path")
+    query.add_argument("kind", choices=sorted(NORMALIZERS))
+    query.add_argument("values", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "compile":
+        sources = {kind: paths for kind, paths in
+                   (("domain", args.domains), ("upi", args.upi), ("phone", args.phones)) if paths}
+        if not sources:
+            parser.error("give at least one of --domains, --upi, --phones")
+        report = compile_lists(sources, args.output, args.fp_rate)
+        print(f"🛡️ {report['entries']:,} entries -> {args.output} ({report['bytes'] / 1e6:.1f} MB) "
+              f"in {report['seconds']}s; skipped {report['skipped']}")
+        return 0
+
+    blocklist = Blocklist(BloomFilter(args.path))
+    for value in args.values:
+        hit = blocklist.check(args.kind, value)
+        print(f"{value}\t{'LISTED ' + hit if hit else 'not listed'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+import heapq
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from metrics import CALLBACK_FAILURES, CALLBACK_SECONDS, CALLBACKS_DROPPED
+
+# =========================================================
+# CONFIG
+# =========================================================
+GUVI_CALLBACK_URL = os.getenv(
+    "GUVI_CALLBACK_URL", "https://hackathon.guvi.in/api/updateHoneyPotFinalResult"
+)
+CALLBACK_WORKERS = int(os.getenv("CALLBACK_WORKERS", "4"))
+CALLBACK_MAX_ATTEMPTS = int(os.getenv("CALLBACK_MAX_ATTEMPTS", "6"))
+CALLBACK_TIMEOUT = float(os.getenv("CALLBACK_TIMEOUT", "5"))
+CALLBACK_SPOOL = os.getenv("CALLBACK_SPOOL", "callback_spool.jsonl")
+
+# Rewrite the spool once this many records have been appended since the
+# last compaction, so it only ever holds roughly the outstanding work.
+SPOOL_COMPACT_RECORDS = 10_000
+
+# =========================================================
+# CALLBACK DISPATCHER
+# =========================================================
+class CallbackDispatcher:
+    """
+    Delivers GUVI callbacks from background threads so the reply path
+    never waits on the evaluation endpoint.
+
+    - One pending payload per session: a newer snapshot replaces an unsent
+      one instead of queueing behind it.
+    - Failed posts are retried with jittered exponential backoff.
+    - Every submit/ack is appended to a JSONL spool; outstanding payloads
+      are replayed on start(), so a restart does not drop callbacks. The
+      spool is written (and compacted) by its own thread: submit() only
+      queues the record, so the event loop never touches the file.
+    """
+
+    def __init__(
+        self,
+        url: str = GUVI_CALLBACK_URL,
+        workers: int = CALLBACK_WORKERS,
+        max_attempts: int = CALLBACK_MAX_ATTEMPTS,
+        timeout: float = CALLBACK_TIMEOUT,
+        spool_path: Optional[str] = CALLBACK_SPOOL,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ):
+        self.url = url
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.spool_path = spool_path
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._http = None
+        self._http_lock = threading.Lock()
+
+        lock = threading.RLock()
+        self._cond = threading.Condition(lock)
+        self._spool_cond = threading.Condition(lock)
+        self._pending: Dict[str, Tuple[int, dict, int]] = {}  # sid -> (seq, payload, attempts)
+        self._heap = []  # (due_time, seq, sid)
+        self._scheduled = set()
+        self._inflight: Dict[str, Tuple[int, dict]] = {}
+        self._threads = []
+        self._running = False
+        self._seq = 0
+        self._spool = None
+        self._spool_records = 0
+        self._spool_queue = []
+        self._spool_thread = None
+        self._spool_running = False
+
+        self.stats = {"submitted": 0, "coalesced": 0, "sent": 0, "retried": 0, "failed": 0}
+
+    @property
+    def http(self):
+        """The pooled requests session, built on first use (requests is a slow import)."""
+        if self._http is None:
+            with self._http_lock:
+                if self._http is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    http = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(self.workers, 1))
+                    http.mount("http://", adapter)
+                    http.mount("https://", adapter)
+                    self._http = http
+        return self._http
+
+    def warm(self, timeout: float = 5.0) -> bool:
+        """
+        Opens a pooled connection to the callback host (DNS, TCP, TLS) so
+        the first real callback does not pay for it. Any HTTP answer will
+        do; only a transport error counts as a failure.
+        """
+        try:
+            self.http.head(self.url, timeout=timeout)
+            return True
+        except Exception as e:
+            print(f"⚠️ Callback warm-up failed: {e}")
+            return False
+
+    # -----------------------------------------------------
+    # Lifecycle
+    # -----------------------------------------------------
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            if self.spool_path:
+                self._replay_spool()
+                self._spool_running = True
+                self._spool_thread = threading.Thread(target=self._spool_writer, name="guvi-callback-spool",
+                                                      daemon=True)
+                self._spool_thread.start()
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f"guvi-callback-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def stop(self, timeout: float = 5.0):
+        """Stops the workers. Anything unsent stays in the spool."""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads = []
+        # After the workers, so their last acks make it into the final compaction.
+        if self._spool_thread is not None:
+            with self._cond:
+                self._spool_running = False
+                self._spool_cond.notify()
+            self._spool_thread.join(timeout=timeout)
+            self._spool_thread = None
+
+    def submit(self, session_id: str, payload: dict):
+        """Queues the latest intelligence snapshot for a session. Never blocks on I/O."""
+        if not self._running:
+            self.start()
+        with self._cond:
+            self._seq += 1
+            self.stats["submitted"] += 1
+            self._spool_write({"op": "put", "seq": self._seq, "sessionId": session_id, "payload": payload})
+            if session_id in self._pending:
+                self.stats["coalesced"] += 1
+                attempts = self._pending[session_id][2]
+            else:
+                attempts = 0
+            self._pending[session_id] = (self._seq, payload, attempts)
+            if session_id not in self._scheduled and session_id not in self._inflight:
+                self._schedule(session_id, 0.0)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending) + len(self._inflight)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Waits until nothing is pending or in flight. Used by tests and shutdown."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.pending() == 0:
+                return True
+            time.sleep(0.01)
+        return False
+
+    # -----------------------------------------------------
+    # Workers
+    # -----------------------------------------------------
+    def _schedule(self, session_id: str, delay: float):
+        heapq.heappush(self._heap, (time.monotonic() + delay, self._seq, session_id))
+        self._scheduled.add(session_id)
+        self._cond.notify()
+
+    def _next(self):
+        with self._cond:
+            while self._running:
+                now = time.monotonic()
+                if self._heap and self._heap[0][0] <= now:
+                    _, _, sid = heapq.heappop(self._heap)
+                    self._scheduled.discard(sid)
+                    entry = self._pending.pop(sid, None)
+                    if entry is None:
+                        continue
+                    self._inflight[sid] = entry[:2]
+                    return sid, entry
+                self._cond.wait(self._heap[0][0] - now if self._heap else None)
+            return None
+
+    def _worker(self):
+        while True:
+            job = self._next()
+            if job is None:
+                return
+            sid, (seq, payload, attempts) = job
+            ok = self._post(sid, payload)
+            with self._cond:
+                del self._inflight[sid]
+                if ok:
+                    self.stats["sent"] += 1
+                    self._spool_write({"op": "ack", "seq": seq, "sessionId": sid})
+                elif sid in self._pending:
+                    # A newer snapshot arrived while this one was failing; send that instead.
+                    pass
+                elif attempts + 1 >= self.max_attempts:
+                    self.stats["failed"] += 1
+                    CALLBACKS_DROPPED.inc()
+                    print(f"❌ Callback dropped for {sid} after {attempts + 1} attempts")
+                    self._spool_write({"op": "ack", "seq": seq, "sessionId": sid})
+                else:
+                    self.stats["retried"] += 1
+                    self._pending[sid] = (seq, payload, attempts + 1)
+                    delay = min(self.backoff_max, self.backoff_base * (2 ** attempts))
+                    self._schedule(sid, random.uniform(delay / 2, delay))
+                    continue
+                if sid in self._pending and sid not in self._scheduled:
+                    self._schedule(sid, 0.0)
+
+    def _post(self, session_id: str, payload: dict) -> bool:
+        start = time.perf_counter()
+        try:
+            response = self.http.post(self.url, json=payload, timeout=self.timeout)
+            if 200 <= response.status_code < 300:
+                print(f"✅ Callback Success for {session_id}")
+                return True
+            print(f"⚠️ Callback Failed: {response.status_code} - {response.text[:200]}")
+        except Exception as e:
+            print(f"❌ Callback Error: {e}")
+        finally:
+            CALLBACK_SECONDS.observe(time.perf_counter() - start)
+        CALLBACK_FAILURES.inc()
+        return False
+
+    # -----------------------------------------------------
+    # Spool
+    # -----------------------------------------------------
+    def _replay_spool(self):
+        outstanding = {}
+        if os.path.exists(self.spool_path):
+            with open(self.spool_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # torn write from a crash
+                    sid = rec.get("sessionId")
+                    self._seq = max(self._seq, rec.get("seq", 0))
+                    if rec.get("op") == "put":
+                        outstanding[sid] = (rec["seq"], rec["payload"])
+                    elif rec.get("op") == "ack" and sid in outstanding and outstanding[sid][0] <= rec["seq"]:
+                        del outstanding[sid]
+        for sid, (seq, payload) in outstanding.items():
+            self._pending[sid] = (seq, payload, 0)
+            self._schedule(sid, 0.0)
+        if outstanding:
+            print(f"📦 Replaying {len(outstanding)} spooled callbacks")
+        self._compact_spool()
+
+    def _outstanding(self) -> Dict[str, Tuple[int, dict]]:
+        outstanding = dict(self._inflight)
+        outstanding.update((sid, entry[:2]) for sid, entry in self._pending.items())
+        return outstanding
+
+    def _compact_spool(self, outstanding: Optional[Dict[str, Tuple[int, dict]]] = None):
+        """Rewrites the spool as just the outstanding payloads. Spool thread (or start()) only."""
+        if outstanding is None:
+            with self._cond:
+                outstanding = self._outstanding()
+        if self._spool:
+            self._spool.close()
+        tmp = self.spool_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for sid, (seq, payload) in outstanding.items():
+                f.write(json.dumps({"op": "put", "seq": seq, "sessionId": sid, "payload": payload}) + "\n")
+        os.replace(tmp, self.spool_path)
+        self._spool = open(self.spool_path, "a", encoding="utf-8")
+        self._spool_records = len(outstanding)
+
+    def _spool_write(self, record: dict):
+        """Queues a spool record; called with self._cond held."""
+        if not self.spool_path:
+            return
+        self._spool_queue.append(record)
+        self._spool_cond.notify()
+
+    def _spool_writer(self):
+        while True:
+            with self._cond:
+                while self._spool_running and not self._spool_queue:
+                    self._spool_cond.wait()
+                records, self._spool_queue = self._spool_queue, []
+                stopping = not self._spool_running
+                # A compaction writes the state every queued record has
+                # already been applied to, so the batch itself is dropped.
+                outstanding = None
+                if stopping or self._spool_records + len(records) >= SPOOL_COMPACT_RECORDS:
+                    outstanding = self._outstanding()
+            try:
+                if outstanding is not None:
+                    self._compact_spool(outstanding)
+                elif records:
+                    self._spool.write("".join(json.dumps(r) + "\n" for r in records))
+                    self._spool.flush()
+                    self._spool_records += len(records)
+            except OSError as e:
+                print(f"⚠️ Callback spool write failed: {e}")
+            if stopping:
+                if self._spool:
+                    self._spool.close()
+                    self._spool = None
+                return
@@ -0,0 +1,266 @@
+import asyncio
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+# =========================================================
+# CONFIG
+# =========================================================
+# LLM_CASSETTE=path turns record/replay on for every Groq client created by
+# the app and the simulation scripts.
+#   record  - call the provider and write a fresh cassette
+#   replay  - serve only from the cassette; a miss raises CassetteMiss
+#   auto    - replay what is recorded, record anything new
+# LLM_CASSETTE_LATENCY: "0" replays instantly, "recorded" sleeps for the
+# latency seen while recording, a number sleeps that many seconds.
+LLM_CASSETTE = os.getenv("LLM_CASSETTE")
+LLM_CASSETTE_MODE = os.getenv("LLM_CASSETTE_MODE", "replay")
+LLM_CASSETTE_LATENCY = os.getenv("LLM_CASSETTE_LATENCY", "0")
+
+MODES = ("record", "replay", "auto")
+
+# Identical requests from different conversations are told apart by the
+# scope, when the caller sets one (the simulation engine scopes each
+# conversation). Without a scope they replay in recorded order.
+_scope: contextvars.ContextVar[str] = contextvars.ContextVar("cassette_scope", default="")
+
+
+@contextmanager
+def scope(name: str):
+    token = _scope.set(name)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+class CassetteMiss(LookupError):
+    """Replay mode got a request that was never recorded."""
+
+
+def fingerprint(request: dict, scope_name: str = "") -> str:
+    """Stable hash of everything that affects the completion."""
+    canonical = json.dumps(
+        {k: v for k, v in request.items() if v is not None},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(f"{scope_name}\x00{canonical}".encode("utf-8")).hexdigest()[:32]
+
+# =========================================================
+# CASSETTE
+# =========================================================
+class Cassette:
+    """
+    Append-only cassette file, one interaction per line:
+
+        <fingerprint>\\t<occurrence>\\t<latency ms>\\t<compact JSON response>
+
+    Loading builds an in-memory index from the first three fields only;
+    responses are read and parsed when they are replayed. The nth call with
+    a given fingerprint replays the nth recorded response, so repeated
+    identical prompts get the same varied answers they got when recorded.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", latency: str = "0"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}, expected one of {MODES}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[int, tuple]] = {}  # fp -> {occurrence: (offset, latency_ms)}
+        self._served: Dict[str, int] = {}
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0}
+
+        if mode == "record" or not os.path.exists(path):
+            open(path, "w", encoding="utf-8").close()
+        else:
+            self._load()
+        self._writer = open(path, "ab")
+        self._reader = open(path, "rb")
+
+    def _load(self):
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                parts = line.split(b"\t", 3)
+                if len(parts) == 4 and line.endswith(b"\n"):
+                    fp, n, latency = parts[0].decode(), int(parts[1]), float(parts[2])
+                    # Concurrent recordings finish out of order; keep the first copy of each.
+                    self._index.setdefault(fp, {}).setdefault(
+                        n, (offset + len(parts[0]) + len(parts[1]) + len(parts[2]) + 3, latency)
+                    )
+                offset += len(line)
+
+    def close(self):
+        with self._lock:
+            self._writer.close()
+            self._reader.close()
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._index.values())
+
+    # -----------------------------------------------------
+    # Lookup / record
+    # -----------------------------------------------------
+    def _next(self, fp: str):
+        """The recorded (response, latency) for the next call with `fp`, or None to go live."""
+        with self._lock:
+            n = self._served.get(fp, 0)
+            entry = self._index.get(fp, {}).get(n)
+            if self.mode != "record" and entry is not None:
+                self._served[fp] = n + 1
+                offset, latency = entry
+                self._reader.seek(offset)
+                data = json.loads(self._reader.readline())
+                self.stats["hits"] += 1
+                return data, latency
+            self.stats["misses"] += 1
+        if self.mode == "replay":
+            raise CassetteMiss(f"No recording #{n} for request {fp} in {self.path}")
+        return None
+
+    def _record(self, fp: str, data, latency_ms: float):
+        # Occurrences are numbered when a live call succeeds, so failed
+        # attempts and retries leave no gaps for replay to trip over.
+        body = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            n = self._served.get(fp, 0)
+            self._served[fp] = n + 1
+            self._writer.seek(0, os.SEEK_END)
+            offset = self._writer.tell()
+            header = f"{fp}\t{n}\t{latency_ms:.1f}\t".encode()
+            self._writer.write(header + body + b"\n")
+            self._writer.flush()
+            self._index.setdefault(fp, {}).setdefault(n, (offset + len(header), latency_ms))
+            self.stats["recorded"] += 1
+
+    def _delay(self, latency_ms: float) -> float:
+        if self.latency == "recorded":
+            return latency_ms / 1000
+        return float(self.latency or 0)
+
+    # -----------------------------------------------------
+    # Client wrappers
+    # -----------------------------------------------------
+    def wrap(self, create):
+        """Wraps a sync `chat.completions.create`."""
+        def cassette_create(**kwargs):
+            fp = fingerprint(kwargs, _scope.get())
+            hit = self._next(fp)
+            stream = bool(kwargs.get("stream"))
+            if hit is not None:
+                data, latency_ms = hit
+                delay = self._delay(latency_ms)
+                if delay:
+                    time.sleep(delay)
+                ChatCompletion, ChatCompletionChunk = _completion_types()
+                if stream:
+                    return iter([ChatCompletionChunk.model_validate(c) for c in data])
+                return ChatCompletion.model_validate(data)
+
+            start = time.perf_counter()
+            result = create(**kwargs)
+            if stream:
+                return self._tee(fp, result, start)
+            self._record(fp, result.model_dump(mode="json"), (time.perf_counter() - start) * 1000)
+            return result
+
+        return cassette_create
+
+    def _tee(self, fp, stream, start):
+        chunks = []
+        try:
+            for chunk in stream:
+                chunks.append(chunk.model_dump(mode="json"))
+                yield chunk
+        finally:
+            stream.close()  # a no-op once the stream has been read to the end
+        self._record(fp, chunks, (time.perf_counter() - start) * 1000)
+
+    def wrap_async(self, create):
+        """Wraps an async `chat.completions.create`."""
+        async def cassette_create(**kwargs):
+            fp = fingerprint(kwargs, _scope.get())
+            hit = self._next(fp)
+            stream = bool(kwargs.get("stream"))
+            if hit is not None:
+                data, latency_ms = hit
+                delay = self._delay(latency_ms)
+                if delay:
+                    await asyncio.sleep(delay)
+                ChatCompletion, ChatCompletionChunk = _completion_types()
+                if stream:
+                    return _replay_stream([ChatCompletionChunk.model_validate(c) for c in data])
+                return ChatCompletion.model_validate(data)
+
+            start = time.perf_counter()
+            result = await create(**kwargs)
+            if stream:
+                return self._tee_async(fp, result, start)
+            self._record(fp, result.model_dump(mode="json"), (time.perf_counter() - start) * 1000)
+            return result
+
+        return cassette_create
+
+    async def _tee_async(self, fp, stream, start):
+        chunks = []
+        try:
+            async for chunk in stream:
+                chunks.append(chunk.model_dump(mode="json"))
+                yield chunk
+        finally:
+            await stream.close()  # a no-op once the stream has been read to the end
+        self._record(fp, chunks, (time.perf_counter() - start) * 1000)
+
+    def install(self, client):
+        """Routes a Groq or AsyncGroq client's completions through the cassette."""
+        completions = client.chat.completions
+        original = completions.create
+        if asyncio.iscoroutinefunction(original):
+            completions.create = self.wrap_async(original)
+        else:
+            completions.create = self.wrap(original)
+        return client
+
+
+async def _replay_stream(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def _completion_types():
+    # Imported on first replay rather than with the module, so the app's
+    # import does not pull in the SDK's type tree.
+    from groq.types.chat import ChatCompletion, ChatCompletionChunk
+    return ChatCompletion, ChatCompletionChunk
+
+# =========================================================
+# PROCESS-WIDE CASSETTE
+# =========================================================
+_active: Optional[Cassette] = None
+_active_lock = threading.Lock()
+
+
+def active_cassette() -> Optional[Cassette]:
+    """The cassette configured by LLM_CASSETTE, opened once per process."""
+    global _active
+    if not LLM_CASSETTE:
+        return None
+    with _active_lock:
+        if _active is None:
+            _active = Cassette(LLM_CASSETTE, LLM_CASSETTE_MODE, LLM_CASSETTE_LATENCY)
+            print(f"📼 LLM cassette {LLM_CASSETTE} ({LLM_CASSETTE_MODE}, {len(_active)} recorded)")
+        return _active
+
+
+def install_cassette(client):
+    """Installs the configured cassette on a client; a no-op when none is set."""
+    cassette = active_cassette()
+    return cassette.install(client) if cassette is not None else client
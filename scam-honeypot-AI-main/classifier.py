@@ -0,0 +1,312 @@
+import json
+import math
+import os
+import random
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from extraction import Intelligence
+from reply_cache import normalize
+
+# =========================================================
+# CONFIG
+# =========================================================
+# Trained by train_classifier.py. A missing file disables the classifier
+# and the app falls back to "any extraction hit is a scam".
+CLASSIFIER_MODEL = os.getenv("CLASSIFIER_MODEL", "classifier_model.json")
+# Overrides for the thresholds stored in the model file.
+SCAM_THRESHOLD = os.getenv("SCAM_THRESHOLD")
+BENIGN_THRESHOLD = os.getenv("BENIGN_THRESHOLD")
+# Answer clearly benign and repeated messages from the stall bank.
+CLASSIFIER_FAST_PATH = os.getenv("CLASSIFIER_FAST_PATH", "1") == "1"
+
+MODEL_FORMAT = "hashed-ngram-logreg"
+MODEL_VERSION = 1
+DEFAULT_BUCKETS = 1 << 18
+
+# =========================================================
+# FEATURES
+# =========================================================
+# Words, with every digit run folded to its length class, so "Rs 499" and
+# "Rs 999" or two phone numbers share features. "@", "://" and currency
+# marks are kept as tokens: they carry most of the signal in UPI IDs,
+# links and amounts.
+_TOKEN = re.compile(r"[a-z]+|\d+|://|[@$₹!?]")
+
+
+def _digit_class(run: str) -> str:
+    n = len(run)
+    return "<num>" if n < 6 else "<phone>" if n == 10 else "<longnum>"
+
+
+def tokens(text: str) -> List[str]:
+    return [_digit_class(t) if t[0].isdigit() else t for t in _TOKEN.findall(text.lower())]
+
+
+_WORD_CACHE: Dict[str, Tuple[int, Tuple[int, ...]]] = {}
+_WORD_CACHE_MAX = 50000
+
+
+def _word(token: str) -> Tuple[int, Tuple[int, ...]]:
+    """(unigram hash, character trigram hashes) of a token, cached."""
+    cached = _WORD_CACHE.get(token)
+    if cached is None:
+        grams = ()
+        if len(token) > 3 and token[0] != "<":
+            padded = "^" + token + "$"
+            grams = tuple(zlib.crc32(("c:" + padded[i:i + 3]).encode("utf-8")) for i in range(len(padded) - 2))
+        cached = (zlib.crc32(("w:" + token).encode("utf-8")), grams)
+        if len(_WORD_CACHE) >= _WORD_CACHE_MAX:
+            _WORD_CACHE.clear()
+        _WORD_CACHE[token] = cached
+    return cached
+
+
+def features(text: str, buckets: int = DEFAULT_BUCKETS) -> List[int]:
+    """
+    Hashed feature indices, with repeats (counts): word unigrams and
+    bigrams, plus character trigrams of each word so misspellings
+    ("verfy", "acount") still land near the real word. crc32 rather than
+    hash(), which is salted per process; per-word hashes are cached, and a
+    bigram's index is mixed from its two words' hashes instead of hashing
+    the pair's text.
+    """
+    mask = buckets - 1
+    found = []
+    previous = None
+    for tok in tokens(text):
+        h, grams = _word(tok)
+        found.append(h & mask)
+        found.extend(g & mask for g in grams)
+        if previous is not None:
+            found.append(((previous * 0x9E3779B1) ^ h) & mask)
+        previous = h
+    return found
+
+def _scale(n: int) -> float:
+    # Every feature counts 1/sqrt(n), so a long message does not push the
+    # score to 0 or 1 just by having more words.
+    return 1.0 / math.sqrt(n) if n else 0.0
+
+# =========================================================
+# MODEL
+# =========================================================
+class ScamClassifier:
+    """
+    Logistic regression over hashed n-gram features.
+
+    Weights are sparse (only features seen in training). A word's
+    unigram and trigram weights always add up the same, so score() caches
+    that sum per word and only looks up bigrams per message: tens of
+    microseconds for a chat message. The file is JSON: format/version,
+    bucket count, bias, thresholds and {index: weight}.
+    """
+
+    def __init__(self, weights: Dict[int, float], bias: float = 0.0, buckets: int = DEFAULT_BUCKETS,
+                 scam_threshold: float = 0.5, benign_threshold: float = 0.05):
+        self.weights = weights
+        self.bias = bias
+        self.buckets = buckets
+        self.scam_threshold = scam_threshold
+        self.benign_threshold = benign_threshold
+        self._word_scores: Dict[str, float] = {}
+
+    def _word_score(self, token: str) -> Tuple[int, float, int]:
+        h, grams = _word(token)
+        score = self._word_scores.get(token)
+        if score is None:
+            w, mask = self.weights, self.buckets - 1
+            score = w.get(h & mask, 0.0) + sum(w.get(g & mask, 0.0) for g in grams)
+            if len(self._word_scores) >= _WORD_CACHE_MAX:
+                self._word_scores.clear()
+            self._word_scores[token] = score
+        return h, score, 1 + len(grams)
+
+    def score(self, text: str) -> float:
+        """Probability that `text` is a scam message. Same model as features() + _scale()."""
+        w, mask = self.weights, self.buckets - 1
+        total = 0.0
+        n = 0
+        previous = None
+        for tok in tokens(text):
+            h, s, k = self._word_score(tok)
+            total += s
+            n += k
+            if previous is not None:
+                total += w.get(((previous * 0x9E3779B1) ^ h) & mask, 0.0)
+                n += 1
+            previous = h
+        z = self.bias + total * _scale(n)
+        if z < -30:
+            return 0.0
+        return 1.0 / (1.0 + math.exp(-z))
+
+    def is_scam(self, text: str) -> bool:
+        return self.score(text) >= self.scam_threshold
+
+    def is_benign(self, text: str) -> bool:
+        return self.score(text) < self.benign_threshold
+
+    # -----------------------------------------------------
+    # Training
+    # -----------------------------------------------------
+    @classmethod
+    def train(cls, samples: Sequence[Tuple[str, int]], epochs: int = 20, lr: float = 1.0,
+              l2: float = 1e-4, buckets: int = DEFAULT_BUCKETS, seed: int = 1) -> "ScamClassifier":
+        """SGD on log loss; `samples` are (text, label) with label 1 = scam."""
+        rows = [(features(text, buckets), label) for text, label in samples]
+        # Balance the classes, so a skewed corpus does not just move the bias.
+        pos = sum(label for _, label in rows) or 1
+        neg = (len(rows) - pos) or 1
+        class_weight = {1: len(rows) / (2 * pos), 0: len(rows) / (2 * neg)}
+        weights: Dict[int, float] = {}
+        bias = 0.0
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(rows)
+            step = lr / (1 + epoch)
+            for feats, label in rows:
+                x = _scale(len(feats))
+                z = bias + x * sum(weights.get(i, 0.0) for i in feats)
+                p = 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+                g = (p - label) * class_weight[label]
+                bias -= step * g
+                for i in feats:
+                    w = weights.get(i, 0.0)
+                    weights[i] = w - step * (g * x + l2 * w)
+        return cls(weights, bias, buckets)
+
+    # -----------------------------------------------------
+    # Serialization
+    # -----------------------------------------------------
+    def to_dict(self) -> dict:
+        return {
+            "format": MODEL_FORMAT,
+            "version": MODEL_VERSION,
+            "buckets": self.buckets,
+            "bias": round(self.bias, 6),
+            "scamThreshold": self.scam_threshold,
+            "benignThreshold": self.benign_threshold,
+            "weights": {str(i): round(w, 6) for i, w in sorted(self.weights.items()) if abs(w) >= 1e-6},
+        }
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "ScamClassifier":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != MODEL_FORMAT or data.get("version") != MODEL_VERSION:
+            raise ValueError(f"{path}: unsupported model {data.get('format')} v{data.get('version')}")
+        return cls(
+            {int(i): w for i, w in data["weights"].items()},
+            data["bias"],
+            data["buckets"],
+            float(SCAM_THRESHOLD) if SCAM_THRESHOLD else data["scamThreshold"],
+            float(BENIGN_THRESHOLD) if BENIGN_THRESHOLD else data["benignThreshold"],
+        )
+
+
+def load_classifier(path: str = CLASSIFIER_MODEL) -> Optional[ScamClassifier]:
+    if not path or not os.path.exists(path):
+        print(f"⚠️ No classifier model at {path!r}; scam detection falls back to extraction hits.")
+        return None
+    try:
+        return ScamClassifier.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️ Could not load classifier model {path!r}: {e}")
+        return None
+
+
+def detect_scam(intel: Intelligence, texts: Iterable[str], classifier: Optional[ScamClassifier],
+                blocklist=None) -> bool:
+    """
+    Whether the messages `intel` was extracted from are a scam; the one
+    rule for live turns and /extract/batch. Blocklist hits are added to
+    intel.knownBadIndicators first. A UPI ID, account number, IFSC, link
+    or blocklist hit settles it; for keyword- or phone-only findings the
+    classifier decides, and without a model extraction's own verdict
+    stands.
+    """
+    if blocklist is not None:
+        for key in blocklist.check_intel(intel):
+            intel.add("knownBadIndicators", key)
+    if intel.has_hard_indicator():
+        return True
+    if classifier is None:
+        return intel.scamDetected
+    return any(classifier.is_scam(text) for text in texts if text)
+
+# =========================================================
+# STALL REPLIES (FAST PATH)
+# =========================================================
+# Messages that do not need the LLM: clearly benign ones, and a scammer
+# re-sending a line already in the conversation. Replies keep the persona
+# (a slightly confused, cooperative person) without committing to anything.
+BENIGN_REPLIES = (
+    "Hello, who is this?",
+    "Sorry, I don't think I have your number saved. Who is this?",
+    "Hi! Do I know you?",
+    "Okay. What is this about?",
+)
+REPEAT_REPLIES = (
+    "Sorry, I didn't understand. Can you explain again slowly?",
+    "I am trying, please wait, my phone is very slow today.",
+    "One minute, my son usually helps me with these things.",
+    "The app is still loading. What should I do after that?",
+    "Ok ok, I am doing it. Don't get angry please.",
+)
+
+# Overload (see admission.py): every turn is answered from here while the
+# LLM queue is backed up. They keep the scammer talking and re-sending
+# details, which extraction still picks up.
+DEGRADED_REPLIES = (
+    "Sorry, my network is very bad right now. Can you send that again?",
+    "Wait, the message came broken. Please send the details once more.",
+    "Hello? Your message is not loading properly, please repeat.",
+    "I am outside, signal is weak. Tell me again what I should do?",
+    "Sorry sir, I missed that. Which number or ID should I use?",
+)
+
+# Anything that looks like a payment detail or link always goes to the
+# LLM, whatever the score: that is where engagement pays off.
+_INDICATOR_HINT = re.compile(r"@|://|\d{6,}")
+
+
+def _pick(replies: Sequence[str], session_id: str, turn: int) -> str:
+    # Stable per session, different from one turn to the next.
+    return replies[(zlib.crc32(session_id.encode("utf-8")) + turn) % len(replies)]
+
+
+def degraded_reply(session_id: str = "", history: Optional[list] = None) -> str:
+    return _pick(DEGRADED_REPLIES, session_id, len(history or []))
+
+
+def is_repeat(text: str, history: Iterable) -> bool:
+    """True if the scammer already sent this message (up to numbers, case and spacing)."""
+    key = normalize(text)
+    for item in history:
+        if isinstance(item, dict) and item.get("sender", "scammer") == "scammer":
+            if normalize(str(item.get("text", ""))) == key:
+                return True
+    return False
+
+
+def fast_path_reply(classifier: Optional[ScamClassifier], text: str, session_id: str = "",
+                    history: Optional[list] = None) -> Optional[Tuple[str, str]]:
+    """
+    (reason, reply) when the message can be answered without the LLM,
+    else None. Reasons: "benign", "repeat".
+    """
+    if not CLASSIFIER_FAST_PATH:
+        return None
+    history = history or []
+    turn = len(history)
+    if history and is_repeat(text, history):
+        return "repeat", _pick(REPEAT_REPLIES, session_id, turn)
+    if classifier is not None and not _INDICATOR_HINT.search(text) and classifier.is_benign(text):
+        return "benign", _pick(BENIGN_REPLIES, session_id, turn)
+    return None
@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# Importing main opens a transcript log and a callback spool; keep test
+# runs from writing them into the checkout (or into a real deployment's
+# files, if the shell has these set).
+_SCRATCH = tempfile.TemporaryDirectory(prefix="honeypot-tests-")
+os.environ["TRANSCRIPT_LOG"] = os.path.join(_SCRATCH.name, "transcript_log.jsonl")
+os.environ["CALLBACK_SPOOL"] = os.path.join(_SCRATCH.name, "callback_spool.jsonl")
@@ -0,0 +1,14 @@
+# =========================================================
+# TEST DOUBLES
+# =========================================================
+# Shared by the unit tests; nothing here is imported by the app.
+
+
+class FakeClock:
+    """A clock for code that takes `clock=`; tests move time by setting .now."""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
@@ -1,83 +1,335 @@
-import re
+import argparse
+import codecs
 import html
+import io
+import os
+import re
+import unicodedata
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from transcript_store import SIM_TRANSCRIPT_LOG, TranscriptReader
+
+# =========================================================
+# CONFIG
+# =========================================================
+PAGE_SIZE = 200  # chat bubbles per page
+SNIFF_BYTES = 4096
+
+# The simulators print with emoji prefixes. auto_chat_runner.py says
+# HONEYPOT, standalone_simulation.py says HONEYPOINT.
+ROLE_PREFIXES = {
+    "🔴 SPAMMER:": "Spammer",
+    "🟢 HONEYPOT:": "Honeypot",
+    "🟢 HONEYPOINT:": "Honeypot",
+}
+LEVEL_HEADER = re.compile(r"^STARTING (.+?)\s*$")
+SCENARIO_HEADER = re.compile(r"^🎬 SCENARIO:\s*(.+?)\s*$")
+SEPARATOR = re.compile(r"^(?:-{10,}|={10,})")
+NON_ASCII_RUN = re.compile(r"[^\x00-\x7f]+")
+
+# =========================================================
+# DECODING
+# =========================================================
+def detect_encoding(path: str) -> str:
+    """
+    BOM first, then NUL-byte layout for BOM-less UTF-16, then UTF-8.
+    Logs captured with PowerShell's `>` are UTF-16 LE with a BOM.
+    """
+    with open(path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith(codecs.BOM_UTF16_LE) or head.startswith(codecs.BOM_UTF16_BE):
+        return "utf-16"
+    if len(head) >= 2:
+        odd_nuls = head[1::2].count(0)
+        even_nuls = head[0::2].count(0)
+        if odd_nuls > len(head) // 4 and even_nuls == 0:
+            return "utf-16-le"
+        if even_nuls > len(head) // 4 and odd_nuls == 0:
+            return "utf-16-be"
+    try:
+        # A cut multi-byte sequence at the end of the sample is fine.
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp1252"
+
+
+def repair_mojibake(line: str) -> str:
+    """
+    Undoes UTF-8 that was decoded as the console's cp437 before being
+    re-encoded ("≡ƒö┤" back to "🔴"). Each non-ASCII run is repaired on
+    its own and left as-is when it does not round-trip, so genuine
+    accented text survives.
+    """
+    if line.isascii():
+        return line
+
+    def fix(match):
+        run = match.group(0)
+        try:
+            return run.encode("cp437").decode("utf-8")
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            return run
+
+    return NON_ASCII_RUN.sub(fix, line)
+
+
+def iter_lines(path: str, encoding: Optional[str] = None) -> Iterator[str]:
+    """Decoded, repaired lines without their line endings, one at a time."""
+    encoding = encoding or detect_encoding(path)
+    with open(path, "rb") as raw:
+        text = io.TextIOWrapper(raw, encoding=encoding, errors="replace", newline=None)
+        for line in text:
+            yield repair_mojibake(line.rstrip("\n"))
+
+# =========================================================
+# PARSER
+# =========================================================
+def _starts_with_symbol(line: str) -> bool:
+    return bool(line) and unicodedata.category(line[0]) == "So"
+
+
+def parse_events(lines) -> Iterator[Tuple[str, ...]]:
+    """
+    Turns log lines into ("level", title) and ("chat", role, text) events.
+    A message keeps the lines that follow it (LLM replies span several)
+    until a separator, a header or another emoji-prefixed line.
+    """
+    role, parts = None, []
+
+    def flush():
+        text = "\n".join(parts).strip()
+        return ("chat", role, text) if role and text else None
+
+    for line in lines:
+        stripped = line.strip()
+        header = LEVEL_HEADER.match(stripped) or SCENARIO_HEADER.match(stripped)
+        prefix = next((p for p in ROLE_PREFIXES if stripped.startswith(p)), None)
+
+        if prefix or header or SEPARATOR.match(stripped) or _starts_with_symbol(stripped):
+            event = flush()
+            if event:
+                yield event
+            role, parts = None, []
+            if prefix:
+                role, parts = ROLE_PREFIXES[prefix], [stripped[len(prefix):]]
+            elif header:
+                yield ("level", header.group(1))
+        elif role:
+            parts.append(line.rstrip())
+
+    event = flush()
+    if event:
+        yield event
 
-def parse_logs(filename):
-    with open(filename, 'r', encoding='utf-8', errors='replace') as f:
-        content = f.read()
 
-    # Split by level
-    levels = re.split(r'={30,}\s*STARTING (.*?)\s*={30,}', content)
+def parse_logs(filename: str, encoding: Optional[str] = None) -> List[dict]:
+    """Whole log as [{"title", "chats"}]. Fine for small logs; the viewer streams."""
     parsed_data = []
-    
-    # Matches[0] is garbage before first level
-    # Matches[1] = Level Name, Matches[2] = Content, Matches[3] = Level Name...
-    
-    for i in range(1, len(levels), 2):
-        level_name = levels[i].strip()
-        raw_text = levels[i+1]
-        
-        chats = []
-        # Find Spammer and Honeypot messages
-        # Pattern: 🔴 SPAMMER: (.*?) | 🟢 HONEYPOT: (.*?)
-        lines = raw_text.split('\n')
-        for line in lines:
-            line = line.strip()
-            if line.startswith("🔴 SPAMMER:"):
-                chats.append({"role": "Spammer", "msg": line.replace("🔴 SPAMMER:", "").strip()})
-            elif line.startswith("🟢 HONEYPOT:"):
-                chats.append({"role": "Honeypot", "msg": line.replace("🟢 HONEYPOT:", "").strip()})
-        
-        parsed_data.append({"title": level_name, "chats": chats})
-        
+    for event in parse_events(iter_lines(filename, encoding)):
+        if event[0] == "level":
+            parsed_data.append({"title": event[1], "chats": []})
+        else:
+            if not parsed_data:
+                parsed_data.append({"title": "Untitled", "chats": []})
+            parsed_data[-1]["chats"].append({"role": event[1], "msg": event[2]})
     return parsed_data
 
-def generate_html(data):
-    html_content = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Agentic Honeypot - Chat Logs</title>
-        <style>
+# =========================================================
+# HTML
+# =========================================================
+STYLE = """
             body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #f0f2f5; margin: 0; padding: 20px; }
             h1 { text-align: center; color: #333; }
             .container { max-width: 800px; margin: 0 auto; }
             .level-block { background: white; border-radius: 10px; padding: 20px; margin-bottom: 30px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
             .level-title { font-size: 1.5em; font-weight: bold; color: #2c3e50; border-bottom: 2px solid #eee; padding-bottom: 10px; margin-bottom: 20px; }
-            .chat-bubble { padding: 10px 15px; border-radius: 15px; margin-bottom: 10px; max-width: 80%; line-height: 1.5; font-size: 14px; position: relative; }
+            .chat-bubble { padding: 10px 15px; border-radius: 15px; margin-bottom: 10px; max-width: 80%; line-height: 1.5; font-size: 14px; position: relative; white-space: pre-wrap; }
             .spammer { background-color: #ffebee; color: #c62828; margin-right: auto; border-bottom-left-radius: 2px; }
             .honeypot { background-color: #e8f5e9; color: #2e7d32; margin-left: auto; border-bottom-right-radius: 2px; text-align: right; }
             .label { font-size: 10px; font-weight: bold; margin-bottom: 4px; display: block; opacity: 0.7; }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>🛡️ Agentic Honeypot Simulation Logs</h1>
+            .nav { display: flex; justify-content: space-between; margin: 20px 0; }
+            .nav a, .runs a { color: #2c3e50; }
+            .runs { line-height: 1.8; }
+"""
+
+
+def _page_open(title: str) -> str:
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{html.escape(title)}</title>
+    <style>{STYLE}    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>🛡️ {html.escape(title)}</h1>
+"""
+
+
+PAGE_CLOSE = """    </div>
+</body>
+</html>
+"""
+
+
+def _nav(prev_href: Optional[str], next_href: Optional[str], index_href: str) -> str:
+    prev_link = f'<a href="{prev_href}">← Previous</a>' if prev_href else "<span></span>"
+    next_link = f'<a href="{next_href}">Next →</a>' if next_href else "<span></span>"
+    return f'        <div class="nav">{prev_link}<a href="{index_href}">Index</a>{next_link}</div>\n'
+
+
+class ViewerWriter:
     """
-    
-    for level in data:
-        html_content += f'<div class="level-block"><div class="level-title">{html.escape(level["title"])}</div>'
-        for chat in level["chats"]:
-            role_class = "spammer" if chat["role"] == "Spammer" else "honeypot"
-            html_content += f"""
-            <div class="chat-bubble {role_class}">
-                <span class="label">{chat["role"].upper()}</span>
-                {html.escape(chat["msg"])}
-            </div>
-            """
-        html_content += "</div>"
-
-    html_content += """
-        </div>
-    </body>
-    </html>
+    Writes the viewer as it parses: every page is a file of at most
+    `page_size` bubbles, flushed to disk as soon as it fills, and the
+    index is written last from per-level counters. Memory does not grow
+    with the log, only with the number of runs listed in the index.
     """
-    
-    with open("simulation_chats.html", "w", encoding="utf-8") as f:
-        f.write(html_content)
-    print("✅ Generated simulation_chats.html")
+
+    def __init__(self, index_path: str, page_size: int = PAGE_SIZE):
+        self.index_path = index_path
+        self.page_size = page_size
+        stem = os.path.splitext(os.path.basename(index_path))[0]
+        self.pages_dir = os.path.join(os.path.dirname(os.path.abspath(index_path)), stem)
+        self.pages_rel = stem
+        os.makedirs(self.pages_dir, exist_ok=True)
+        self.pages = 0
+        self.run_title = None
+        self.run_pages = 0
+        self.run_messages = 0
+        self._file = None
+        self._bubbles = 0
+        # level title -> [(run number, first page, pages, messages)]
+        self.levels: Dict[str, List[Tuple[int, int, int, int]]] = {}
+        self.runs = 0
+
+    def _page_name(self, n: int) -> str:
+        return f"page-{n:05d}.html"
+
+    def _open_page(self):
+        self.pages += 1
+        self.run_pages += 1
+        self._bubbles = 0
+        title = f"{self.run_title} (page {self.run_pages})"
+        self._file = open(os.path.join(self.pages_dir, self._page_name(self.pages)), "w", encoding="utf-8")
+        self._file.write(_page_open(title))
+        self._file.write(self._nav_for(self.pages))
+        self._file.write(f'        <div class="level-block"><div class="level-title">{html.escape(title)}</div>\n')
+
+    def _nav_for(self, n: int) -> str:
+        return _nav(self._page_name(n - 1) if n > 1 else None, None, f"../{os.path.basename(self.index_path)}")
+
+    def _close_page(self, last: bool):
+        # The "next" link goes in only once a next page is being opened,
+        # so pages never need rewriting.
+        if self._file is None:
+            return
+        self._file.write("        </div>\n")
+        if not last:
+            self._file.write(_nav(None, self._page_name(self.pages + 1), f"../{os.path.basename(self.index_path)}"))
+        self._file.write(PAGE_CLOSE)
+        self._file.close()
+        self._file = None
+
+    def _end_run(self):
+        if self.run_title is None:
+            return
+        if self.run_messages:
+            self.levels.setdefault(self.run_title, []).append(
+                (self.runs, self.pages - self.run_pages + 1, self.run_pages, self.run_messages)
+            )
+
+    def level(self, title: str):
+        self._end_run()
+        self.runs += 1
+        self.run_title, self.run_pages, self.run_messages = title, 0, 0
+        self._bubbles = self.page_size  # every run starts on a fresh page
+
+    def chat(self, role: str, msg: str, note: str = ""):
+        if self.run_title is None:
+            self.level("Untitled")
+        if self._file is None or self._bubbles >= self.page_size:
+            self._close_page(last=False)
+            self._open_page()
+        role_class = "spammer" if role == "Spammer" else "honeypot"
+        self._file.write(
+            f'        <div class="chat-bubble {role_class}"><span class="label">{role.upper()}{html.escape(note)}</span>'
+            f"{html.escape(msg)}</div>\n"
+        )
+        self._bubbles += 1
+        self.run_messages += 1
+
+    def close(self):
+        self._close_page(last=True)
+        self._end_run()
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            f.write(_page_open("Agentic Honeypot Simulation Logs"))
+            for title, runs in self.levels.items():
+                total = sum(r[3] for r in runs)
+                f.write(f'        <div class="level-block"><div class="level-title">{html.escape(title)}</div>\n')
+                f.write(f"        <p>{len(runs)} run(s), {total} messages</p>\n        <div class=\"runs\">\n")
+                for run, first, pages, messages in runs:
+                    href = f"{self.pages_rel}/{self._page_name(first)}"
+                    f.write(f'            <a href="{href}">Run {run}</a> ({messages} messages, {pages} page(s))<br>\n')
+                f.write("        </div></div>\n")
+            f.write(PAGE_CLOSE)
+
+
+def _turn_note(turn: dict) -> str:
+    note = ""
+    for field, values in (turn.get("hits") or {}).items():
+        note += f" · {field}: {', '.join(values)}"
+    if turn.get("latencyMs") is not None:
+        note += f" · {turn['latencyMs']:.0f} ms"
+    return note
+
+
+def render_store(path: str, writer: ViewerWriter):
+    """One run per session of a transcript store, read a conversation at a time."""
+    reader = TranscriptReader(path)
+    try:
+        for session_id, turns in reader.iter_conversations():
+            writer.level(turns[0].get("scenario") or session_id)
+            for turn in turns:
+                role = "Spammer" if turn.get("role") == "scammer" else "Honeypot"
+                writer.chat(role, turn.get("text", ""), _turn_note(turn))
+    finally:
+        reader.close()
+
+
+def generate_viewer(log_paths: List[str], index_path: str = "simulation_chats.html",
+                    page_size: int = PAGE_SIZE, encoding: Optional[str] = None) -> ViewerWriter:
+    """Transcript stores (*.jsonl) are read through their index; anything else is parsed as a text log."""
+    writer = ViewerWriter(index_path, page_size)
+    for path in log_paths:
+        if path.endswith(".jsonl"):
+            render_store(path, writer)
+            continue
+        for event in parse_events(iter_lines(path, encoding)):
+            if event[0] == "level":
+                writer.level(event[1])
+            else:
+                writer.chat(event[1], event[2])
+    writer.close()
+    return writer
+
 
 if __name__ == "__main__":
-    data = parse_logs("simulation_log.txt")
-    generate_html(data)
+    parser = argparse.ArgumentParser(description="Render simulation logs as a paginated HTML chat viewer.")
+    parser.add_argument("logs", nargs="*",
+                        help=f"transcript stores (*.jsonl) or captured text logs; default {SIM_TRANSCRIPT_LOG} "
+                             "when it exists, else simulation_log.txt")
+    parser.add_argument("--out", default="simulation_chats.html", help="index page; pages go in a folder beside it")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--encoding", help="skip detection (e.g. utf-16, utf-8)")
+    args = parser.parse_args()
+    if not args.logs:
+        args.logs = [SIM_TRANSCRIPT_LOG if os.path.exists(SIM_TRANSCRIPT_LOG) else "simulation_log.txt"]
+
+    writer = generate_viewer(args.logs, args.out, args.page_size, args.encoding)
+    print(f"✅ Generated {args.out} ({writer.runs} runs, {writer.pages} pages in {writer.pages_dir}/)")
@@ -0,0 +1,220 @@
+import glob
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from transcript_store import INDICATOR_FIELDS
+
+# =========================================================
+# NORMALIZATION
+# =========================================================
+def _digits(value: str) -> str:
+    return "".join(ch for ch in value if ch.isdigit())
+
+
+def normalize(field: str, value: str) -> str:
+    """
+    Canonical form of an indicator, so the spellings scammers and our
+    regexes produce for the same thing land on one key:
+    "Win@OKAXIS" -> "win@okaxis", "+91-98765 43210" -> "9876543210",
+    "HTTPS://Evil.in/KYC/" -> "https://evil.in/KYC".
+    """
+    value = value.strip()
+    if field == "upiIds":
+        return value.lower()
+    if field == "phoneNumbers":
+        digits = _digits(value)
+        return digits[-10:] if len(digits) > 10 else digits
+    if field == "bankAccounts":
+        return _digits(value)
+    if field == "ifscCodes":
+        return value.upper()
+    if field == "phishingLinks":
+        scheme, sep, rest = value.partition("://")
+        if not sep:
+            scheme, rest = "http", value
+        host, slash, path = rest.partition("/")
+        return f"{scheme.lower()}://{host.lower()}{slash}{path}".rstrip("/")
+    return value
+
+# =========================================================
+# INDEX
+# =========================================================
+class IndicatorEntry:
+    __slots__ = ("field", "value", "sessions", "hits", "first_seen", "last_seen")
+
+    def __init__(self, field: str, value: str, ts: float):
+        self.field = field
+        self.value = value
+        self.sessions: Dict[str, float] = {}  # sessionId -> last seen there
+        self.hits = 0
+        self.first_seen = ts
+        self.last_seen = ts
+
+    def to_dict(self, max_sessions: int = 100) -> dict:
+        # Most recently active sessions first.
+        recent = sorted(self.sessions.items(), key=lambda kv: kv[1], reverse=True)[:max_sessions]
+        return {
+            "type": self.field,
+            "value": self.value,
+            "sessionCount": len(self.sessions),
+            "hits": self.hits,
+            "firstSeen": self.first_seen,
+            "lastSeen": self.last_seen,
+            "sessions": [sid for sid, _ in recent],
+        }
+
+
+class IndicatorIndex:
+    """
+    Inverted index from normalized indicators (UPI IDs, phone numbers,
+    links, accounts, IFSC codes) to the sessions they appeared in.
+
+    Keys are (field, normalized value), so a lookup is one dict probe per
+    field. For top-N, entries also sit in buckets by session count; a new
+    session moves an entry up one bucket, and top() walks the buckets down
+    from the highest count instead of sorting everything.
+
+    Per worker: each process indexes the turns it serves, and rebuilds
+    from every worker's transcript log when it starts. Under
+    WEB_CONCURRENCY > 1 a worker does not see what the others indexed
+    since it started, so lookups can differ between workers until the
+    next restart.
+    """
+
+    def __init__(self):
+        self._entries: Dict[tuple, IndicatorEntry] = {}
+        self._buckets: Dict[int, Dict[tuple, None]] = {}
+        self._max_count = 0
+        self._lock = threading.Lock()
+        # False while a rebuild is running; lookups are incomplete until then.
+        self.ready = True
+
+    def add(self, session_id, hits: Dict[str, Iterable[str]], ts: Optional[float] = None):
+        """Records a turn's hits ({field: [values]}, as indicator_hits returns)."""
+        if not hits:
+            return
+        ts = time.time() if ts is None else ts
+        sid = str(session_id)
+        with self._lock:
+            for field, values in hits.items():
+                if field not in INDICATOR_FIELDS:
+                    continue
+                for value in values:
+                    self._add(field, normalize(field, value), sid, ts)
+
+    def _add(self, field: str, value: str, sid: str, ts: float):
+        key = (field, value)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = IndicatorEntry(field, value, ts)
+        entry.hits += 1
+        entry.first_seen = min(entry.first_seen, ts)
+        entry.last_seen = max(entry.last_seen, ts)
+        count = len(entry.sessions)
+        if sid in entry.sessions:
+            entry.sessions[sid] = max(entry.sessions[sid], ts)
+            return
+        entry.sessions[sid] = ts
+        if count:
+            bucket = self._buckets[count]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[count]
+        self._buckets.setdefault(count + 1, {})[key] = None
+        self._max_count = max(self._max_count, count + 1)
+
+    def lookup(self, value: str, field: Optional[str] = None) -> List[IndicatorEntry]:
+        """Entries matching `value` under any field (or just `field`)."""
+        fields = (field,) if field else INDICATOR_FIELDS
+        with self._lock:
+            found = []
+            for f in fields:
+                entry = self._entries.get((f, normalize(f, value)))
+                if entry is not None and entry not in found:
+                    found.append(entry)
+            return found
+
+    def top(self, n: int = 10, field: Optional[str] = None) -> List[IndicatorEntry]:
+        """The `n` indicators seen in the most sessions."""
+        result = []
+        with self._lock:
+            count = self._max_count
+            while count > 0 and len(result) < n:
+                for key in self._buckets.get(count, ()):
+                    if field is None or key[0] == field:
+                        result.append(self._entries[key])
+                        if len(result) == n:
+                            break
+                count -= 1
+        return result
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self._max_count = 0
+
+    # -----------------------------------------------------
+    # Rebuild
+    # -----------------------------------------------------
+    def rebuild(self, paths: Iterable[str], sizes: Optional[Dict[str, int]] = None) -> int:
+        """
+        Re-indexes the hits recorded in transcript logs. Reads the files
+        line by line and only decodes records that carry hits; with
+        `sizes`, only the first sizes[path] bytes of each, so turns the
+        live path adds meanwhile are not counted twice. Returns the number
+        of records indexed.
+        """
+        records = 0
+        self.ready = False
+        try:
+            for path in paths:
+                if not os.path.exists(path):
+                    continue
+                limit = sizes.get(path, 0) if sizes is not None else None
+                offset = 0
+                with open(path, "rb") as f:
+                    for line in f:
+                        offset += len(line)
+                        if limit is not None and offset > limit:
+                            break
+                        if b'"hits"' not in line or not line.endswith(b"\n"):
+                            continue
+                        try:
+                            record = json.loads(line)
+                            self.add(record["sessionId"], record["hits"], record.get("ts"))
+                        except (ValueError, KeyError, TypeError, AttributeError):
+                            continue
+                        records += 1
+        finally:
+            self.ready = True
+        return records
+
+    def snapshot_stats(self) -> dict:
+        with self._lock:
+            return {"indicators": len(self._entries), "maxSessions": self._max_count}
+
+
+def transcript_sizes(path: str) -> Dict[str, int]:
+    """transcript_paths() with their current sizes, to rebuild up to."""
+    sizes = {}
+    for p in transcript_paths(path):
+        try:
+            sizes[p] = os.path.getsize(p)
+        except OSError:
+            continue
+    return sizes
+
+
+def transcript_paths(path: str) -> List[str]:
+    """A transcript log and its per-worker variants ("log.w0.jsonl", ...)."""
+    if not path:
+        return []
+    root, ext = os.path.splitext(path)
+    return [path] + sorted(glob.glob(f"{glob.escape(root)}.w*{ext}"))
@@ -0,0 +1,315 @@
+import asyncio
+import os
+import threading
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from cassette import Cassette, active_cassette
+from context_manager import estimate_tokens
+from llm_scheduler import PRIORITY_LIVE, SCHEDULER, LLMScheduler, request_tokens
+from metrics import LLM_CALL_SECONDS, LLM_TOKENS
+from prompts import estimate_prompt_tokens, prompt_id
+
+# =========================================================
+# CONFIG
+# =========================================================
+LLM_MODEL = "llama-3.3-70b-versatile"
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "256"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "64"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "20"))
+# Print prompt/completion tokens for every call ("1" to turn on; the
+# totals are always on /metrics).
+LLM_LOG_USAGE = os.getenv("LLM_LOG_USAGE", "0") == "1"
+
+# =========================================================
+# TOKEN ACCOUNTING
+# =========================================================
+def usage_counts(usage) -> Tuple[Optional[int], Optional[int]]:
+    """(prompt, completion) tokens from an OpenAI-style usage block, if any."""
+    if usage is None:
+        return None, None
+    return getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+
+
+class UsageLedger:
+    """
+    Prompt and completion tokens and provider time per prompt variant (see
+    prompts.prompt_id), for every LLM call on this worker. Counts come from
+    the provider's usage block; calls that do not return one (streams
+    without usage, stand-ins) are counted locally and marked estimated.
+    """
+
+    def __init__(self, log: bool = LLM_LOG_USAGE):
+        self.log = log
+        self._lock = threading.Lock()
+        self.by_variant: Dict[str, dict] = {}
+
+    def record(self, messages: List[Dict[str, str]], prompt_tokens: Optional[int],
+               completion_tokens: Optional[int], seconds: float, completion_text: str = ""):
+        variant = prompt_id(messages)
+        estimated = prompt_tokens is None or completion_tokens is None
+        if prompt_tokens is None:
+            prompt_tokens = estimate_prompt_tokens(messages)
+        if completion_tokens is None:
+            completion_tokens = estimate_tokens(completion_text)
+        with self._lock:
+            row = self.by_variant.get(variant)
+            if row is None:
+                row = self.by_variant[variant] = {"calls": 0, "estimatedCalls": 0, "promptTokens": 0,
+                                                  "completionTokens": 0, "seconds": 0.0}
+            row["calls"] += 1
+            row["estimatedCalls"] += estimated
+            row["promptTokens"] += prompt_tokens
+            row["completionTokens"] += completion_tokens
+            row["seconds"] += seconds
+        LLM_TOKENS.labels(variant, "prompt").inc(prompt_tokens)
+        LLM_TOKENS.labels(variant, "completion").inc(completion_tokens)
+        LLM_CALL_SECONDS.labels(variant).observe(seconds)
+        if self.log:
+            print(f"🔢 [{variant}] {prompt_tokens} prompt + {completion_tokens} completion tokens"
+                  f"{' (estimated)' if estimated else ''} in {seconds * 1000:.0f} ms")
+
+    def record_completion(self, messages: List[Dict[str, str]], completion, seconds: float):
+        """record() for a non-streamed chat completion."""
+        prompt_tokens, completion_tokens = usage_counts(getattr(completion, "usage", None))
+        text = "" if completion_tokens is not None else completion.choices[0].message.content or ""
+        self.record(messages, prompt_tokens, completion_tokens, seconds, text)
+
+    def snapshot_stats(self) -> dict:
+        with self._lock:
+            rows = {k: dict(v) for k, v in self.by_variant.items()}
+        for row in rows.values():
+            calls = row["calls"] or 1
+            row["seconds"] = round(row["seconds"], 3)
+            row["promptTokensAvg"] = round(row["promptTokens"] / calls, 1)
+            row["completionTokensAvg"] = round(row["completionTokens"] / calls, 1)
+            row["callMsAvg"] = round(row["seconds"] * 1000 / calls, 1)
+        return rows
+
+
+# Shared by every client on the worker, like SCHEDULER.
+USAGE = UsageLedger()
+
+# =========================================================
+# ASYNC LLM CLIENT
+# =========================================================
+_SAMPLE_COMPLETION = {
+    "id": "warmup", "object": "chat.completion", "created": 0, "model": LLM_MODEL,
+    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": ""}}],
+}
+
+
+def _prime_sdk(client):
+    client.chat.completions  # imports groq.resources.chat and groq.types.chat
+    from groq._models import construct_type
+    from groq.types.chat import ChatCompletion
+    construct_type(type_=ChatCompletion, value=_SAMPLE_COMPLETION)
+
+
+async def _close_stream(stream):
+    # The SDK's AsyncStream has close(); a cassette's stream is an async generator.
+    close = getattr(stream, "aclose", None) or stream.close
+    await close()
+
+
+class AsyncLLMClient:
+    """
+    Async Groq client shared by every request on a worker.
+
+    All completions go through one keep-alive connection pool, and a
+    semaphore caps how many are in flight so a burst cannot open an
+    unbounded number of sockets to the provider. Rate limits and retries
+    belong to the shared LLMScheduler, so the SDK's own retries are off.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_keepalive: int = LLM_MAX_KEEPALIVE,
+        timeout: float = LLM_TIMEOUT,
+        base_url: Optional[str] = None,
+        scheduler: Optional[LLMScheduler] = None,
+        cassette: Optional[Cassette] = None,
+        ledger: Optional[UsageLedger] = None,
+    ):
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.max_keepalive = max_keepalive
+        self.timeout = timeout
+        self.base_url = base_url
+        self.scheduler = scheduler or SCHEDULER
+        self.ledger = ledger or USAGE
+        # Record/replay; defaults to the one configured by LLM_CASSETTE.
+        self.cassette = cassette if cassette is not None else active_cassette()
+        self.in_flight = 0
+        self._loop = None
+        self._client = None
+        self._http = None
+        self._semaphore = None
+        self._waiting: Dict[object, float] = {}
+
+    def _bind(self):
+        # The pool and semaphore belong to the running event loop. uvicorn
+        # uses a single loop per worker, but test clients spin up their own,
+        # so rebuild whenever the loop changes.
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            from groq import AsyncGroq  # deferred: a large import, see startup.py
+
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_keepalive,
+                ),
+                timeout=self.timeout,
+            )
+            self._http = http_client
+            self._client = AsyncGroq(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                http_client=http_client,
+                max_retries=0,
+            )
+            if self.cassette is not None:
+                self.cassette.install(self._client)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._client
+
+    async def _acquire_slot(self):
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            return
+        # Full: remember since when, for oldest_wait().
+        token = object()
+        self._waiting[token] = time.monotonic()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            del self._waiting[token]
+
+    def oldest_wait(self) -> float:
+        """
+        Seconds the longest-waiting live call has been queued, on the
+        scheduler or for a concurrency slot.
+        """
+        started = min(self._waiting.values(), default=None)
+        slot_wait = 0.0 if started is None else time.monotonic() - started
+        return max(slot_wait, self.scheduler.oldest_wait(PRIORITY_LIVE))
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = LLM_MODEL,
+        temperature: float = 0.7,
+        max_tokens: int = 150,
+        top_p: float = 1,
+        priority: int = PRIORITY_LIVE,
+        seed: Optional[int] = None,
+    ) -> str:
+        client = self._bind()
+        # Best-effort reproducible sampling, used by simulation runs.
+        extra = {"seed": seed} if seed is not None else {}
+
+        async def attempt():
+            await self._acquire_slot()
+            self.in_flight += 1
+            start = time.perf_counter()
+            try:
+                completion = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    top_p=top_p,
+                    **extra,
+                )
+                self.ledger.record_completion(messages, completion, time.perf_counter() - start)
+                return completion
+            finally:
+                self.in_flight -= 1
+                self._semaphore.release()
+
+        completion = await self.scheduler.acall(attempt, request_tokens(messages, max_tokens), priority)
+        return completion.choices[0].message.content.strip()
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = LLM_MODEL,
+        temperature: float = 0.7,
+        max_tokens: int = 150,
+        top_p: float = 1,
+        priority: int = PRIORITY_LIVE,
+    ) -> AsyncIterator[str]:
+        """
+        Yields content deltas as they arrive. Holds a semaphore slot until the
+        stream ends. Only opening the stream is retried; a stream that breaks
+        midway raises to the caller. A consumer that stops early should
+        aclose() the generator: that closes the provider stream, so its
+        connection goes back to the pool instead of finishing the reply.
+        """
+        client = self._bind()
+        start = 0.0
+
+        async def attempt():
+            nonlocal start
+            await self._acquire_slot()
+            start = time.perf_counter()
+            try:
+                return await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    top_p=top_p,
+                    stream=True,
+                )
+            except BaseException:
+                self._semaphore.release()
+                raise
+
+        stream = await self.scheduler.acall(attempt, request_tokens(messages, max_tokens), priority)
+        self.in_flight += 1
+        parts = []
+        usage = None
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+                # Groq reports usage on the last chunk, under x_groq.
+                usage = getattr(getattr(chunk, "x_groq", None), "usage", None) or usage
+        finally:
+            try:
+                await _close_stream(stream)
+            finally:
+                self.in_flight -= 1
+                self._semaphore.release()
+                self.ledger.record(messages, *usage_counts(usage), time.perf_counter() - start, "".join(parts))
+
+    async def warm(self) -> bool:
+        """
+        Binds the pool and opens a connection to the provider (DNS, TCP,
+        TLS) without spending tokens: any HTTP answer leaves a keep-alive
+        connection in the pool for the first completion to reuse.
+        """
+        client = self._bind()
+        # The SDK imports its resource and response types on first use
+        # (tens of ms); pay for that here, off the event loop.
+        await asyncio.to_thread(_prime_sdk, client)
+        try:
+            await self._http.get(str(client.base_url), timeout=self.timeout)
+            return True
+        except httpx.HTTPError as e:
+            print(f"⚠️ LLM warm-up failed: {e}")
+            return False
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._loop = None
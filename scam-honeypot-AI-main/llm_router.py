@@ -0,0 +1,379 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from llm_client import USAGE, AsyncLLMClient, UsageLedger
+from llm_scheduler import PRIORITY_LIVE, LLMScheduler, request_tokens
+
+# =========================================================
+# CONFIG
+# =========================================================
+# A second Groq model to hedge with (e.g. llama-3.1-8b-instant). Groq
+# rate-limits per model, so it gets its own scheduler budget.
+LLM_HEDGE_MODEL = os.getenv("LLM_HEDGE_MODEL", "")
+# Gemini as a second provider, through the google-generativeai package.
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+# How long the first provider gets before the request is also sent to the
+# next one. A negative value turns hedging off (failover only).
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "1.0"))
+ROUTER_EWMA_ALPHA = float(os.getenv("ROUTER_EWMA_ALPHA", "0.2"))
+# Every Nth request goes to the runner-up first, so a provider that lost
+# the top spot keeps getting measured and can win it back. 0 disables.
+ROUTER_PROBE_EVERY = int(os.getenv("ROUTER_PROBE_EVERY", "20"))
+
+# =========================================================
+# PROVIDERS
+# =========================================================
+# A provider is anything with a `name`, an `in_flight` count and
+#   async chat(messages, temperature, max_tokens, top_p, priority) -> str
+#   stream(messages, temperature, max_tokens, top_p, priority) -> async iterator of str
+# and optionally `async warm() -> bool` to open connections ahead of traffic
+# and `oldest_wait() -> float`, seconds its longest-queued live call has waited.
+
+
+class GroqProvider:
+    def __init__(self, client: AsyncLLMClient, model: str, name: Optional[str] = None):
+        self.client = client
+        self.model = model
+        self.name = name or f"groq:{model}"
+
+    @property
+    def in_flight(self) -> int:
+        return self.client.in_flight
+
+    async def chat(self, messages, temperature=0.7, max_tokens=150, top_p=1, priority=PRIORITY_LIVE) -> str:
+        return await self.client.chat(messages, self.model, temperature, max_tokens, top_p, priority)
+
+    async def warm(self) -> bool:
+        return await self.client.warm()
+
+    def oldest_wait(self) -> float:
+        return self.client.oldest_wait()
+
+    def stream(self, messages, temperature=0.7, max_tokens=150, top_p=1, priority=PRIORITY_LIVE):
+        return self.client.stream(messages, self.model, temperature, max_tokens, top_p, priority)
+
+
+class GeminiProvider:
+    """
+    Gemini through google-generativeai, imported on first use so the app
+    does not need the package unless GEMINI_API_KEY is set. System messages
+    become the system instruction; assistant turns become "model" turns.
+    """
+
+    def __init__(self, api_key: str, model: str = GEMINI_MODEL, scheduler: Optional[LLMScheduler] = None,
+                 ledger: Optional[UsageLedger] = None):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self.model = model
+        self.name = f"gemini:{model}"
+        self.scheduler = scheduler or LLMScheduler()
+        self.ledger = ledger or USAGE
+        self.in_flight = 0
+
+    def oldest_wait(self) -> float:
+        return self.scheduler.oldest_wait(PRIORITY_LIVE)
+
+    def _request(self, messages, temperature, max_tokens, top_p):
+        system = "\n\n".join(m["content"] for m in messages if m["role"] == "system")
+        contents = [
+            {"role": "model" if m["role"] == "assistant" else "user", "parts": [m["content"]]}
+            for m in messages if m["role"] != "system"
+        ]
+        model = self._genai.GenerativeModel(self.model, system_instruction=system or None)
+        config = {"temperature": temperature, "max_output_tokens": max_tokens, "top_p": top_p}
+        return model, contents, config
+
+    def _record(self, messages, response, seconds: float, text: str):
+        usage = getattr(response, "usage_metadata", None)
+        self.ledger.record(messages, getattr(usage, "prompt_token_count", None),
+                           getattr(usage, "candidates_token_count", None), seconds, text)
+
+    async def chat(self, messages, temperature=0.7, max_tokens=150, top_p=1, priority=PRIORITY_LIVE) -> str:
+        model, contents, config = self._request(messages, temperature, max_tokens, top_p)
+
+        async def attempt():
+            self.in_flight += 1
+            start = time.perf_counter()
+            try:
+                response = await model.generate_content_async(contents, generation_config=config)
+                self._record(messages, response, time.perf_counter() - start, response.text)
+                return response
+            finally:
+                self.in_flight -= 1
+
+        response = await self.scheduler.acall(attempt, request_tokens(messages, max_tokens), priority)
+        return response.text.strip()
+
+    async def stream(self, messages, temperature=0.7, max_tokens=150, top_p=1, priority=PRIORITY_LIVE):
+        model, contents, config = self._request(messages, temperature, max_tokens, top_p)
+
+        start = time.perf_counter()
+
+        async def attempt():
+            nonlocal start
+            start = time.perf_counter()
+            return await model.generate_content_async(contents, generation_config=config, stream=True)
+
+        response = await self.scheduler.acall(attempt, request_tokens(messages, max_tokens), priority)
+        self.in_flight += 1
+        parts = []
+        try:
+            async for chunk in response:
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+        finally:
+            self.in_flight -= 1
+            # The last chunk carries usage_metadata for the whole response.
+            self._record(messages, response, time.perf_counter() - start, "".join(parts))
+
+# =========================================================
+# PER-PROVIDER HEALTH
+# =========================================================
+class ProviderStats:
+    __slots__ = ("log_latency", "error_rate", "calls", "wins", "errors", "cancelled")
+
+    def __init__(self):
+        # EWMA of log(seconds). Averaging in log space tracks the typical
+        # latency (the median, for lognormal-ish providers) instead of being
+        # dragged around by the tail that hedging exists to cut off.
+        self.log_latency: Optional[float] = None
+        self.error_rate = 0.0  # EWMA of failures (0..1)
+        self.calls = 0
+        self.wins = 0
+        self.errors = 0
+        self.cancelled = 0
+
+    @property
+    def latency(self) -> Optional[float]:
+        return math.exp(self.log_latency) if self.log_latency is not None else None
+
+    def observe(self, elapsed: float, alpha: float, at_least: bool = False):
+        """Folds in a latency sample. `at_least` samples (cancelled calls) can only raise it."""
+        x = math.log(max(elapsed, 1e-4))
+        if self.log_latency is None:
+            if not at_least:
+                self.log_latency = x
+        elif not at_least or x > self.log_latency:
+            self.log_latency += alpha * (x - self.log_latency)
+
+    def score(self, default_latency: float) -> float:
+        """Expected cost of routing here first; lower is better."""
+        latency = self.latency if self.latency is not None else default_latency
+        return latency * (1 + 4 * self.error_rate)
+
+    def as_dict(self) -> dict:
+        return {
+            "latencyMs": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "errorRate": round(self.error_rate, 3),
+            "calls": self.calls,
+            "wins": self.wins,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+        }
+
+# =========================================================
+# ROUTER
+# =========================================================
+class LLMRouter:
+    """
+    Sends each completion to the provider with the best recent latency and
+    error rate. If it has not answered after `hedge_delay`, or fails first,
+    the request also goes to the next provider. The first success wins and
+    the others are cancelled. Same chat/stream interface as AsyncLLMClient,
+    so it drops in wherever the client is used.
+
+    For streams, the race is to the first token; the winner's stream is
+    then passed through.
+    """
+
+    def __init__(self, providers: list, hedge_delay: float = LLM_HEDGE_DELAY, alpha: float = ROUTER_EWMA_ALPHA,
+                 probe_every: int = ROUTER_PROBE_EVERY, clock: Callable[[], float] = time.perf_counter):
+        if not providers:
+            raise ValueError("LLMRouter needs at least one provider")
+        self.providers = list(providers)
+        self.hedge_delay = hedge_delay
+        self.alpha = alpha
+        self.probe_every = probe_every
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._stats: Dict[str, ProviderStats] = {p.name: ProviderStats() for p in self.providers}
+        self.stats = {"requests": 0, "probes": 0, "hedged": 0, "failovers": 0, "hedge_wins": 0}
+
+    @property
+    def in_flight(self) -> int:
+        return sum(p.in_flight for p in self.providers)
+
+    def ranked(self) -> list:
+        # Unmeasured providers are assumed to answer within the hedge delay,
+        # so each one gets tried early and earns a measurement.
+        default = max(self.hedge_delay, 0.0)
+        with self._lock:
+            return sorted(self.providers, key=lambda p: self._stats[p.name].score(default))
+
+    # -----------------------------------------------------
+    # Bookkeeping
+    # -----------------------------------------------------
+    def _record(self, name: str, elapsed: float, ok: bool):
+        a = self.alpha
+        with self._lock:
+            s = self._stats[name]
+            s.calls += 1
+            s.error_rate += a * ((0.0 if ok else 1.0) - s.error_rate)
+            if ok:
+                s.observe(elapsed, a)
+            else:
+                s.errors += 1
+
+    def _record_cancel(self, name: str, elapsed: float):
+        # The loser took at least `elapsed`; only let that raise its estimate.
+        with self._lock:
+            s = self._stats[name]
+            s.cancelled += 1
+            s.observe(elapsed, self.alpha, at_least=True)
+
+    # -----------------------------------------------------
+    # Racing
+    # -----------------------------------------------------
+    async def _race(self, start: Callable[[object], Awaitable],
+                    discard: Optional[Callable[[object], Awaitable]] = None) -> Tuple[object, object]:
+        """
+        Runs start(provider) on the ranked providers, launching the next one
+        after hedge_delay or as soon as a running attempt fails. Returns
+        (result, provider) for the first success; raises the last error if
+        every provider fails. Losers are cancelled, or handed to `discard`
+        if they finished in the same instant as the winner.
+        """
+        order = self.ranked()
+        with self._lock:
+            self.stats["requests"] += 1
+            if self.probe_every and len(order) > 1 and self.stats["requests"] % self.probe_every == 0:
+                self.stats["probes"] += 1
+                order[0], order[1] = order[1], order[0]
+        running: Dict[asyncio.Task, Tuple[object, float]] = {}
+        next_index = 0
+        last_error: Optional[BaseException] = None
+
+        def launch():
+            nonlocal next_index
+            provider = order[next_index]
+            next_index += 1
+            running[asyncio.ensure_future(start(provider))] = (provider, self.clock())
+
+        launch()
+        try:
+            while running:
+                can_hedge = next_index < len(order) and self.hedge_delay >= 0
+                done, _ = await asyncio.wait(
+                    running, timeout=self.hedge_delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    with self._lock:
+                        self.stats["hedged"] += 1
+                    launch()
+                    continue
+                for task in done:
+                    provider, started = running.pop(task)
+                    elapsed = self.clock() - started
+                    error = task.exception()
+                    self._record(provider.name, elapsed, error is None)
+                    if error is None:
+                        with self._lock:
+                            self._stats[provider.name].wins += 1
+                            if provider is not order[0]:
+                                self.stats["hedge_wins"] += 1
+                        return task.result(), provider
+                    print(f"⚠️ LLM provider {provider.name} failed: {error}")
+                    last_error = error
+                if not running and next_index < len(order):
+                    with self._lock:
+                        self.stats["failovers"] += 1
+                    launch()
+            raise last_error
+        finally:
+            for task, (provider, started) in running.items():
+                if task.done() and not task.cancelled() and task.exception() is None:
+                    self._record(provider.name, self.clock() - started, True)
+                    if discard is not None:
+                        await discard(task.result())
+                    continue
+                task.cancel()
+                self._record_cancel(provider.name, self.clock() - started)
+
+    async def chat(self, messages: List[Dict[str, str]], temperature: float = 0.7, max_tokens: int = 150,
+                   top_p: float = 1, priority: int = PRIORITY_LIVE) -> str:
+        async def start(provider):
+            return await provider.chat(messages, temperature=temperature, max_tokens=max_tokens,
+                                       top_p=top_p, priority=priority)
+
+        reply, _ = await self._race(start)
+        return reply
+
+    async def stream(self, messages: List[Dict[str, str]], temperature: float = 0.7, max_tokens: int = 150,
+                     top_p: float = 1, priority: int = PRIORITY_LIVE) -> AsyncIterator[str]:
+        async def start(provider):
+            pieces = provider.stream(messages, temperature=temperature, max_tokens=max_tokens,
+                                     top_p=top_p, priority=priority)
+            try:
+                first = await pieces.__anext__()
+            except StopAsyncIteration:
+                first = ""
+            except BaseException:
+                await pieces.aclose()
+                raise
+            return first, pieces
+
+        async def discard(result):
+            await result[1].aclose()
+
+        (first, pieces), _ = await self._race(start, discard)
+        try:
+            if first:
+                yield first
+            async for piece in pieces:
+                yield piece
+        finally:
+            await pieces.aclose()
+
+    async def warm(self) -> bool:
+        """Warms every provider that supports it, concurrently."""
+        results = await asyncio.gather(*(p.warm() for p in self.providers if hasattr(p, "warm")),
+                                       return_exceptions=True)
+        return all(r is True for r in results)
+
+    def oldest_wait(self) -> float:
+        # A turn is answered by whichever provider gets to it first, so the
+        # least backed-up one is what it waits for.
+        return min((p.oldest_wait() for p in self.providers if hasattr(p, "oldest_wait")), default=0.0)
+
+    def snapshot_stats(self) -> dict:
+        with self._lock:
+            return dict(self.stats, providers={name: s.as_dict() for name, s in self._stats.items()})
+
+
+def build_llm(client: AsyncLLMClient, model: str):
+    """
+    The client as-is when no second provider is configured, otherwise a
+    router over the primary model and every configured fallback.
+    """
+    providers = [GroqProvider(client, model)]
+    if LLM_HEDGE_MODEL and LLM_HEDGE_MODEL != model:
+        hedge_client = AsyncLLMClient(api_key=client.api_key, base_url=client.base_url, scheduler=LLMScheduler())
+        providers.append(GroqProvider(hedge_client, LLM_HEDGE_MODEL))
+    if GEMINI_API_KEY:
+        try:
+            providers.append(GeminiProvider(GEMINI_API_KEY))
+        except ImportError:
+            print("WARNING: GEMINI_API_KEY set but google-generativeai is not installed.")
+    if len(providers) == 1:
+        return client
+    print(f"🔀 LLM router: {', '.join(p.name for p in providers)} (hedge after {LLM_HEDGE_DELAY}s)")
+    return LLMRouter(providers)
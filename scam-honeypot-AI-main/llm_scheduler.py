@@ -0,0 +1,387 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+import httpx
+
+from context_manager import message_tokens
+
+# =========================================================
+# CONFIG
+# =========================================================
+# Provider budgets per process. Defaults match Groq's free tier for
+# llama-3.3-70b-versatile; set to 0 to disable a bucket. A single process
+# (the API with one worker, the simulators) can use them as is. A
+# multi-worker uvicorn deployment runs one bucket per worker: set each to
+# the account limit divided by WEB_CONCURRENCY, e.g. LLM_RPM=15
+# LLM_TPM=6000 for 2 workers.
+LLM_RPM = int(os.getenv("LLM_RPM", "30"))
+LLM_TPM = int(os.getenv("LLM_TPM", "12000"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+# Longest a call may wait in the queue (including retries) before giving
+# up, so a live turn falls back to a stall reply instead of hanging.
+# 0 means no limit.
+LLM_MAX_QUEUE_WAIT = float(os.getenv("LLM_MAX_QUEUE_WAIT", "10"))
+
+# Lower runs first. Live scammer turns go ahead of simulations.
+PRIORITY_LIVE = 0
+PRIORITY_SIMULATION = 10
+
+T = TypeVar("T")
+
+
+class QueueTimeout(Exception):
+    """The call could not be admitted within its max_wait."""
+
+
+def request_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    """Estimated TPM cost of a completion: prompt plus the completion cap."""
+    return sum(message_tokens(m) for m in messages) + max_tokens
+
+
+# =========================================================
+# TOKEN BUCKET
+# =========================================================
+class TokenBucket:
+    """Refills `per_minute` units per minute, up to one minute's worth."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float]):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def consume(self, amount: float, now: float):
+        if self.unlimited:
+            return
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+
+# =========================================================
+# ERROR CLASSIFICATION
+# =========================================================
+def status_of(exc: Exception) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after_of(exc: Exception, now: Optional[float] = None) -> Optional[float]:
+    """Seconds from a Retry-After (or retry-after-ms) response header, if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when - (now if now is not None else time.time()))
+
+
+def is_transient(exc: Exception) -> bool:
+    status = status_of(exc)
+    if status is not None:
+        return status == 408 or status >= 500
+    if isinstance(exc, (httpx.TransportError, TimeoutError)):
+        return True
+    # Only look the SDK up once it is loaded: if it is not, this is not one of its errors.
+    groq = sys.modules.get("groq")
+    return groq is not None and isinstance(exc, groq.APIConnectionError)
+
+
+# =========================================================
+# SCHEDULER
+# =========================================================
+class _Ticket:
+    __slots__ = ("priority", "seq", "tokens", "done", "cancelled", "queued", "event", "loop", "enqueued")
+
+    def __init__(self, priority: int, seq: int, tokens: int, loop=None, enqueued: float = 0.0):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.done = False
+        self.cancelled = False
+        self.queued = False
+        self.loop = loop
+        self.enqueued = enqueued
+        self.event = asyncio.Event() if loop else threading.Event()
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:
+            pass  # the waiter's loop is gone; its ticket is cancelled on the way out
+
+
+class LLMScheduler:
+    """
+    Admission control in front of the LLM provider, shared by every caller
+    in the process (API handlers on the event loop, simulation scripts on
+    plain threads).
+
+    - Token buckets for requests/minute and tokens/minute. A call is
+      admitted only when both have room for it.
+    - Calls queue by (priority, arrival). Only the head of the queue can be
+      admitted, so a big simulation prompt cannot be starved forever and
+      live turns never wait behind simulations.
+    - A 429 pauses the whole queue for its Retry-After (or a jittered
+      backoff when the header is missing), instead of every caller
+      retrying on its own schedule. 5xx and connection errors are retried
+      with full-jitter exponential backoff.
+    """
+
+    def __init__(
+        self,
+        rpm: int = LLM_RPM,
+        tpm: int = LLM_TPM,
+        max_retries: int = LLM_MAX_RETRIES,
+        max_wait: float = LLM_MAX_QUEUE_WAIT,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.clock = clock
+        self.requests = TokenBucket(rpm, clock)
+        self.tokens = TokenBucket(tpm, clock)
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._heap: List[_Ticket] = []
+        self._seq = itertools.count()
+        self._blocked_until = 0.0
+        self.stats = {"admitted": 0, "queued": 0, "rate_limited": 0, "retried": 0, "timeouts": 0, "failed": 0}
+
+    # -----------------------------------------------------
+    # Queue
+    # -----------------------------------------------------
+    def _enqueue(self, tokens: int, priority: int, loop=None, seq: Optional[int] = None) -> _Ticket:
+        ticket = _Ticket(priority, next(self._seq) if seq is None else seq, tokens, loop, self.clock())
+        with self._lock:
+            heapq.heappush(self._heap, ticket)
+        return ticket
+
+    def _head(self) -> Optional[_Ticket]:
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    def _try_admit(self, ticket: _Ticket) -> Optional[float]:
+        """0 when admitted, seconds to wait when at the head, None when queued behind others."""
+        with self._lock:
+            if self._head() is not ticket:
+                return None
+            now = self.clock()
+            wait = max(
+                self._blocked_until - now,
+                self.requests.wait_time(1, now),
+                self.tokens.wait_time(ticket.tokens, now),
+            )
+            if wait > 0:
+                return wait
+            heapq.heappop(self._heap)
+            ticket.done = True
+            self.requests.consume(1, now)
+            self.tokens.consume(ticket.tokens, now)
+            self.stats["admitted"] += 1
+            following = self._head()
+        if following is not None:
+            following.wake()
+        return 0.0
+
+    def _cancel(self, ticket: _Ticket):
+        with self._lock:
+            was_head = self._head() is ticket
+            ticket.cancelled = True
+            following = self._head() if was_head else None
+        if following is not None:
+            following.wake()
+
+    def _count_queued(self, ticket: _Ticket):
+        if not ticket.queued:
+            ticket.queued = True
+            with self._lock:
+                self.stats["queued"] += 1
+
+    def _timeout(self, wait: Optional[float], deadline: Optional[float]) -> Optional[float]:
+        """How long to sleep before re-checking; raises if the deadline cannot be met."""
+        if deadline is None:
+            return wait
+        remaining = deadline - self.clock()
+        if remaining <= 0 or (wait is not None and wait > remaining):
+            with self._lock:
+                self.stats["timeouts"] += 1
+            raise QueueTimeout(f"LLM call not admitted within its wait budget (needs {wait or remaining:.1f}s)")
+        return remaining if wait is None else wait
+
+    def acquire(self, tokens: int = 1, priority: int = PRIORITY_LIVE, deadline: Optional[float] = None,
+                seq: Optional[int] = None) -> int:
+        """
+        Blocks until admitted and returns the ticket's queue position. A
+        retry passes it back as `seq` to keep its place in the queue.
+        """
+        ticket = self._enqueue(tokens, priority, seq=seq)
+        try:
+            while True:
+                wait = self._try_admit(ticket)
+                if wait == 0:
+                    return ticket.seq
+                self._count_queued(ticket)
+                ticket.event.wait(self._timeout(wait, deadline))
+                ticket.event.clear()
+        finally:
+            if not ticket.done:
+                self._cancel(ticket)
+
+    async def acquire_async(self, tokens: int = 1, priority: int = PRIORITY_LIVE, deadline: Optional[float] = None,
+                            seq: Optional[int] = None) -> int:
+        ticket = self._enqueue(tokens, priority, asyncio.get_running_loop(), seq)
+        try:
+            while True:
+                wait = self._try_admit(ticket)
+                if wait == 0:
+                    return ticket.seq
+                self._count_queued(ticket)
+                try:
+                    await asyncio.wait_for(ticket.event.wait(), self._timeout(wait, deadline))
+                except asyncio.TimeoutError:
+                    pass
+                ticket.event.clear()
+        finally:
+            if not ticket.done:
+                self._cancel(ticket)
+
+    # -----------------------------------------------------
+    # Retries
+    # -----------------------------------------------------
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_delay(self, exc: Exception, attempt: int, deadline: Optional[float]) -> float:
+        """Seconds to sleep before retrying `exc`, or re-raises it."""
+        rate_limited = status_of(exc) == 429
+        if not rate_limited and not is_transient(exc):
+            raise exc
+        with self._lock:
+            if attempt >= self.max_retries:
+                self.stats["failed"] += 1
+                raise exc
+            self.stats["retried"] += 1
+            if not rate_limited:
+                delay = self._backoff(attempt)
+            else:
+                # Pause everyone: the head of the queue re-checks when its
+                # current wait runs out and finds the block in place.
+                self.stats["rate_limited"] += 1
+                pause = retry_after_of(exc)
+                if pause is None:
+                    pause = self._backoff(attempt)
+                self._blocked_until = max(self._blocked_until, self.clock() + pause)
+                delay = 0.0
+        if deadline is not None and self.clock() + delay > deadline:
+            with self._lock:
+                self.stats["timeouts"] += 1
+            raise exc
+        return delay
+
+    def _deadline(self, max_wait: Optional[float]) -> Optional[float]:
+        max_wait = self.max_wait if max_wait is None else max_wait
+        return self.clock() + max_wait if max_wait > 0 else None
+
+    def call(self, fn: Callable[[], T], tokens: int = 1, priority: int = PRIORITY_LIVE,
+             max_wait: Optional[float] = None) -> T:
+        """Runs `fn` once admitted, retrying rate limits and transient errors."""
+        deadline = self._deadline(max_wait)
+        attempt, seq = 0, None
+        while True:
+            seq = self.acquire(tokens, priority, deadline, seq)
+            try:
+                return fn()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, deadline)
+            attempt += 1
+            if delay:
+                time.sleep(delay)
+
+    async def acall(self, fn: Callable[[], Awaitable[T]], tokens: int = 1, priority: int = PRIORITY_LIVE,
+                    max_wait: Optional[float] = None) -> T:
+        """Async counterpart of call(); `fn` returns a fresh awaitable per attempt."""
+        deadline = self._deadline(max_wait)
+        attempt, seq = 0, None
+        while True:
+            seq = await self.acquire_async(tokens, priority, deadline, seq)
+            try:
+                return await fn()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, deadline)
+            attempt += 1
+            if delay:
+                await asyncio.sleep(delay)
+
+    def oldest_wait(self, priority: int = PRIORITY_LIVE) -> float:
+        """Seconds the longest-waiting call at `priority` or more urgent has been queued."""
+        with self._lock:
+            now = self.clock()
+            return max((now - t.enqueued for t in self._heap if not t.cancelled and t.priority <= priority),
+                       default=0.0)
+
+    def snapshot_stats(self) -> dict:
+        with self._lock:
+            now = self.clock()
+            return dict(
+                self.stats,
+                queue_depth=sum(1 for t in self._heap if not t.cancelled),
+                paused_for=round(max(0.0, self._blocked_until - now), 3),
+            )
+
+
+# One scheduler per process: every LLM call site shares the same budget.
+SCHEDULER = LLMScheduler()
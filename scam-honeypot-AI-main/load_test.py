@@ -0,0 +1,259 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import mock_callback_server
+import mock_llm_server
+from mock_llm_server import LATENCY_DISTRIBUTIONS, ServerThread
+
+# =========================================================
+# OFFLINE LOAD TEST FOR /honey-pot-entry
+# =========================================================
+# Starts a mock LLM and a mock GUVI callback endpoint, launches the app in
+# a uvicorn subprocess pointed at both, then drives /honey-pot-entry with
+# closed-loop virtual users at rising concurrency. Each virtual user plays
+# one multi-turn scam conversation per session. Results go to a JSON file;
+# with --baseline the run fails if throughput or p95 regress.
+#
+#   python load_test.py --levels 10 50 100 --requests 200 -o results.json
+
+API_KEY = "team_top_250_secret"
+
+SCRIPT = [
+    "Dear Customer, your Bank Account is blocked due to pending KYC. Update immediately.",
+    "Please pay Rs 10 verification charge to kyc.update@okaxis to unblock.",
+    "Why delay sir? Open http://sbi-kyc-verify.in/login and enter details.",
+    "Call our officer at +91-9876543210, share the OTP you receive.",
+    "Last warning, account will be frozen in 10 minutes. Pay now.",
+]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+# =========================================================
+# APP UNDER TEST
+# =========================================================
+class AppProcess:
+    def __init__(self, env: dict, workers: int = 1):
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+               "--port", str(self.port), "--log-level", "warning"]
+        if workers > 1:
+            cmd += ["--workers", str(workers)]
+        # The app reads it too, to give each worker its own spool and log.
+        env = {**os.environ, **env, "WEB_CONCURRENCY": str(workers)}
+        self.log = tempfile.TemporaryFile()
+        self.proc = subprocess.Popen(
+            cmd, cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=env, stdout=self.log, stderr=subprocess.STDOUT,
+        )
+
+    def wait_ready(self, timeout: float = 30.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                self.log.seek(0)
+                raise RuntimeError(f"App exited early:\n{self.log.read().decode(errors='replace')}")
+            try:
+                if httpx.get(self.url + "/", timeout=1).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.1)
+        raise RuntimeError("App did not become ready in time")
+
+    def stop(self):
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        self.log.close()
+
+# =========================================================
+# LOAD GENERATOR
+# =========================================================
+async def run_level(url: str, concurrency: int, total_requests: int, turns: int, timeout: float) -> dict:
+    latencies = []
+    statuses = {}
+    errors = 0
+    remaining = total_requests
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        async def user(uid: int):
+            nonlocal remaining, errors
+            conversation = 0
+            while True:
+                session_id = f"load-{concurrency}-{uid}-{conversation}"
+                history = []
+                for turn in range(turns):
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                    text = SCRIPT[turn % len(SCRIPT)]
+                    body = {
+                        "sessionId": session_id,
+                        "message": {"sender": "scammer", "text": text},
+                        "conversationHistory": history,
+                    }
+                    start = time.perf_counter()
+                    try:
+                        r = await client.post("/honey-pot-entry", json=body, headers={"x-api-key": API_KEY})
+                        statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+                        reply = r.json().get("reply", "") if r.status_code == 200 else ""
+                    except httpx.HTTPError:
+                        errors += 1
+                        reply = ""
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    history = history + [{"sender": "scammer", "text": text}, {"sender": "user", "text": reply}]
+                conversation += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    ok = statuses.get(200, 0)
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "ok": ok,
+        "errors": errors + sum(v for k, v in statuses.items() if k != 200),
+        "statusCodes": {str(k): v for k, v in sorted(statuses.items())},
+        "elapsedSeconds": round(elapsed, 3),
+        "throughputRps": round(ok / elapsed, 2) if elapsed else 0.0,
+        "latencyMs": {
+            "mean": round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 1),
+            "p95": round(percentile(latencies, 95), 1),
+            "p99": round(percentile(latencies, 99), 1),
+            "max": round(latencies[-1], 1) if latencies else 0.0,
+        },
+    }
+
+# =========================================================
+# REGRESSION GATE
+# =========================================================
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    failures = []
+    previous = {row["concurrency"]: row for row in baseline.get("levels", [])}
+    for row in results["levels"]:
+        old = previous.get(row["concurrency"])
+        if not old:
+            continue
+        if row["throughputRps"] < old["throughputRps"] * (1 - tolerance):
+            failures.append(f"c={row['concurrency']}: throughput {row['throughputRps']} < baseline {old['throughputRps']}")
+        if row["latencyMs"]["p95"] > old["latencyMs"]["p95"] * (1 + tolerance):
+            failures.append(f"c={row['concurrency']}: p95 {row['latencyMs']['p95']} ms > baseline {old['latencyMs']['p95']} ms")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline load test for /honey-pot-entry.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--requests", type=int, default=400, help="requests per concurrency level")
+    parser.add_argument("--turns", type=int, default=5, help="turns per simulated conversation")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the app")
+    parser.add_argument("--session-backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--llm-dist", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--llm-spread", type=float, default=0.5)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-429-rate", type=float, default=0.0)
+    parser.add_argument("--callback-latency", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--reply-cache", action="store_true", help="leave the reply cache on")
+    parser.add_argument("-o", "--output", default="load_results.json")
+    parser.add_argument("--baseline", help="previous results JSON to gate against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    llm_app = mock_llm_server.create_app(
+        latency=args.llm_latency, latency_dist=args.llm_dist, latency_spread=args.llm_spread,
+        error_rate=args.llm_error_rate, rate_limit_rate=args.llm_429_rate, seed=args.seed,
+    )
+    callback_app = mock_callback_server.create_app(latency=args.callback_latency)
+
+    with ServerThread(llm_app) as llm, ServerThread(callback_app) as callback, \
+            tempfile.TemporaryDirectory() as tmp:
+        env = {
+            "GROQ_API_KEY": "load-test-key",
+            "GROQ_BASE_URL": llm.url,
+            "GUVI_CALLBACK_URL": callback.url + "/callback",
+            "CALLBACK_SPOOL": os.path.join(tmp, "callback_spool.jsonl"),
+            "TRANSCRIPT_LOG": os.path.join(tmp, "transcript_log.jsonl"),
+            "SESSION_BACKEND": args.session_backend,
+            "SESSION_DB": os.path.join(tmp, "sessions.db"),
+            # The stand-in LLM has no quota; keep the scheduler out of the way.
+            "LLM_RPM": "0",
+            "LLM_TPM": "0",
+        }
+        if not args.reply_cache:
+            env["REPLY_CACHE_SIZE"] = "0"
+
+        app = AppProcess(env, workers=args.workers)
+        try:
+            app.wait_ready()
+            levels = []
+            for concurrency in args.levels:
+                row = asyncio.run(run_level(app.url, concurrency, args.requests, args.turns, args.timeout))
+                levels.append(row)
+                lat = row["latencyMs"]
+                print(f"c={concurrency:<4} {row['throughputRps']:>8.1f} req/s  p50 {lat['p50']:>7.1f}  "
+                      f"p95 {lat['p95']:>7.1f}  p99 {lat['p99']:>7.1f} ms  errors {row['errors']}")
+            time.sleep(0.5)  # let queued callbacks drain before reading the stand-in's counters
+        finally:
+            app.stop()
+
+        results = {
+            "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+            "levels": levels,
+            "mocks": {
+                "llmRequests": llm_app.state.requests,
+                "llmErrorsInjected": llm_app.state.errors,
+                "llm429sInjected": llm_app.state.rate_limited,
+                "callbacksReceived": len(callback_app.state.received),
+            },
+        }
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"📄 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failures = compare(results, json.load(f), args.tolerance)
+        for failure in failures:
+            print(f"❌ Regression: {failure}")
+        if failures:
+            return 1
+        print("✅ No regression against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
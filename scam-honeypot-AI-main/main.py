@@ -1,23 +1,99 @@
-from fastapi import FastAPI, Request, Header, HTTPException, Response
-from fastapi.responses import PlainTextResponse
-from typing import Optional, List
+from fastapi import FastAPI, Request, Header, HTTPException, Query, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from fastapi.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from typing import Optional
 import time
-import requests 
-import re
+import asyncio
 import os
-import json
-from groq import Groq
+import threading
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-from prompts import SYSTEM_PROMPT
+from prompts import SYSTEM_PROMPT, get_prompt
+from llm_client import USAGE, AsyncLLMClient, LLM_MODEL
+from llm_scheduler import SCHEDULER, PRIORITY_LIVE, request_tokens
+from cassette import install_cassette
+from llm_router import LLMRouter, build_llm
+from callbacks import CALLBACK_SPOOL, CallbackDispatcher
+from session_backend import build_session_store, worker_path
+from reply_cache import ReplyCache
+from context_manager import ContextManager, truncate_tokens
+from extraction import Intelligence, extract_intelligence
+from classifier import degraded_reply, detect_scam, fast_path_reply, load_classifier
+from admission import AdmissionController, Overloaded
+from blocklist import load_blocklist
+from api_models import EntryReply, EntryRequest, JSONBytesResponse, dumps, read_body
+from startup import Warmup, import_deferred
+from transcript_store import INDICATOR_FIELDS, TRANSCRIPT_LOG, TranscriptStore, indicator_hits
+from indicator_index import IndicatorIndex, transcript_sizes
+from metrics import (
+    REGISTRY, CONTENT_TYPE, Gauge, REQUEST_SECONDS, REQUESTS_IN_FLIGHT, PARSE_SECONDS,
+    EXTRACTION_SECONDS, LLM_SECONDS, LLM_ERRORS, FALLBACK_REPLIES, REPLY_CACHE_HITS, FAST_PATH_REPLIES,
+)
+import batch_extract
 
 # =========================================================
 # APP INIT
 # =========================================================
-app = FastAPI(title="Agentic Scam Honeypot API")
+# Spool and transcript log have one writer each; with several workers
+# (WEB_CONCURRENCY > 1) every worker gets its own file.
+callback_dispatcher = CallbackDispatcher(spool_path=worker_path(CALLBACK_SPOOL))
+# Every turn, written off the request path. TRANSCRIPT_LOG="" turns it off.
+transcript_store = TranscriptStore(worker_path(TRANSCRIPT_LOG)) if TRANSCRIPT_LOG else None
+# Which sessions each UPI ID / phone / link showed up in.
+indicator_index = IndicatorIndex()
+
+# Connections and deferred imports, finished in the background; /readyz.
+warmup = Warmup()
+
+async def warm_llm():
+    # The SDK import is deferred; do it off the event loop before binding.
+    await asyncio.to_thread(import_deferred, ("groq",))
+    return await async_llm.warm()
+
+def rebuild_indicator_index(sizes):
+    start = time.perf_counter()
+    records = indicator_index.rebuild(list(sizes), sizes)
+    if records:
+        print(f"🗂️ Indicator index: {len(indicator_index)} indicators from {records} turns "
+              f"in {time.perf_counter() - start:.2f}s")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    callback_dispatcher.start()
+    # Rebuilt on a thread from the logs as they are now, while new turns
+    # are indexed live; /indicators answers 503 until it is done. Runs
+    # whether or not warm-up is enabled, and warm-up waits for it.
+    indicator_index.ready = False
+    index_rebuild = asyncio.ensure_future(
+        asyncio.to_thread(rebuild_indicator_index, transcript_sizes(TRANSCRIPT_LOG)))
+
+    async def indicator_index_built():
+        await asyncio.shield(index_rebuild)
+
+    if transcript_store is not None:
+        transcript_store.start()
+    warmup.start([
+        ("imports", import_deferred),
+        ("llm", warm_llm if async_llm else None),
+        ("callbacks", callback_dispatcher.warm),
+        ("sourceCode", source_code),
+        ("indicatorIndex", indicator_index_built),
+    ])
+    yield
+    await warmup.stop()
+    await asyncio.gather(index_rebuild, return_exceptions=True)
+    callback_dispatcher.stop()
+    if transcript_store is not None:
+        transcript_store.stop()
+    session_store.close()
+    batch_extract.shutdown_pool()
+
+app = FastAPI(title="Agentic Scam Honeypot API", lifespan=lifespan)
 
 # =========================================================
 # CONFIG
@@ -25,81 +101,290 @@ app = FastAPI(title="Agentic Scam Honeypot API")
 API_KEY = "team_top_250_secret"
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-# Initialize Groq Client
+# Initialize Groq Client. The sync client (generate_ai_reply only) is built
+# on first use: constructing it imports the SDK and its HTTP stack, which
+# would otherwise sit in every cold start.
+groq_client = None
+_groq_client_lock = threading.Lock()
 if not GROQ_API_KEY:
     print("WARNING: GROQ_API_KEY not found in environment variables. AI responses will fail.")
-    groq_client = None
+    async_llm = None
 else:
-    groq_client = Groq(api_key=GROQ_API_KEY)
+    # Plain client, or a hedging router when a second model/provider is configured.
+    async_llm = build_llm(AsyncLLMClient(api_key=GROQ_API_KEY), LLM_MODEL)
+
+_prompt = get_prompt()
+print(f"📝 System prompt {_prompt.id} ({_prompt.fingerprint}), ~{_prompt.tokens} tokens")
+
+def get_groq_client():
+    global groq_client
+    if groq_client is None and GROQ_API_KEY:
+        with _groq_client_lock:
+            if groq_client is None:
+                from groq import Groq
+                groq_client = install_cassette(Groq(api_key=GROQ_API_KEY, max_retries=0))
+    return groq_client
 
 # =========================================================
-# INTELLIGENCE STRUCTURE
+# SESSION STORE
 # =========================================================
-class Intelligence:
-    def __init__(self):
-        self.scamDetected = False
-        self.upiIds: List[str] = []
-        self.bankAccounts: List[str] = []
-        self.phishingLinks: List[str] = []
-        self.phoneNumbers: List[str] = []
-        self.suspiciousKeywords: List[str] = []
-        self.callback_sent = False
+# In-process by default; SESSION_BACKEND=sqlite shares sessions between
+# workers (see session_backend.py for the multi-worker launch).
+session_store = build_session_store(Intelligence)
+
+def history_text(item) -> str:
+    # History items follow the message shape: {"sender", "text", "timestamp"}
+    if isinstance(item, dict):
+        if item.get("sender", "scammer") != "scammer":
+            return ""
+        return str(item.get("text", ""))
+    return str(item)
 
 # =========================================================
-# SIMPLE DETECTION & EXTRACTION
+# REPLY CACHE
 # =========================================================
-def extract_intelligence(text: str, intel: Intelligence):
-    if not text:
-        return
+reply_cache = ReplyCache()
 
-    # UPI IDs
-    intel.upiIds += re.findall(r"[a-zA-Z0-9.\-_]{2,}@[a-zA-Z]{2,}", text)
+# =========================================================
+# SCAM CLASSIFIER
+# =========================================================
+# Decides scamDetected, and lets benign or repeated messages skip the LLM.
+# None (no model file) keeps the old "any extraction hit" rule.
+classifier = load_classifier()
 
-    # Phone numbers
-    intel.phoneNumbers += re.findall(r"\b\d{10}\b", text)
+def fast_path(user_text: str, session_id: str, history: Optional[list]) -> Optional[str]:
+    hit = fast_path_reply(classifier, user_text, session_id, history)
+    if hit is None:
+        return None
+    reason, reply = hit
+    FAST_PATH_REPLIES.labels(reason).inc()
+    return reply
 
-    # URLs
-    intel.phishingLinks += re.findall(r"https?://[^\s]+", text)
+# =========================================================
+# KNOWN-BAD INDICATORS
+# =========================================================
+# Memory-mapped Bloom filter compiled by `python blocklist.py compile`;
+# without one, nothing is flagged.
+blocklist = load_blocklist()
+# /extract/batch decides scamDetected the same way as live turns.
+batch_extract.use_detection(classifier, blocklist)
 
-    # Keywords
-    keywords = ["urgent", "verify", "blocked", "otp", "account", "refund", "pay", "money"]
-    for k in keywords:
-        if k in text.lower():
-            intel.suspiciousKeywords.append(k)
+# =========================================================
+# ADMISSION CONTROL
+# =========================================================
+# Bounds the turns in progress, sheds the excess with 503 + Retry-After,
+# and switches to stall replies while live LLM calls queue too long.
+admission = AdmissionController(wait_probe=lambda: async_llm.oldest_wait() if async_llm else 0.0)
 
-    if intel.upiIds or intel.phishingLinks or intel.phoneNumbers or intel.suspiciousKeywords:
-        intel.scamDetected = True
+# /extract/batch gets its own, small limit so backfills cannot take the
+# slots (or the CPU) live turns need.
+batch_admission = AdmissionController(max_in_flight=batch_extract.BATCH_MAX_IN_FLIGHT,
+                                      max_queue=batch_extract.BATCH_MAX_IN_FLIGHT,
+                                      key_limit=0, key_limits={}, degrade_wait=0)
+
+async def admit_turn(api_key: str, batch: bool = False):
+    try:
+        return await (batch_admission if batch else admission).admit(api_key)
+    except Overloaded as e:
+        print(f"🚦 {'Batch' if batch else 'Turn'} shed ({e.reason})")
+        raise HTTPException(status_code=e.status_code, detail=f"Overloaded ({e.reason}), retry later",
+                            headers=e.headers)
+
+def degraded(session_id: str, history: Optional[list]) -> Optional[str]:
+    """A stall reply while the LLM queue is backed up, else None."""
+    if not admission.degraded():
+        return None
+    admission.count_degraded()
+    return degraded_reply(session_id, history)
+
+# =========================================================
+# PROMPT CONTEXT
+# =========================================================
+context_manager = ContextManager()
+
+# =========================================================
+# METRICS
+# =========================================================
+# Gauges read at scrape time from the components that already track them.
+REGISTRY.register(Gauge(
+    "honeypot_llm_in_flight", "LLM calls currently in flight on this worker.",
+    fn=lambda: async_llm.in_flight if async_llm else 0,
+))
+REGISTRY.register(Gauge(
+    "honeypot_callbacks_pending", "Callbacks queued or being posted.",
+    fn=lambda: callback_dispatcher.pending(),
+))
+REGISTRY.register(Gauge(
+    "honeypot_llm_queue_depth", "LLM calls waiting on the rate-limit scheduler.",
+    fn=lambda: SCHEDULER.snapshot_stats()["queue_depth"],
+))
+REGISTRY.register(Gauge(
+    "honeypot_admission_in_flight", "Turns admitted and not finished yet.",
+    fn=lambda: admission.in_flight,
+))
+REGISTRY.register(Gauge(
+    "honeypot_admission_queue_depth", "Turns waiting for an admission slot.",
+    fn=lambda: admission.queue_depth,
+))
+REGISTRY.register(Gauge(
+    "honeypot_degraded", "1 while turns are answered from the stall bank instead of the LLM.",
+    fn=lambda: 1 if admission.degraded() else 0,
+))
+ENTRY_SECONDS = REQUEST_SECONDS.labels("honey-pot-entry")
+STREAM_SECONDS = REQUEST_SECONDS.labels("honey-pot-entry/stream")
+
+FALLBACK_REPLY = "I'm having some network trouble, can you repeat that?"
 
 # =========================================================
 # AI RESPONSE GENERATOR (GROQ)
 # =========================================================
 def generate_ai_reply(user_text: str) -> str:
-    if not groq_client:
+    client = get_groq_client()
+    if not client:
         return "System Error: AI backend not configured."
 
-    try:
-        completion = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_text}
-            ],
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": truncate_tokens(user_text, context_manager.max_message_tokens)}
+    ]
+
+    def attempt():
+        start = time.perf_counter()
+        completion = client.chat.completions.create(
+            model=LLM_MODEL,
+            messages=messages,
             temperature=0.7,
             max_tokens=150,
             top_p=1,
         )
+        USAGE.record_completion(messages, completion, time.perf_counter() - start)
+        return completion
+
+    try:
+        completion = SCHEDULER.call(attempt, request_tokens(messages, 150), PRIORITY_LIVE)
         return completion.choices[0].message.content.strip()
     except Exception as e:
         print(f"Error generating AI reply: {e}")
         return "I'm having some network trouble, can you repeat that?"
 
+def reply_messages(user_text: str, session_id: str = "", history: Optional[list] = None) -> list:
+    context = context_manager.build(session_id, SYSTEM_PROMPT, history or [], user_text)
+    print(f"🧮 Prompt ~{context.prompt_tokens} tokens "
+          f"({context.recent_messages} recent, {context.summarized_messages} summarized)")
+    return context.messages
+
+async def generate_ai_reply_async(user_text: str, session_id: str = "", history: Optional[list] = None) -> str:
+    """
+    Non-blocking variant used by the API handler. Shares one connection
+    pool per worker and is bounded by LLM_MAX_CONCURRENCY. Clearly benign
+    or repeated messages get a stall reply, and openers (no history yet) of
+    repeated scammer scripts are answered from the reply cache; other turns
+    depend on the conversation and go to the LLM, unless it is backed up
+    (degraded mode, another stall reply).
+    """
+    stall = fast_path(user_text, session_id, history)
+    if stall is not None:
+        return stall
+
+    if not async_llm:
+        FALLBACK_REPLIES.inc()
+        return "System Error: AI backend not configured."
+
+    cacheable = not history
+    if cacheable:
+        cached = reply_cache.get(user_text)
+        if cached is not None:
+            REPLY_CACHE_HITS.inc()
+            return cached
+
+    stall = degraded(session_id, history)
+    if stall is not None:
+        return stall
+
+    messages = reply_messages(user_text, session_id, history)
+    start = time.perf_counter()
+    try:
+        reply = await async_llm.chat(messages)
+    except Exception as e:
+        print(f"Error generating AI reply: {e}")
+        LLM_ERRORS.inc()
+        FALLBACK_REPLIES.inc()
+        return FALLBACK_REPLY
+    finally:
+        LLM_SECONDS.observe(time.perf_counter() - start)
+
+    if cacheable:
+        reply_cache.put(user_text, reply)
+    return reply
+
+async def stream_ai_reply(user_text: str, session_id: str = "", history: Optional[list] = None):
+    """
+    Streaming counterpart of generate_ai_reply_async: yields reply text as
+    the provider produces it. Stall replies, cache hits and fallbacks come
+    out as a single piece.
+    """
+    stall = fast_path(user_text, session_id, history)
+    if stall is not None:
+        yield stall
+        return
+
+    if not async_llm:
+        FALLBACK_REPLIES.inc()
+        yield "System Error: AI backend not configured."
+        return
+
+    cacheable = not history
+    if cacheable:
+        cached = reply_cache.get(user_text)
+        if cached is not None:
+            REPLY_CACHE_HITS.inc()
+            yield cached
+            return
+
+    stall = degraded(session_id, history)
+    if stall is not None:
+        yield stall
+        return
+
+    parts = []
+    messages = reply_messages(user_text, session_id, history)
+    start = time.perf_counter()
+    pieces = async_llm.stream(messages)
+    try:
+        async for piece in pieces:
+            parts.append(piece)
+            yield piece
+    except Exception as e:
+        print(f"Error streaming AI reply: {e}")
+        LLM_ERRORS.inc()
+        if not parts:
+            FALLBACK_REPLIES.inc()
+            yield FALLBACK_REPLY
+        return
+    finally:
+        # Closes the provider stream too when the client goes away mid-reply.
+        await pieces.aclose()
+        LLM_SECONDS.observe(time.perf_counter() - start)
+
+    if cacheable:
+        reply_cache.put(user_text, "".join(parts).strip())
+
 # =========================================================
 # SOURCE CODE ACCESS
 # =========================================================
+_source_code: Optional[bytes] = None
+
+def source_code() -> bytes:
+    """main.py as served by /source_code, read from disk once per worker."""
+    global _source_code
+    if _source_code is None:
+        with open(__file__, "rb") as f:
+            _source_code = f.read()
+    return _source_code
+
 @app.get("/source_code", response_class=PlainTextResponse)
-def get_source_code():
-    with open(__file__, "r") as f:
-        return f.read()
+async def get_source_code():
+    return PlainTextResponse(source_code())
 
 # =========================================================
 # HEALTH CHECK
@@ -112,6 +397,17 @@ def health():
         "message": "API is reachable"
     }
 
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the worker is up and its event loop answers."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: warm-up has finished (or timed out), so the first turn pays no setup cost."""
+    body = warmup.snapshot()
+    return JSONBytesResponse(body, status_code=200 if body["ready"] else 503)
+
 # =========================================================
 # HEAD FIX (REMOVES 405 ERROR)
 # =========================================================
@@ -119,102 +415,296 @@ def health():
 def head_root():
     return Response(status_code=200)
 
+# =========================================================
+# RUNTIME STATS
+# =========================================================
+@app.get("/stats")
+def stats(x_api_key: Optional[str] = Header(None)):
+    if x_api_key != API_KEY:
+        raise HTTPException(status_code=401, detail="Invalid API Key")
+    return {
+        "sessions": session_store.snapshot_stats(),
+        "callbacks": dict(callback_dispatcher.stats),
+        "replyCache": reply_cache.snapshot_stats(),
+        "context": context_manager.snapshot_stats(),
+        "llmScheduler": SCHEDULER.snapshot_stats(),
+        "llmRouter": async_llm.snapshot_stats() if isinstance(async_llm, LLMRouter) else None,
+        "transcripts": transcript_store.snapshot_stats() if transcript_store is not None else None,
+        "indicators": indicator_index.snapshot_stats(),
+        "admission": admission.snapshot_stats(),
+        "batchAdmission": batch_admission.snapshot_stats(),
+        "blocklist": blocklist.snapshot_stats(),
+        "prompt": {k: v for k, v in get_prompt()._asdict().items() if k != "text"},
+        "llmUsage": USAGE.snapshot_stats(),
+    }
+
+# =========================================================
+# INDICATOR LOOKUP
+# =========================================================
+# Per worker (see IndicatorIndex): with WEB_CONCURRENCY > 1 each worker
+# answers from the turns it served plus the logs it rebuilt from at start.
+def check_indicator_index():
+    if not indicator_index.ready:
+        raise HTTPException(status_code=503, detail="Indicator index is still rebuilding",
+                            headers={"Retry-After": "5"})
+
+# /indicators/top must be declared first: {value:path} would match it too.
+@app.get("/indicators/top")
+def top_indicators(n: int = 10, kind: Optional[str] = Query(None, alias="type"), x_api_key: Optional[str] = Header(None)):
+    if x_api_key != API_KEY:
+        raise HTTPException(status_code=401, detail="Invalid API Key")
+    check_indicator_index()
+    if kind is not None and kind not in INDICATOR_FIELDS:
+        raise HTTPException(status_code=400, detail=f"type must be one of {', '.join(INDICATOR_FIELDS)}")
+    n = max(1, min(n, 1000))
+    return {"indicators": [e.to_dict(max_sessions=10) for e in indicator_index.top(n, kind)]}
+
+@app.get("/indicators/{value:path}")
+def lookup_indicator(value: str, kind: Optional[str] = Query(None, alias="type"), x_api_key: Optional[str] = Header(None)):
+    """Sessions an indicator appeared in. Values are normalized, so any spelling matches."""
+    if x_api_key != API_KEY:
+        raise HTTPException(status_code=401, detail="Invalid API Key")
+    check_indicator_index()
+    if kind is not None and kind not in INDICATOR_FIELDS:
+        raise HTTPException(status_code=400, detail=f"type must be one of {', '.join(INDICATOR_FIELDS)}")
+    entries = indicator_index.lookup(value, kind)
+    if not entries:
+        raise HTTPException(status_code=404, detail="Indicator not seen")
+    return {"matches": [e.to_dict() for e in entries]}
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus scrape endpoint. Per-worker values; scrape each worker."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
 # =========================================================
 # GUVI CALLBACK
 # =========================================================
 
-def send_guvi_callback(session_id: str, intel: Intelligence, msg_count: int):
-    """
-    Sends the mandatory final result callback to GUVI evaluation endpoint.
-    """
-    url = "https://hackathon.guvi.in/api/updateHoneyPotFinalResult"
-    
+def build_callback_payload(session_id: str, intel: Intelligence, msg_count: int) -> dict:
     agent_notes = "Scam detected."
     if intel.suspiciousKeywords:
         agent_notes += f" Keywords found: {', '.join(intel.suspiciousKeywords)}."
+    if intel.ifscCodes:
+        agent_notes += f" IFSC codes shared: {', '.join(intel.ifscCodes)}."
+    if intel.knownBadIndicators:
+        agent_notes += f" On known-bad lists: {', '.join(intel.knownBadIndicators)}."
     
     payload = {
         "sessionId": session_id,
         "scamDetected": intel.scamDetected,
         "totalMessagesExchanged": msg_count,
-        "extractedIntelligence": {
-            "bankAccounts": intel.bankAccounts,
-            "upiIds": intel.upiIds,
-            "phishingLinks": intel.phishingLinks,
-            "phoneNumbers": intel.phoneNumbers,
-            "suspiciousKeywords": intel.suspiciousKeywords
-        },
+        "extractedIntelligence": intel.extracted(),
         "agentNotes": agent_notes
     }
+    return payload
 
-    try:
-        # Using a short timeout to prevent hanging the main request
-        # In a production app, use asyncio or a background task
-        print(f"📡 Sending Callback for {session_id}...")
-        response = requests.post(url, json=payload, timeout=5)
-        if response.status_code == 200:
-            print("✅ Callback Success")
-        else:
-            print(f"⚠️ Callback Failed: {response.status_code} - {response.text}")
-    except Exception as e:
-        print(f"❌ Callback Error: {e}")
+def send_guvi_callback(session_id: str, intel: Intelligence, msg_count: int):
+    """
+    Queues the mandatory final result callback to GUVI evaluation endpoint.
+    Delivery, retries and coalescing happen on the dispatcher's workers.
+    """
+    print(f"📡 Queueing Callback for {session_id}...")
+    callback_dispatcher.submit(session_id, build_callback_payload(session_id, intel, msg_count))
+
+# =========================================================
+# TURN HANDLING
+# =========================================================
+def parse_entry_body(raw_body: bytes) -> EntryRequest:
+    """Lenient parsing of the GUVI message body. Never raises."""
+    start = time.perf_counter()
+    entry = EntryRequest.parse(raw_body)
+    PARSE_SECONDS.observe(time.perf_counter() - start)
+    return entry
+
+def record_turn(session_id, role: str, text: str, hits: Optional[dict] = None,
+                latency_ms: Optional[float] = None):
+    """Queues a turn for the transcript store; never touches disk here."""
+    if transcript_store is not None:
+        transcript_store.append(session_id, role, text, hits, latency_ms)
+
+def ingest_turn(session_id, user_text: str, history: list):
+    """
+    Incremental session intelligence. Only the new message is scanned;
+    history is read once, when a session is not in the store yet (first
+    contact, restart or eviction).
+    """
+    start = time.perf_counter()
+    state, created = session_store.get_or_create(str(session_id))
+    turn_intel = Intelligence()
+    extract_intelligence(user_text, turn_intel)
+    hits = indicator_hits(turn_intel)
+    record_turn(session_id, "scammer", user_text, hits=hits)
+    # Same hits as the transcript, so a rebuild from it gives the same index.
+    indicator_index.add(session_id, hits)
+    if created:
+        for item in history:
+            extract_intelligence(history_text(item), turn_intel)
+    # Payment details, links and blocklist hits settle it; the classifier
+    # only judges keyword- and phone-only turns.
+    texts = [user_text] + (list(map(history_text, history)) if created else [])
+    turn_intel.scamDetected = detect_scam(turn_intel, texts, classifier, blocklist)
+
+    intel = state.intel
+    if intel.merge(turn_intel):
+        intel.callback_sent = False
+    state.message_count = max(state.message_count, len(history)) + 1 # +1 for the current message
+    EXTRACTION_SECONDS.observe(time.perf_counter() - start)
+    return state
+
+def finish_turn(session_id, state):
+    # --- SEND MANDATORY CALLBACK IF SCAM DETECTED ---
+    # Re-sent only when the session picked up new intelligence.
+    intel = state.intel
+    if intel.scamDetected and not intel.callback_sent:
+        send_guvi_callback(session_id, intel, state.message_count)
+        intel.callback_sent = True
+    state.message_count += 1 # our reply
+    session_store.save(state)
 
 # =========================================================
 # GUVI API ENTRY POINT
 # =========================================================
-@app.post("/honey-pot-entry")
+@app.post("/honey-pot-entry", response_model=EntryReply)
 async def honey_pot_entry(
     request: Request,
     x_api_key: Optional[str] = Header(None)
 ):
-    start_time = time.time()
+    start_time = time.perf_counter()
 
     # --- API KEY VALIDATION ---
     if x_api_key != API_KEY:
         raise HTTPException(status_code=401, detail="Invalid API Key")
 
-    # --- SAFE BODY PARSING ---
+    ticket = await admit_turn(x_api_key)
+    REQUESTS_IN_FLIGHT.inc()
     try:
-        raw_body = await request.body()
-        body = json.loads(raw_body) if raw_body else {}
-    except Exception as e:
-        print(f"Body parsing error: {e}")
-        body = {}
-
-    if not isinstance(body, dict):
-        body = {}
-
-    # Parse Message
-    message_data = body.get("message", {})
-    if isinstance(message_data, dict):
-        user_text = message_data.get("text", "")
-    else:
-        user_text = str(message_data) # Fallback if message is just a string
-    
-    if not user_text:
-        user_text = "Hello" # Default fallback
-
-    session_id = body.get("sessionId", "guvi-session")
-    
-    # Parse History for Count
-    history = body.get("conversationHistory", [])
-    total_messages = len(history) + 1 # +1 for the current message
-
-    intel = Intelligence()
-    extract_intelligence(str(user_text), intel)
+        # --- SAFE BODY PARSING ---
+        entry = parse_entry_body(await read_body(request))
+        session_id, user_text, history = entry.session_id, entry.text, entry.history
 
-    reply = generate_ai_reply(str(user_text))
+        if session_store.blocking_reads:
+            # The SQLite backend queries the database; keep that off the loop.
+            state = await run_in_threadpool(ingest_turn, session_id, user_text, history)
+        else:
+            state = ingest_turn(session_id, user_text, history)
 
-    # --- SEND MANDATORY CALLBACK IF SCAM DETECTED ---
-    if intel.scamDetected:
-        # We assume the engagement is sufficient if we detected a scam.
-        # Running synchronously here for simplicity as per requirements.
-        send_guvi_callback(session_id, intel, total_messages)
+        reply = await generate_ai_reply_async(user_text, str(session_id), history)
+        record_turn(session_id, "honeypot", reply, latency_ms=(time.perf_counter() - start_time) * 1000)
 
-    latency = round(time.time() - start_time, 3)
+        finish_turn(session_id, state)
+    finally:
+        ticket.release()
+        REQUESTS_IN_FLIGHT.dec()
+        ENTRY_SECONDS.observe(time.perf_counter() - start_time)
 
     # Simplified response as per Section 8 of the prompt
-    return {
+    return JSONBytesResponse({
         "status": "success",
         "reply": reply
-    }
+    })
+
+@app.post("/honey-pot-entry/stream")
+async def honey_pot_entry_stream(
+    request: Request,
+    x_api_key: Optional[str] = Header(None)
+):
+    """
+    Server-Sent Events variant of /honey-pot-entry. Emits `token` events as
+    the LLM produces them and a final `done` event with the full reply, the
+    session intelligence and server-side timings.
+    """
+    start = time.perf_counter()
+
+    if x_api_key != API_KEY:
+        raise HTTPException(status_code=401, detail="Invalid API Key")
+
+    # Held until the stream ends; released by the background task too, in
+    # case the client goes away before the stream starts.
+    ticket = await admit_turn(x_api_key)
+    try:
+        entry = parse_entry_body(await read_body(request))
+    except BaseException:
+        ticket.release()
+        raise
+    session_id, user_text, history = entry.session_id, entry.text, entry.history
+
+    async def events():
+        # Extraction runs on the threadpool while tokens stream in.
+        ingest = asyncio.ensure_future(run_in_threadpool(ingest_turn, session_id, user_text, history))
+        parts = []
+        first_token = None
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            async for piece in stream_ai_reply(user_text, str(session_id), history):
+                if first_token is None:
+                    first_token = time.perf_counter()
+                parts.append(piece)
+                yield sse_event("token", {"text": piece})
+
+            state = await ingest
+            record_turn(session_id, "honeypot", "".join(parts).strip(),
+                        latency_ms=(time.perf_counter() - start) * 1000)
+            finish_turn(session_id, state)
+        finally:
+            ingest.cancel()
+            ticket.release()
+            REQUESTS_IN_FLIGHT.dec()
+
+        done = time.perf_counter()
+        STREAM_SECONDS.observe(done - start)
+        yield sse_event("done", {
+            "status": "success",
+            "reply": "".join(parts).strip(),
+            "scamDetected": state.intel.scamDetected,
+            "extractedIntelligence": state.intel.extracted(),
+            "timing": {
+                "ttftMs": round(((first_token or done) - start) * 1000, 1),
+                "totalMs": round((done - start) * 1000, 1),
+            },
+        })
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+                             background=BackgroundTask(ticket.release))
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+# =========================================================
+# BULK EXTRACTION (NO LLM)
+# =========================================================
+@app.post("/extract/batch")
+async def extract_batch(
+    request: Request,
+    x_api_key: Optional[str] = Header(None)
+):
+    """
+    Backfill endpoint: takes a JSON array or JSONL of messages and streams
+    one NDJSON record per message, in input order. Extraction only.
+    """
+    if x_api_key != API_KEY:
+        raise HTTPException(status_code=401, detail="Invalid API Key")
+
+    ticket = await admit_turn(x_api_key, batch=True)
+    try:
+        raw_body = await read_body(request, batch_extract.BATCH_MAX_BODY_BYTES)
+        items = await run_in_threadpool(batch_extract.parse_messages, raw_body)
+    except ValueError as e:
+        ticket.release()
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {e}")
+    except BaseException:
+        ticket.release()
+        raise
+
+    async def records():
+        try:
+            async for block in batch_extract.stream_ndjson(items):
+                yield block
+        finally:
+            ticket.release()
+
+    # Released by the background task too, in case the client goes away
+    # before the stream starts.
+    return StreamingResponse(records(), media_type="application/x-ndjson",
+                             background=BackgroundTask(ticket.release))
@@ -0,0 +1,280 @@
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+# =========================================================
+# PROMETHEUS METRICS
+# =========================================================
+# Small in-process implementation of the Prometheus text format (0.0.4),
+# enough for counters, gauges and histograms with labels. Updates are a
+# bisect plus a few additions under a lock, so the hot path pays well
+# under a microsecond per observation.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds. The low end covers parsing and extraction, the high end LLM
+# calls and callback posts that run into their timeouts.
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0,
+)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def labels(self, *values: str):
+        """Returns the child for a label combination. Cache it on hot paths."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+# =========================================================
+# COUNTER / GAUGE
+# =========================================================
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._children[()].inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class Gauge(Counter):
+    """
+    Gauge updated with inc/dec/set, or read from `fn` at scrape time for
+    values another component already tracks (queue depths, in-flight calls).
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 fn: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.fn = fn
+
+    def dec(self, amount: float = 1.0):
+        self._children[()].dec(amount)
+
+    def set(self, value: float):
+        self._children[()].set(value)
+
+    def _samples(self) -> List[str]:
+        if self.fn is not None:
+            try:
+                self._children[()].set(self.fn())
+            except Exception:
+                pass
+        return super()._samples()
+
+# =========================================================
+# HISTOGRAM
+# =========================================================
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(float(b) for b in buckets if b != float("inf")))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.bounds)
+
+    def observe(self, value: float):
+        self._children[()].observe(value)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+# =========================================================
+# REGISTRY
+# =========================================================
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+# =========================================================
+# HONEYPOT METRICS
+# =========================================================
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "honeypot_stage_seconds",
+    "Time spent per request stage (parse, extraction, llm, callback).",
+    ("stage",),
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "honeypot_request_seconds",
+    "End-to-end handler time per endpoint.",
+    ("endpoint",),
+))
+REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "honeypot_requests_in_flight",
+    "Requests currently inside a honeypot handler.",
+))
+LLM_ERRORS = REGISTRY.register(Counter(
+    "honeypot_llm_errors_total",
+    "LLM calls that raised (timeouts, HTTP errors, rate limits after retries).",
+))
+FALLBACK_REPLIES = REGISTRY.register(Counter(
+    "honeypot_fallback_replies_total",
+    "Replies served from the canned fallback instead of the LLM.",
+))
+REPLY_CACHE_HITS = REGISTRY.register(Counter(
+    "honeypot_reply_cache_hits_total",
+    "Replies served from the reply cache.",
+))
+FAST_PATH_REPLIES = REGISTRY.register(Counter(
+    "honeypot_fast_path_replies_total",
+    "Replies served from the stall bank without an LLM call, by reason (benign, repeat).",
+    ("reason",),
+))
+ADMISSION_SHED = REGISTRY.register(Counter(
+    "honeypot_admission_shed_total",
+    "Turns turned away by admission control, by reason (queue_full, queue_timeout, quota).",
+    ("reason",),
+))
+ADMISSION_QUEUED = REGISTRY.register(Counter(
+    "honeypot_admission_queued_total",
+    "Turns that waited for an admission slot.",
+))
+DEGRADED_TURNS = REGISTRY.register(Counter(
+    "honeypot_degraded_replies_total",
+    "Replies served from the stall bank because the LLM queue was backed up.",
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "honeypot_llm_tokens_total",
+    "Tokens per LLM call as reported by the provider, by prompt variant and kind (prompt, completion).",
+    ("variant", "kind"),
+))
+LLM_CALL_SECONDS = REGISTRY.register(Histogram(
+    "honeypot_llm_call_seconds",
+    "Provider time per LLM call (after queueing), by prompt variant.",
+    ("variant",),
+))
+CALLBACK_FAILURES = REGISTRY.register(Counter(
+    "honeypot_callback_failures_total",
+    "Callback posts that failed (non-2xx or transport error), including retried ones.",
+))
+CALLBACKS_DROPPED = REGISTRY.register(Counter(
+    "honeypot_callbacks_dropped_total",
+    "Callbacks given up on after the last retry.",
+))
+
+# Children for the hot path, so a request does not pay for the label lookup.
+PARSE_SECONDS = STAGE_SECONDS.labels("parse")
+EXTRACTION_SECONDS = STAGE_SECONDS.labels("extraction")
+LLM_SECONDS = STAGE_SECONDS.labels("llm")
+CALLBACK_SECONDS = STAGE_SECONDS.labels("callback")
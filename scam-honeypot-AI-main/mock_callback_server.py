@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+# =========================================================
+# MOCK GUVI CALLBACK ENDPOINT
+# =========================================================
+# Local stand-in for updateHoneyPotFinalResult. Records every payload it
+# receives and can fail the first N requests to exercise retries. Point
+# the app at it with GUVI_CALLBACK_URL=http://127.0.0.1:<port>/callback
+
+
+def create_app(fail_first: int = 0, fail_status: int = 503, latency: float = 0.0) -> FastAPI:
+    app = FastAPI(title="Mock GUVI Callback")
+    app.state.received = []
+    app.state.attempts = 0
+
+    @app.post("/callback")
+    async def callback(request: Request):
+        app.state.attempts += 1
+        if latency:
+            await asyncio.sleep(latency)
+        if app.state.attempts <= fail_first:
+            return Response(status_code=fail_status)
+        app.state.received.append(await request.json())
+        return {"status": "ok"}
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local mock of the GUVI callback endpoint.")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--fail-first", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(fail_first=args.fail_first, latency=args.latency), host="127.0.0.1", port=args.port)
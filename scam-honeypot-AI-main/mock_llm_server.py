@@ -0,0 +1,190 @@
+import argparse
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.requests import ClientDisconnect
+
+# =========================================================
+# MOCK LLM (GROQ-COMPATIBLE)
+# =========================================================
+# Local stand-in for the Groq chat completions API so benchmarks and
+# tests can run offline. Point the Groq SDK at it with
+#   GROQ_BASE_URL=http://127.0.0.1:<port>
+
+MOCK_REPLY = "Oh okay sir, which app should I open for this?"
+
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+def latency_sampler(latency: float, dist: str = "fixed", spread: float = 0.5, seed: Optional[int] = None):
+    """
+    Returns a function producing first-token delays with mean ~`latency`:
+      fixed       always `latency`
+      uniform     latency * U(1 - spread, 1 + spread)
+      exponential exponential with mean `latency` (long, thin tail)
+      lognormal   lognormal with median `latency`, sigma `spread` (heavy tail)
+    """
+    rng = random.Random(seed)
+    if dist == "fixed":
+        return lambda: latency
+    if dist == "uniform":
+        return lambda: latency * rng.uniform(1 - spread, 1 + spread)
+    if dist == "exponential":
+        return lambda: rng.expovariate(1 / latency) if latency > 0 else 0.0
+    if dist == "lognormal":
+        return lambda: rng.lognormvariate(math.log(latency), spread) if latency > 0 else 0.0
+    raise ValueError(f"Unknown latency distribution: {dist}")
+
+
+def create_app(
+    latency: float = 0.1,
+    reply: str = MOCK_REPLY,
+    token_delay: float = 0.0,
+    latency_dist: str = "fixed",
+    latency_spread: float = 0.5,
+    error_rate: float = 0.0,
+    rate_limit_rate: float = 0.0,
+    retry_after: float = 1.0,
+    seed: Optional[int] = None,
+) -> FastAPI:
+    """
+    `latency` is the time to the first token, drawn from `latency_dist`.
+    With `token_delay`, every further word costs that much more, for both
+    plain and streamed replies. `error_rate` and `rate_limit_rate` are the
+    fractions of requests answered with a 500 or a 429 (with Retry-After).
+    """
+    app = FastAPI(title="Mock LLM")
+    app.state.requests = 0
+    app.state.errors = 0
+    app.state.rate_limited = 0
+    words = reply.split(" ")
+    sample_latency = latency_sampler(latency, latency_dist, latency_spread, seed)
+    rng = random.Random(seed)
+
+    async def stream_chunks(completion_id: str, model: str, delay: float):
+        await asyncio.sleep(delay)
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(token_delay)
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word},
+                             "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        try:
+            body = await request.json()
+        except ClientDisconnect:
+            # Hedged callers cancel the losing request mid-flight.
+            return JSONResponse(status_code=499, content={})
+        app.state.requests += 1
+        completion_id = f"mock-{app.state.requests}"
+
+        roll = rng.random()
+        if roll < rate_limit_rate:
+            app.state.rate_limited += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": f"{retry_after:g}"},
+                content={"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_exceeded"}},
+            )
+        if roll < rate_limit_rate + error_rate:
+            app.state.errors += 1
+            return JSONResponse(status_code=500, content={"error": {"message": "Injected failure (mock)"}})
+
+        delay = sample_latency()
+        if body.get("stream"):
+            return StreamingResponse(stream_chunks(completion_id, body.get("model", "mock"), delay),
+                                     media_type="text/event-stream")
+        await asyncio.sleep(delay + token_delay * (len(words) - 1))
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in body.get("messages", []))
+        prompt_tokens = prompt_chars // 4
+        completion_tokens = len(reply) // 4
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    return app
+
+# =========================================================
+# IN-PROCESS RUNNER
+# =========================================================
+class ServerThread:
+    """
+    Runs a uvicorn server on a background thread. Use port 0 to let the
+    OS pick a free port; the bound URL is available as `.url` after start().
+    """
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0):
+        config = uvicorn.Config(app, host=host, port=port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.url = None
+
+    def start(self) -> "ServerThread":
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        host, port = self.server.servers[0].sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local mock of the Groq API.")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-spread", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    app = create_app(
+        latency=args.latency, token_delay=args.token_delay,
+        latency_dist=args.latency_dist, latency_spread=args.latency_spread,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after, seed=args.seed,
+    )
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
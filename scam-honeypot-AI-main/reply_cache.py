@@ -0,0 +1,107 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+# =========================================================
+# CONFIG
+# =========================================================
+REPLY_CACHE_SIZE = int(os.getenv("REPLY_CACHE_SIZE", "2048"))
+REPLY_CACHE_TTL = float(os.getenv("REPLY_CACHE_TTL", "1800"))
+REPLY_CACHE_POOL = int(os.getenv("REPLY_CACHE_POOL", "4"))
+
+# =========================================================
+# KEY NORMALIZATION
+# =========================================================
+_DIGITS = re.compile(r"\d+")
+_SPACE = re.compile(r"\s+")
+_REPEATED_PUNCT = re.compile(r"([!?.])\1+")
+
+def normalize(text: str) -> str:
+    """
+    Collapses the differences scripted openers usually have between sends:
+    case, spacing, repeated punctuation and numbers (amounts, phone
+    numbers, reference IDs).
+    """
+    text = _DIGITS.sub("#", text.lower())
+    text = _REPEATED_PUNCT.sub(r"\1", text)
+    return _SPACE.sub(" ", text).strip()
+
+# =========================================================
+# REPLY CACHE
+# =========================================================
+class _Entry:
+    __slots__ = ("replies", "created", "next")
+
+    def __init__(self, now: float):
+        self.replies: List[str] = []
+        self.created = now
+        self.next = 0
+
+class ReplyCache:
+    """
+    Caches victim replies per normalized scammer message.
+
+    A key is only served once it holds `pool_size` distinct replies; until
+    then every lookup misses so the LLM fills the pool. Hits rotate through
+    the pool, so a scammer repeating the same line does not get the same
+    answer back verbatim.
+    """
+
+    def __init__(
+        self,
+        max_size: int = REPLY_CACHE_SIZE,
+        ttl: float = REPLY_CACHE_TTL,
+        pool_size: int = REPLY_CACHE_POOL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.pool_size = pool_size
+        self.clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "fills": 0, "evictions": 0, "expired": 0}
+
+    def get(self, text: str) -> Optional[str]:
+        key = normalize(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.clock() - entry.created > self.ttl:
+                del self._entries[key]
+                self.stats["expired"] += 1
+                entry = None
+            if entry is None or len(entry.replies) < self.pool_size:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            reply = entry.replies[entry.next]
+            entry.next = (entry.next + 1) % len(entry.replies)
+            self.stats["hits"] += 1
+            return reply
+
+    def put(self, text: str, reply: str):
+        key = normalize(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry(self.clock())
+                self._entries[key] = entry
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+            else:
+                self._entries.move_to_end(key)
+            if len(entry.replies) < self.pool_size and reply not in entry.replies:
+                entry.replies.append(reply)
+                self.stats["fills"] += 1
+
+    def hit_rate(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def snapshot_stats(self) -> dict:
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), hit_rate=round(self.hit_rate(), 4))
@@ -0,0 +1,370 @@
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# =========================================================
+# SYNTHETIC SCAM CORPUS
+# =========================================================
+# A seeded generator for stress-testing extraction. Scam templates from a
+# dozen families are filled with freshly generated UPI IDs, phone numbers,
+# links, bank accounts and IFSC codes, and every planted value is recorded
+# as ground truth in the form extract_intelligence reports it. Around them:
+# benign chat with look-alike decoys (order numbers, e-mail addresses,
+# times, file names), indicators written in formats the extractor is known
+# to miss, and adversarial long inputs, either padded to tens of KB or
+# built around regex-hostile filler. The same (messages, seed) always
+# gives the same corpus, so runs can be compared.
+#
+#   python scam_corpus.py --messages 1000000 -o corpus.jsonl
+#   python bench_corpus.py --messages 1000000   (generates in memory)
+
+# Bump when a change here changes the generated text for a given seed, so
+# benchmark results are never compared across different corpora.
+CORPUS_VERSION = 1
+
+# Ground truth uses the Intelligence field names.
+INDICATOR_FIELDS = ("upiIds", "phoneNumbers", "phishingLinks", "bankAccounts", "ifscCodes")
+
+
+class Sample(NamedTuple):
+    id: int
+    category: str
+    text: str
+    expected: Dict[str, List[str]]  # field -> values, as extract_intelligence reports them
+
+# =========================================================
+# VOCABULARY
+# =========================================================
+FIRST_NAMES = ("rahul", "priya", "amit", "sneha", "vikram", "anjali", "rohit", "pooja", "suresh", "kavita",
+               "arjun", "neha", "manoj", "deepa", "ravi", "sunita", "karan", "meera", "ajay", "divya")
+UPI_WORDS = ("refund", "kyc", "support", "claim", "prize", "helpdesk", "verify", "cashback", "payment",
+             "desk", "care", "service", "office", "reward", "update")
+UPI_HANDLES = ("okaxis", "okicici", "oksbi", "okhdfcbank", "ybl", "paytm", "ibl", "axl", "apl", "upi",
+               "icici", "sbi", "hdfcbank", "kotak", "barodampay")
+BANKS = (("SBI", "SBIN"), ("HDFC Bank", "HDFC"), ("ICICI Bank", "ICIC"), ("Axis Bank", "UTIB"),
+         ("Punjab National Bank", "PUNB"), ("Bank of Baroda", "BARB"), ("Kotak Bank", "KKBK"),
+         ("Canara Bank", "CNRB"))
+LINK_WORDS = ("sbi", "hdfc", "kyc", "update", "verify", "secure", "login", "claim", "prize", "refund",
+              "support", "customs", "parcel", "bill", "pay", "gov", "help", "reward", "bonus", "india")
+LINK_TLDS = ("in", "com", "xyz", "top", "online", "site", "live", "link", "info", "co.in", "net", "click", "app")
+LINK_PATHS = ("", "/verify", "/login", "/kyc/update", "/claim?id={n}", "/app.apk", "/pay?ref={n}",
+              "/secure/login.php", "/track/{n}", "/refund")
+APPS = ("AnyDesk", "TeamViewer", "QuickSupport", "RustDesk")
+AMOUNTS = ("10", "49", "99", "199", "499", "999", "1,500", "2,000", "5,000", "12,500", "25,000")
+GREETINGS = ("", "", "Dear Customer, ", "Hello sir, ", "Madam, ", "ATTENTION: ", "Dear user, ", "Hi, ")
+CLOSERS = ("", "", " Do it fast.", " Time is running out!", " Reply immediately.", " Don't tell anyone.",
+           " This is the final warning.", " Thank you.")
+
+# =========================================================
+# SCAM TEMPLATES
+# =========================================================
+# {upi} {phone} {link} {account} {ifsc} are planted indicators; {amount},
+# {bank}, {app}, {name} and {minutes} are filler.
+TEMPLATES = {
+    "lottery": (
+        "CONGRATULATIONS! You have won Rs {amount} lakh in the Global Lucky Draw. Pay the processing fee to {upi} to claim.",
+        "Your mobile number won the KBC lottery. Contact our manager {name} on {phone} with your claim code.",
+        "To release your prize, transfer Rs {amount} to A/C {account} IFSC {ifsc} within {minutes} minutes.",
+        "Claim your prize at {link} before it expires, winners list is closing.",
+    ),
+    "tech_support": (
+        "ALERT: Your computer is infected. Call Microsoft Support at {phone} immediately.",
+        "Download {app} from {link} so our engineer can remove the virus.",
+        "Your Windows licence expired. Pay Rs {amount} renewal to {upi} or the system will be locked.",
+        "Security team here. Install {app} and read me the code, or call {phone} to unlock your IP.",
+    ),
+    "kyc": (
+        "Your {bank} account is blocked due to pending KYC. Update now at {link}",
+        "Pay Rs {amount} verification charge to {upi} to unblock your account.",
+        "Call our KYC officer on {phone} and share the OTP you receive to verify.",
+        "For re-activation deposit Rs {amount} in account {account}, IFSC {ifsc}, then send screenshot.",
+    ),
+    "parcel": (
+        "Your parcel is held at customs. Pay clearance fee Rs {amount} to {upi} to release it.",
+        "FedEx: shipment contains illegal items. Call the officer at {phone} or face action.",
+        "Track and pay the pending duty at {link} within {minutes} minutes.",
+    ),
+    "job": (
+        "Congratulations {name}, you are selected for work from home job, earn Rs {amount} daily. Registration fee to {upi}.",
+        "HR team: pay the joining kit deposit to A/C {account} ({ifsc}) and whatsapp the receipt to {phone}.",
+        "Complete simple YouTube like tasks and earn, register at {link}",
+    ),
+    "investment": (
+        "Invest Rs {amount} today and get 5x returns in 7 days, guaranteed. Send to {upi}.",
+        "Join our VIP crypto trading group, deposit at {link} and withdraw profit daily.",
+        "Our analyst {name} will guide you, call {phone}. Transfer capital to {account}, IFSC {ifsc}.",
+    ),
+    "utility": (
+        "Dear consumer your electricity connection will be disconnected tonight at 9.30 pm. Contact officer {phone}.",
+        "Your last bill is not updated. Pay Rs {amount} to {upi} to avoid disconnection.",
+        "Update your electricity bill details at {link} immediately.",
+    ),
+    "digital_arrest": (
+        "This is the Cyber Crime Department. A case is registered against your Aadhaar. Call {phone} now.",
+        "To clear your name, transfer Rs {amount} to the RBI verification account {account}, IFSC {ifsc}.",
+        "Join the video statement at {link} and do not disconnect, or you will be arrested.",
+    ),
+    "loan": (
+        "Your loan of Rs {amount} is pre-approved at 0% interest. Pay processing fee to {upi}.",
+        "Instant loan approved! Download the app from {link} and complete eKYC.",
+        "Loan recovery agent: pay the overdue to {upi} or call {phone}, else we contact your family.",
+    ),
+    "refund": (
+        "Income tax refund of Rs {amount} is pending. Share your account details at {link}",
+        "Your refund failed. To receive money, pay Rs 1 to {upi} and enter your UPI PIN.",
+        "Refund desk: call {phone} to process your refund to account {account}.",
+    ),
+    "family_emergency": (
+        "Mummy I lost my phone, this is my new number {phone}. Please send Rs {amount} urgently to {upi}.",
+        "Your son has been arrested, send money immediately for bail to A/C {account} IFSC {ifsc}.",
+        "Hi dear, stuck at the airport, pay the fine at {link} please, I will return it.",
+    ),
+    "sim_swap": (
+        "Your SIM card will be blocked in 24 hours. Complete e-KYC by calling {phone}.",
+        "To keep your number active pay Rs {amount} to {upi} and share the OTP.",
+        "Upgrade to 5G SIM free, fill the form at {link}",
+    ),
+}
+
+# =========================================================
+# BENIGN MESSAGES AND DECOYS
+# =========================================================
+# No indicators, except where a decoy really is one. Decoys look like
+# indicators without being one: numbers inside words, times, amounts,
+# dates, file names, e-mail addresses.
+BENIGN = (
+    "Hey, are we still meeting for lunch tomorrow?",
+    "I reached home safely, thanks.",
+    "The meeting has been moved to 4.30 pm.",
+    "Your order #OD{n} has been shipped and will arrive by Friday.",
+    "Please send the report.pdf and the notes.docx before 10.15 tonight.",
+    "Booking ref PNR{n} confirmed for 12/03/2025, coach B2.",
+    "Mail me at {name}@gmail.com when you are free.",
+    "Total bill came to Rs 1,25,000 for the wedding hall, e.g. decoration included.",
+    "Did you watch the match last night? Kohli scored 103.",
+    "Your appointment with Dr. Mehta is confirmed for Monday at 11.00.",
+    "Reminder: the library book is due next week.",
+    "I'll be 10 minutes late, traffic is bad near sector 62.",
+    "Invoice INV-{n} paid, thanks for shopping with us.",
+    "Mom asked if you will come for dinner on Sunday.",
+    "The wifi password is on the fridge, ask Ravi if it doesn't work.",
+)
+
+# Indicators in formats people really write but the extractor does not
+# read (spaced or split digits, defanged links). Ground truth still
+# expects the canonical value, so these show up as misses.
+HARD_TEMPLATES = (
+    "Call me on {phone_spaced} urgently, it is about your account.",
+    "Pay to account number {account_spaced} and send screenshot.",
+    "Login at {link_defanged} to stop the block.",
+    "My number is 0{phone_plain}, whatsapp me the OTP.",
+)
+
+# Regex-hostile filler: long runs that make a pattern scan or backtrack
+# without matching anything.
+def _filler(rng: random.Random, size: int) -> str:
+    kind = rng.randrange(7)
+    if kind == 0:
+        return "9" * size                          # one digit run, far too long for a phone or account
+    if kind == 1:
+        return "ab." * (size // 3) + "zz"          # dots everywhere, no TLD
+    if kind == 2:
+        return "x" * size + " @ "                  # a UPI local part with no handle
+    if kind == 3:
+        return "1234 " * (size // 5)               # digit groups that never reach 10
+    if kind == 4:
+        return "नमस्ते आपका खाता " * (size // 17)   # non-ASCII text
+    if kind == 5:
+        return "." * size
+    return "+91" * (size // 3)                    # phone prefixes with no number
+
+# =========================================================
+# INDICATOR FACTORIES
+# =========================================================
+def _phone_digits(rng: random.Random) -> str:
+    return str(rng.randint(6, 9)) + "".join(str(rng.randrange(10)) for _ in range(9))
+
+
+def _upi(rng: random.Random) -> str:
+    shape = rng.randrange(4)
+    if shape == 0:
+        local = rng.choice(FIRST_NAMES) + str(rng.randrange(1000))
+    elif shape == 1:
+        local = f"{rng.choice(UPI_WORDS)}.{rng.choice(UPI_WORDS)}"
+    elif shape == 2:
+        local = _phone_digits(rng)
+    else:
+        local = f"{rng.choice(FIRST_NAMES)}.{rng.choice(UPI_WORDS)}{rng.randrange(100)}"
+    return f"{local}@{rng.choice(UPI_HANDLES)}"
+
+
+def _link(rng: random.Random) -> str:
+    words = rng.sample(LINK_WORDS, rng.randint(1, 3))
+    host = "-".join(words) + (str(rng.randrange(100)) if rng.random() < 0.4 else "")
+    if rng.random() < 0.3:
+        host = rng.choice(("www.", "secure.", "m.", "login.")) + host
+    host += "." + rng.choice(LINK_TLDS)
+    path = rng.choice(LINK_PATHS).format(n=rng.randrange(10 ** 6))
+    scheme = rng.choice(("http://", "https://", "https://", ""))
+    return scheme + host + path
+
+
+def _account(rng: random.Random) -> str:
+    return str(rng.randint(1, 9)) + "".join(str(rng.randrange(10)) for _ in range(rng.randint(10, 15)))
+
+
+def _ifsc(rng: random.Random, code: str) -> str:
+    return f"{code}0{rng.randrange(10 ** 6):06d}"
+
+
+def _phone_text(rng: random.Random, digits: str) -> str:
+    return rng.choice(("+91-{}", "+91 {}", "+91{}", "{}", "{}")).format(digits)
+
+# =========================================================
+# GENERATOR
+# =========================================================
+# Share of each kind of message; the scam share is split evenly across
+# TEMPLATES.
+MIX = (("scam", 0.75), ("benign", 0.19), ("hard", 0.03), ("adversarial_filler", 0.025),
+       ("adversarial_long", 0.005))
+
+
+class _Planter(dict):
+    """format_map() target that generates each indicator on first use and records it."""
+
+    def __init__(self, rng: random.Random, expected: Dict[str, List[str]]):
+        super().__init__()
+        self.rng = rng
+        self.expected = expected
+        bank, self.code = rng.choice(BANKS)
+        self.update(bank=bank, amount=rng.choice(AMOUNTS), app=rng.choice(APPS),
+                    name=rng.choice(FIRST_NAMES).title(), minutes=rng.choice((5, 10, 15, 30)),
+                    n=rng.randrange(10 ** 6, 10 ** 7))
+
+    def _plant(self, field: str, value: str) -> str:
+        if value not in self.expected.setdefault(field, []):
+            self.expected[field].append(value)
+        return value
+
+    def __missing__(self, key: str) -> str:
+        rng = self.rng
+        if key == "upi":
+            value = self._plant("upiIds", _upi(rng))
+            if value.partition("@")[0].isdigit():
+                self._plant("phoneNumbers", value.partition("@")[0])  # a mobile-number UPI ID shows the phone
+            return value
+        if key == "phone":
+            digits = _phone_digits(rng)
+            self._plant("phoneNumbers", digits)
+            return _phone_text(rng, digits)
+        if key == "link":
+            return self._plant("phishingLinks", _link(rng))
+        if key == "account":
+            return self._plant("bankAccounts", _account(rng))
+        if key == "ifsc":
+            return self._plant("ifscCodes", _ifsc(rng, self.code))
+        if key == "phone_spaced":
+            digits = self._plant("phoneNumbers", _phone_digits(rng))
+            return f"+91 {digits[:5]} {digits[5:]}"
+        if key == "phone_plain":
+            return self._plant("phoneNumbers", _phone_digits(rng))
+        if key == "account_spaced":
+            digits = self._plant("bankAccounts", _account(rng)[:12])
+            return " ".join(digits[i:i + 4] for i in range(0, 12, 4))
+        if key == "link_defanged":
+            link = _link(rng)
+            if "://" not in link:
+                link = "http://" + link
+            self._plant("phishingLinks", link)
+            return link.replace("http", "hxxp", 1).replace(".", "[.]", 1)
+        raise KeyError(key)
+
+
+CATEGORIES = tuple(TEMPLATES)
+
+
+def _scam_text(rng: random.Random, planter: _Planter) -> Tuple[str, str]:
+    category = rng.choice(CATEGORIES)
+    templates = TEMPLATES[category]
+    # One to three lines of the same script in one message.
+    lines = rng.sample(templates, rng.randint(1, min(3, len(templates))))
+    body = " ".join(t.format_map(planter) for t in lines)
+    return category, rng.choice(GREETINGS) + body + rng.choice(CLOSERS)
+
+
+def generate(messages: int, seed: int = 0, max_long_kb: int = 128) -> Iterator[Sample]:
+    """Yields `messages` samples; the same arguments always give the same corpus."""
+    rng = random.Random(seed)
+    kinds = [k for k, _ in MIX]
+    weights = [w for _, w in MIX]
+    for i in range(messages):
+        kind = rng.choices(kinds, weights)[0]
+        expected: Dict[str, List[str]] = {}
+        planter = _Planter(rng, expected)
+        if kind == "scam":
+            category, text = _scam_text(rng, planter)
+        elif kind == "benign":
+            category, text = "benign", rng.choice(BENIGN).format_map(planter)
+        elif kind == "hard":
+            category, text = "hard_formats", rng.choice(HARD_TEMPLATES).format_map(planter)
+        elif kind == "adversarial_filler":
+            _, scam = _scam_text(rng, planter)
+            size = rng.choice((256, 1024, 4096, 16384))
+            category, text = kind, f"{_filler(rng, size)} {scam} {_filler(rng, size)}"
+        else:
+            # A real scam message buried in a long paste of ordinary chat.
+            _, scam = _scam_text(rng, planter)
+            target = rng.randint(8, max(8, max_long_kb)) * 1024
+            padding = []
+            size = 0
+            while size < target:
+                line = rng.choice(BENIGN).replace("{n}", str(rng.randrange(10 ** 6, 10 ** 7)))
+                if "{name}" in line:
+                    continue
+                padding.append(line)
+                size += len(line) + 1
+            padding.insert(rng.randrange(len(padding) + 1), scam)
+            category, text = kind, " ".join(padding)
+        yield Sample(i, category, text, expected)
+
+# =========================================================
+# FILES
+# =========================================================
+def write_corpus(path: str, messages: int, seed: int = 0, max_long_kb: int = 128) -> dict:
+    start = time.perf_counter()
+    size = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for sample in generate(messages, seed, max_long_kb):
+            line = json.dumps(sample._asdict(), ensure_ascii=False) + "\n"
+            size += len(line)
+            f.write(line)
+    return {"messages": messages, "seed": seed, "version": CORPUS_VERSION, "chars": size,
+            "seconds": round(time.perf_counter() - start, 2)}
+
+
+def read_corpus(path: str) -> Iterator[Sample]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield Sample(record["id"], record["category"], record["text"], record["expected"])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic scam corpus with ground truth (JSONL).")
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-long-kb", type=int, default=128, help="largest adversarial long message")
+    parser.add_argument("-o", "--output", default="scam_corpus.jsonl")
+    args = parser.parse_args(argv)
+    report = write_corpus(args.output, args.messages, args.seed, args.max_long_kb)
+    print(f"📄 {report['messages']:,} messages ({report['chars'] / 1e6:.1f} MB) written to {args.output} "
+          f"in {report['seconds']}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
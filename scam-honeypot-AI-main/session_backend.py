@@ -0,0 +1,354 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from extraction import INTEL_FIELDS
+from session_store import SESSION_MAX_SESSIONS, SESSION_TTL_SECONDS, SessionState, SessionStore
+
+# =========================================================
+# CONFIG
+# =========================================================
+# memory - per-process LRU (SessionStore); fine for a single worker.
+# sqlite - one SQLite database in WAL mode shared by every worker process
+#          on the box, so a session's turns can land on any worker.
+#
+# Multi-worker launch (Procfile / render.yaml startCommand):
+#
+#   SESSION_BACKEND=sqlite WEB_CONCURRENCY=4 uvicorn main:app --host 0.0.0.0 --port $PORT
+#
+# uvicorn reads WEB_CONCURRENCY as its --workers default. With more than
+# one worker, each one also claims its own callback spool and transcript
+# log (see worker_path), since those files have a single writer.
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_DB = os.getenv("SESSION_DB", "sessions.db")
+# Writes are coalesced per session and committed in one transaction at
+# most this often. Another worker can read a session's previous turn
+# during this window; GUVI sends a session's turns one at a time, after
+# each reply, so in practice it never does.
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "0.005"))
+SESSION_PRUNE_INTERVAL = float(os.getenv("SESSION_PRUNE_INTERVAL", "60"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# =========================================================
+# INTELLIGENCE SERIALIZATION
+# =========================================================
+def dump_intel(intel) -> str:
+    data = {field: getattr(intel, field) for field in INTEL_FIELDS}
+    data["scamDetected"] = intel.scamDetected
+    data["callbackSent"] = intel.callback_sent
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_intel(intel_factory: Callable, text: str):
+    data = json.loads(text)
+    intel = intel_factory()
+    for field in INTEL_FIELDS:
+        for value in data.get(field, ()):
+            intel.add(field, value)
+    intel.scamDetected = bool(data.get("scamDetected"))
+    intel.callback_sent = bool(data.get("callbackSent"))
+    return intel
+
+# =========================================================
+# SQLITE BACKEND
+# =========================================================
+# Constant statements: sqlite3 compiles each once per connection and
+# reuses it from its statement cache.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id    TEXT PRIMARY KEY,
+    intel         TEXT NOT NULL,
+    message_count INTEGER NOT NULL,
+    created_at    REAL NOT NULL,
+    last_seen     REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen);
+"""
+SELECT_SESSION = "SELECT intel, message_count, created_at FROM sessions WHERE session_id = ?"
+SELECT_INTEL = "SELECT intel FROM sessions WHERE session_id = ?"
+UPSERT_SESSION = """
+INSERT INTO sessions (session_id, intel, message_count, created_at, last_seen) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (session_id) DO UPDATE SET
+    intel = excluded.intel,
+    message_count = max(sessions.message_count, excluded.message_count),
+    last_seen = excluded.last_seen
+"""
+PRUNE_TTL = "DELETE FROM sessions WHERE last_seen < ?"
+PRUNE_CAP = """
+DELETE FROM sessions WHERE session_id IN (
+    SELECT session_id FROM sessions ORDER BY last_seen DESC LIMIT -1 OFFSET ?
+)
+"""
+COUNT_SESSIONS = "SELECT count(*) FROM sessions"
+
+
+class SQLiteSessionStore:
+    """
+    Session intelligence in a SQLite database shared by worker processes.
+
+    - WAL journal: readers never block on the writer, and commits only
+      append to the log (synchronous=NORMAL, no fsync per commit).
+    - One connection per thread, since handlers run on the event loop and
+      the streaming path extracts on the threadpool.
+    - save() only records the latest state of a session; a writer thread
+      upserts everything pending in one executemany transaction. Reads
+      check that pending map first, so a worker always sees its own
+      writes.
+    - Intel is merged, never overwritten: a save folds in a still-pending
+      one for the same session, and the writer folds in the stored row
+      inside its transaction. Two turns of a session on different workers
+      (or in one flush window) both keep their indicators.
+    - A failed commit is retried with exponential backoff (up to
+      `backoff_max`), not in a tight loop.
+    - Idle sessions past `ttl` and the oldest past `max_sessions` are
+      pruned periodically rather than on every request.
+    - Reads (get_or_create, get) query the database on the calling
+      thread, so async callers run them off the event loop; see
+      `blocking_reads`.
+
+    Same interface as SessionStore: get_or_create, get, save, flush.
+    """
+
+    blocking_reads = True
+
+    def __init__(
+        self,
+        intel_factory: Callable,
+        path: str = SESSION_DB,
+        max_sessions: int = SESSION_MAX_SESSIONS,
+        ttl: float = SESSION_TTL_SECONDS,
+        flush_interval: float = SESSION_FLUSH_INTERVAL,
+        prune_interval: float = SESSION_PRUNE_INTERVAL,
+        clock: Callable[[], float] = time.time,
+        backoff_base: float = 0.05,
+        backoff_max: float = 5.0,
+    ):
+        self.intel_factory = intel_factory
+        self.path = path
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.prune_interval = prune_interval
+        self.clock = clock
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._local = threading.local()
+        self._cond = threading.Condition()
+        self._pending: Dict[str, tuple] = {}
+        self._running = True
+        self._stopping = threading.Event()
+        self._last_prune = 0.0
+        self.stats = {"hits": 0, "misses": 0, "saves": 0, "written": 0, "batches": 0, "writeErrors": 0}
+
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+        self._writer = threading.Thread(target=self._write_loop, name="session-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None, cached_statements=32)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("PRAGMA busy_timeout=10000")
+            self._local.db = db
+        return db
+
+    # -----------------------------------------------------
+    # Reads
+    # -----------------------------------------------------
+    def _load(self, session_id: str) -> Optional[SessionState]:
+        with self._cond:
+            row = self._pending.get(session_id)
+        if row is None:
+            row = self._connect().execute(SELECT_SESSION, (session_id,)).fetchone()
+            if row is None:
+                return None
+            intel_text, message_count, created_at = row
+        else:
+            _, intel_text, message_count, created_at, _ = row
+        state = SessionState(session_id, load_intel(self.intel_factory, intel_text), created_at)
+        state.message_count = message_count
+        return state
+
+    def get_or_create(self, session_id: str) -> Tuple[SessionState, bool]:
+        """Returns (state, created). Call save() once the turn has updated it."""
+        state = self._load(session_id)
+        now = self.clock()
+        if state is not None:
+            self.stats["hits"] += 1
+            state.last_seen = now
+            return state, False
+        self.stats["misses"] += 1
+        state = SessionState(session_id, self.intel_factory(), now)
+        self.save(state)
+        return state, True
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        return self._load(session_id)
+
+    # -----------------------------------------------------
+    # Writes
+    # -----------------------------------------------------
+    def save(self, state: SessionState):
+        row = (state.session_id, dump_intel(state.intel), state.message_count, state.created_at, self.clock())
+        with self._cond:
+            previous = self._pending.get(state.session_id)
+            if previous is not None and previous[1] != row[1]:
+                row = self._merge_intel(row, previous[1])
+            self._pending[state.session_id] = row
+            self.stats["saves"] += 1
+            self._cond.notify()
+
+    def _write_loop(self):
+        db = self._connect()
+        failures = 0
+        while True:
+            with self._cond:
+                while self._running and not self._pending:
+                    self._cond.wait(self.prune_interval)
+                    if not self._pending:
+                        break  # idle: give pruning a chance
+                if not self._running and not self._pending:
+                    return
+            # Let concurrent turns pile up into the same transaction.
+            self._stopping.wait(self.flush_interval)
+            with self._cond:
+                rows = list(self._pending.values())
+            if rows:
+                try:
+                    db.execute("BEGIN IMMEDIATE")
+                    db.executemany(UPSERT_SESSION, [self._merge_stored(db, row) for row in rows])
+                    db.execute("COMMIT")
+                except sqlite3.Error as e:
+                    if db.in_transaction:
+                        db.execute("ROLLBACK")
+                    self.stats["writeErrors"] += 1
+                    if self._stopping.is_set():
+                        print(f"❌ Session write failed at shutdown, {len(rows)} sessions not saved: {e}")
+                        return
+                    delay = min(self.backoff_max, self.backoff_base * (2 ** failures))
+                    failures += 1
+                    print(f"⚠️ Session write failed, retrying in {delay:.2f}s: {e}")
+                    self._stopping.wait(delay)
+                    continue
+                failures = 0
+            self._maybe_prune(db)
+            if rows:
+                with self._cond:
+                    # Keep anything saved again while we were committing.
+                    for row in rows:
+                        if self._pending.get(row[0]) is row:
+                            del self._pending[row[0]]
+                    self.stats["written"] += len(rows)
+                    self.stats["batches"] += 1
+                    self._cond.notify_all()
+
+    def _merge_intel(self, row: tuple, other: str) -> tuple:
+        """`row` with the intel in `other` folded in."""
+        intel = load_intel(self.intel_factory, row[1])
+        if intel.merge(load_intel(self.intel_factory, other)):
+            intel.callback_sent = False  # no callback has carried the union yet
+        return (row[0], dump_intel(intel)) + row[2:]
+
+    def _merge_stored(self, db: sqlite3.Connection, row: tuple) -> tuple:
+        # Inside BEGIN IMMEDIATE: no other worker can write in between.
+        stored = db.execute(SELECT_INTEL, (row[0],)).fetchone()
+        if stored is None or stored[0] == row[1]:
+            return row
+        return self._merge_intel(row, stored[0])
+
+    def _maybe_prune(self, db: sqlite3.Connection):
+        now = self.clock()
+        if now - self._last_prune < self.prune_interval:
+            return
+        self._last_prune = now
+        try:
+            db.execute(PRUNE_TTL, (now - self.ttl,))
+            db.execute(PRUNE_CAP, (self.max_sessions,))
+        except sqlite3.Error as e:
+            print(f"⚠️ Session prune failed: {e}")
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Waits until every save so far is committed."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._stopping.set()
+        self._writer.join(timeout=10)
+
+    def __len__(self) -> int:
+        return self._connect().execute(COUNT_SESSIONS).fetchone()[0]
+
+    def snapshot_stats(self) -> dict:
+        with self._cond:
+            pending = len(self._pending)
+        return dict(self.stats, pending=pending, sessions=len(self), backend="sqlite")
+
+# =========================================================
+# FACTORY
+# =========================================================
+def build_session_store(intel_factory: Callable, backend: str = SESSION_BACKEND):
+    if backend == "sqlite":
+        return SQLiteSessionStore(intel_factory, worker_path(SESSION_DB, shared=True))
+    if backend != "memory":
+        raise ValueError(f"Unknown SESSION_BACKEND {backend!r}, expected 'memory' or 'sqlite'")
+    return SessionStore(intel_factory)
+
+# =========================================================
+# MULTI-WORKER FILES
+# =========================================================
+_slot: Optional[int] = None
+_slot_lock_file = None
+
+
+def worker_slot(lock_dir: str = ".", slots: Optional[int] = None) -> int:
+    """
+    A small, stable number for this worker process: the first free slot
+    whose lock file it can hold. A restarted worker takes over the slot
+    (and the spool it owns) of the one it replaces.
+    """
+    global _slot, _slot_lock_file
+    if _slot is not None:
+        return _slot
+    try:
+        import fcntl
+    except ImportError:  # Windows: no flock, fall back to the pid
+        _slot = os.getpid()
+        return _slot
+    for n in range(slots or max(WEB_CONCURRENCY * 2, 2)):
+        f = open(os.path.join(lock_dir, f".worker-{n}.lock"), "w")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            continue
+        _slot, _slot_lock_file = n, f
+        return n
+    _slot = os.getpid()
+    return _slot
+
+
+def worker_path(path: Optional[str], shared: bool = False) -> Optional[str]:
+    """
+    `path` as is for shared files or a single worker; otherwise a
+    per-worker variant ("callback_spool.jsonl" -> "callback_spool.w1.jsonl").
+    """
+    if not path or shared or WEB_CONCURRENCY <= 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.w{worker_slot(os.path.dirname(os.path.abspath(path)))}{ext}"
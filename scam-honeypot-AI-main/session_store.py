@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+# =========================================================
+# CONFIG
+# =========================================================
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+
+# =========================================================
+# SESSION STATE
+# =========================================================
+class SessionState:
+    __slots__ = ("session_id", "intel", "message_count", "created_at", "last_seen")
+
+    def __init__(self, session_id: str, intel, now: float):
+        self.session_id = session_id
+        self.intel = intel
+        self.message_count = 0
+        self.created_at = now
+        self.last_seen = now
+
+# =========================================================
+# SESSION STORE (LRU + IDLE TTL)
+# =========================================================
+class SessionStore:
+    """
+    In-memory per-session intelligence, keyed by sessionId.
+
+    The OrderedDict is kept in access order, so the least recently used
+    session is always at the front. That makes both eviction rules cheap:
+    idle sessions are popped from the front until one is still fresh, and
+    the cap is enforced by popping the front again.
+    """
+
+    # Reads are dict lookups; SQLiteSessionStore's hit the database.
+    blocking_reads = False
+
+    def __init__(
+        self,
+        intel_factory: Callable,
+        max_sessions: int = SESSION_MAX_SESSIONS,
+        ttl: float = SESSION_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.intel_factory = intel_factory
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.clock = clock
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions_lru": 0, "evictions_ttl": 0}
+
+    def get_or_create(self, session_id: str) -> Tuple[SessionState, bool]:
+        """Returns (state, created) and marks the session as most recently used."""
+        now = self.clock()
+        with self._lock:
+            self._expire(now)
+            state = self._sessions.get(session_id)
+            if state is not None:
+                self.stats["hits"] += 1
+                self._sessions.move_to_end(session_id)
+                state.last_seen = now
+                return state, False
+
+            self.stats["misses"] += 1
+            state = SessionState(session_id, self.intel_factory(), now)
+            self._sessions[session_id] = state
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.stats["evictions_lru"] += 1
+            return state, True
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        with self._lock:
+            self._expire(self.clock())
+            return self._sessions.get(session_id)
+
+    def save(self, state: SessionState):
+        """States are updated in place; nothing to write back."""
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+    def _expire(self, now: float):
+        sessions = self._sessions
+        while sessions:
+            oldest = next(iter(sessions.values()))
+            if now - oldest.last_seen <= self.ttl:
+                break
+            sessions.popitem(last=False)
+            self.stats["evictions_ttl"] += 1
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def snapshot_stats(self) -> dict:
+        with self._lock:
+            return dict(self.stats, sessions=len(self._sessions), backend="memory")
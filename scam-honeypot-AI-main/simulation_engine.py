@@ -0,0 +1,360 @@
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cassette
+from context_manager import ContextManager
+from extraction import Intelligence, extract_intelligence
+from llm_client import AsyncLLMClient, UsageLedger
+from llm_scheduler import PRIORITY_SIMULATION, LLMScheduler
+from prompts import PROMPTS, SYSTEM_PROMPT, get_prompt
+from scenarios import SCENARIOS
+from transcript_store import TranscriptStore
+
+# =========================================================
+# CONFIG
+# =========================================================
+API_KEY = "team_top_250_secret"
+SIM_CONCURRENCY = int(os.getenv("SIM_CONCURRENCY", "20"))
+SIM_TURNS = int(os.getenv("SIM_TURNS", "7"))
+
+# Everything the honeypot is trying to get out of the scammer. Keywords
+# only say the message looks like a scam, so they do not count.
+INDICATOR_FIELDS = ("upiIds", "bankAccounts", "ifscCodes", "phoneNumbers", "phishingLinks")
+
+# =========================================================
+# TARGETS (THE HONEYPOT UNDER TEST)
+# =========================================================
+class AppTarget:
+    """The API over HTTP, called the way the GUVI evaluator calls it."""
+
+    def __init__(self, url: str, api_key: str = API_KEY, timeout: float = 30.0, max_connections: int = 100):
+        self.url = url.rstrip("/") + "/honey-pot-entry"
+        # Session ids are deterministic; keep reruns against the same
+        # server from landing in each other's sessions.
+        self.run_id = uuid.uuid4().hex[:8]
+        self.headers = {"x-api-key": api_key}
+        self.client = httpx.AsyncClient(
+            timeout=timeout, limits=httpx.Limits(max_connections=max_connections)
+        )
+
+    async def reply(self, session_id: str, text: str, history: list) -> str:
+        body = {
+            "sessionId": f"{session_id}-{self.run_id}",
+            "message": {"sender": "scammer", "text": text},
+            "conversationHistory": history,
+        }
+        r = await self.client.post(self.url, json=body, headers=self.headers)
+        r.raise_for_status()
+        return r.json()["reply"]
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class AgentTarget:
+    """
+    The honeypot agent in-process: same system prompt and context builder
+    as the API, without HTTP, sessions or GUVI callbacks.
+    """
+
+    def __init__(self, llm, system_prompt: str = SYSTEM_PROMPT):
+        self.llm = llm
+        self.system_prompt = system_prompt
+        self.context = ContextManager()
+
+    async def reply(self, session_id: str, text: str, history: list) -> str:
+        messages = self.context.build(session_id, self.system_prompt, history, text).messages
+        return await self.llm.chat(messages, priority=PRIORITY_SIMULATION)
+
+    async def aclose(self):
+        pass
+
+# =========================================================
+# SPAMMER AGENT
+# =========================================================
+class SpammerAgent:
+    """Plays the scammer. Its own messages are "assistant" turns in its context."""
+
+    def __init__(self, llm):
+        self.llm = llm
+        # Routers and stand-ins may not take a seed; ask once, not per call.
+        self.seeded = _accepts(llm.chat, "seed")
+
+    async def next_message(self, system_prompt: str, history: List[Dict[str, str]], seed: int) -> str:
+        messages = [{"role": "system", "content": system_prompt}] + history
+        extra = {"seed": seed} if self.seeded else {}
+        return await self.llm.chat(messages, priority=PRIORITY_SIMULATION, **extra)
+
+
+def _accepts(fn, name: str) -> bool:
+    try:
+        params = inspect.signature(fn).parameters
+    except (TypeError, ValueError):
+        return False
+    return name in params or any(p.kind is inspect.Parameter.VAR_KEYWORD for p in params.values())
+
+# =========================================================
+# ONE CONVERSATION
+# =========================================================
+async def run_conversation(name: str, scenario: dict, seed: int, target, spammer: SpammerAgent,
+                           turns: int = SIM_TURNS, store: Optional[TranscriptStore] = None) -> dict:
+    session_id = f"sim-{name.split(':')[0].replace(' ', '').lower()}-s{seed}"
+    intel = Intelligence()
+    history = []  # GUVI shape, from the honeypot's side
+    spammer_history = [{"role": "assistant", "content": scenario["first_message"]}]
+    scammer_msg = scenario["first_message"]
+    transcript = []
+    first_extraction = None
+    error = None
+
+    for turn in range(1, turns + 1):
+        turn_intel = Intelligence()
+        extract_intelligence(scammer_msg, turn_intel)
+        new = [
+            {"type": field, "value": value}
+            for field in INDICATOR_FIELDS for value in getattr(turn_intel, field)
+            if intel.add(field, value)
+        ]
+        intel.merge(turn_intel)  # keywords and the scam flag
+        if new and first_extraction is None:
+            first_extraction = turn
+
+        start = time.perf_counter()
+        try:
+            reply = await target.reply(session_id, scammer_msg, history)
+        except Exception as e:
+            error = f"turn {turn}: {e}"
+            transcript.append({"turn": turn, "scammer": scammer_msg, "honeypot": None,
+                               "latencyMs": None, "newIndicators": new})
+            break
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        transcript.append({"turn": turn, "scammer": scammer_msg, "honeypot": reply,
+                           "latencyMs": latency_ms, "newIndicators": new})
+        if store is not None:
+            hits = {}
+            for hit in new:
+                hits.setdefault(hit["type"], []).append(hit["value"])
+            store.append(session_id, "scammer", scammer_msg, hits=hits, scenario=name, seed=seed, turn=turn)
+            store.append(session_id, "honeypot", reply, latency_ms=latency_ms, scenario=name, seed=seed, turn=turn)
+
+        history.append({"sender": "scammer", "text": scammer_msg})
+        history.append({"sender": "user", "text": reply})
+        if turn == turns:
+            break
+        spammer_history.append({"role": "user", "content": reply})
+        try:
+            scammer_msg = await spammer.next_message(scenario["system"], spammer_history, seed)
+        except Exception as e:
+            error = f"spammer after turn {turn}: {e}"
+            break
+        spammer_history.append({"role": "assistant", "content": scammer_msg})
+
+    latencies = [t["latencyMs"] for t in transcript if t["latencyMs"] is not None]
+    return {
+        "scenario": name,
+        "seed": seed,
+        "sessionId": session_id,
+        "turns": transcript,
+        "extractedIntelligence": dict(intel.extracted(), ifscCodes=list(intel.ifscCodes)),
+        "metrics": {
+            "turns": len(latencies),
+            "turnsToFirstExtraction": first_extraction,
+            "indicators": sum(len(getattr(intel, f)) for f in INDICATOR_FIELDS),
+            "latencyMs": latencies,
+        },
+        "error": error,
+    }
+
+# =========================================================
+# AGGREGATES
+# =========================================================
+def _pct(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def aggregate(results: List[dict]) -> dict:
+    firsts = [r["metrics"]["turnsToFirstExtraction"] for r in results
+              if r["metrics"]["turnsToFirstExtraction"] is not None]
+    latencies = [ms for r in results for ms in r["metrics"]["latencyMs"]]
+    by_type = {field: 0 for field in INDICATOR_FIELDS}
+    for r in results:
+        for field in INDICATOR_FIELDS:
+            by_type[field] += len(r["extractedIntelligence"].get(field, []))
+    n = len(results)
+    return {
+        "conversations": n,
+        "errors": sum(1 for r in results if r["error"]),
+        "turns": sum(r["metrics"]["turns"] for r in results),
+        "extractionRate": round(len(firsts) / n, 3) if n else 0.0,
+        "turnsToFirstExtraction": {
+            "mean": round(statistics.mean(firsts), 2) if firsts else None,
+            "median": statistics.median(firsts) if firsts else None,
+        },
+        "indicatorsPerConversation": round(sum(r["metrics"]["indicators"] for r in results) / n, 2) if n else 0.0,
+        "indicatorsByType": by_type,
+        "turnLatencyMs": {
+            "mean": round(statistics.mean(latencies), 1) if latencies else None,
+            "p50": _pct(latencies, 50),
+            "p95": _pct(latencies, 95),
+            "max": max(latencies) if latencies else None,
+        },
+    }
+
+# =========================================================
+# ENGINE
+# =========================================================
+def transcript_record(result: dict) -> dict:
+    """A result without its timings: identical across replays of the same cassette."""
+    record = dict(result, turns=[{k: v for k, v in t.items() if k != "latencyMs"} for t in result["turns"]])
+    record["metrics"] = {k: v for k, v in result["metrics"].items() if k != "latencyMs"}
+    return record
+
+
+async def run_simulations(target, spammer: SpammerAgent, scenarios: Dict[str, dict], seeds: List[int],
+                          turns: int = SIM_TURNS, concurrency: int = SIM_CONCURRENCY,
+                          transcripts_path: Optional[str] = None,
+                          store: Optional[TranscriptStore] = None) -> List[dict]:
+    """
+    Runs every scenario x seed conversation, at most `concurrency` at a
+    time. Transcripts are appended to `transcripts_path` (JSONL) as each
+    conversation finishes, so a long run can be inspected while it goes,
+    then rewritten in (scenario, seed) order without timings so replays of
+    the same cassette produce the same file byte for byte. Individual
+    turns, with timings, also go to `store` when one is given.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    out = open(transcripts_path, "w", encoding="utf-8") if transcripts_path else None
+    results = []
+
+    async def one(name, scenario, seed):
+        async with semaphore:
+            # Each conversation gets its own cassette scope, so replays do
+            # not depend on how concurrent conversations interleave.
+            with cassette.scope(f"{name}/{seed}"):
+                result = await run_conversation(name, scenario, seed, target, spammer, turns, store)
+        results.append(result)
+        if out:
+            out.write(json.dumps(transcript_record(result), ensure_ascii=False) + "\n")
+            out.flush()
+        status = "❌" if result["error"] else "✅"
+        print(f"{status} {name} seed={seed}: {result['metrics']['indicators']} indicators, "
+              f"first at turn {result['metrics']['turnsToFirstExtraction']}")
+
+    try:
+        await asyncio.gather(*(
+            one(name, scenario, seed) for name, scenario in scenarios.items() for seed in seeds
+        ))
+    finally:
+        if out:
+            out.close()
+    results.sort(key=lambda r: (r["scenario"], r["seed"]))
+    if transcripts_path:
+        with open(transcripts_path, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(transcript_record(result), ensure_ascii=False) + "\n")
+    return results
+
+
+def summarize(results: List[dict], config: dict, elapsed: float) -> dict:
+    by_scenario = {}
+    for r in results:
+        by_scenario.setdefault(r["scenario"], []).append(r)
+    return {
+        "config": config,
+        "elapsedSeconds": round(elapsed, 2),
+        "overall": aggregate(results),
+        "byScenario": {name: aggregate(rs) for name, rs in by_scenario.items()},
+    }
+
+
+async def main_async(args) -> dict:
+    from mock_llm_server import ServerThread, create_app
+
+    scenarios = {k: v for k, v in SCENARIOS.items() if not args.scenario or any(s in k for s in args.scenario)}
+    seeds = list(range(args.seed_start, args.seed_start + args.seeds))
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    mock = None
+    base_url = None
+    if args.offline:
+        mock = ServerThread(create_app(latency=args.mock_latency, latency_dist="lognormal")).start()
+        base_url = mock.url
+    api_key = os.getenv("GROQ_API_KEY") or ("offline" if args.offline else None)
+    if not api_key:
+        raise SystemExit("GROQ_API_KEY is not set (or pass --offline)")
+
+    # Simulations wait for budget as long as it takes; the mock has no quota.
+    scheduler = LLMScheduler(rpm=0, tpm=0, max_wait=0) if args.offline else LLMScheduler(max_wait=0)
+    # Token usage per prompt variant, for the summary rather than per-call logs.
+    ledger = UsageLedger(log=False)
+    llm = AsyncLLMClient(api_key=api_key, base_url=base_url, scheduler=scheduler, ledger=ledger)
+    target = AppTarget(args.url) if args.target == "app" else AgentTarget(llm, get_prompt(args.prompt_variant).text)
+    spammer = SpammerAgent(llm)
+    print(f"🚀 {len(scenarios)} scenarios x {len(seeds)} seeds, {args.turns} turns, "
+          f"concurrency {args.concurrency}, target={args.target}")
+
+    # Per-turn store for the chat viewer; each run starts a fresh one.
+    turns_path = os.path.join(args.out_dir, "turns.jsonl")
+    for stale in (turns_path, turns_path + ".idx"):
+        if os.path.exists(stale):
+            os.remove(stale)
+    store = TranscriptStore(turns_path)
+
+    start = time.perf_counter()
+    try:
+        results = await run_simulations(
+            target, spammer, scenarios, seeds, args.turns, args.concurrency,
+            os.path.join(args.out_dir, "transcripts.jsonl"), store,
+        )
+    finally:
+        store.stop()
+        await target.aclose()
+        await llm.aclose()
+        if mock:
+            mock.stop()
+    config = {k: v for k, v in vars(args).items() if k != "out_dir"}
+    summary = summarize(results, config, time.perf_counter() - start)
+    summary["llmUsage"] = ledger.snapshot_stats()
+    with open(os.path.join(args.out_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run scenario x seed scam conversations concurrently.")
+    parser.add_argument("--target", choices=("agent", "app"), default="agent",
+                        help="in-process agent, or the API at --url")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenario", nargs="*", help="substring filter on scenario names")
+    parser.add_argument("--seeds", type=int, default=10, help="conversations per scenario")
+    parser.add_argument("--seed-start", type=int, default=0)
+    parser.add_argument("--turns", type=int, default=SIM_TURNS)
+    parser.add_argument("--concurrency", type=int, default=SIM_CONCURRENCY)
+    parser.add_argument("--out-dir", default="sim_results")
+    parser.add_argument("--offline", action="store_true", help="use the local mock LLM for both agents")
+    parser.add_argument("--mock-latency", type=float, default=0.2)
+    parser.add_argument("--prompt-variant", choices=sorted(PROMPTS), help="system prompt for --target agent "
+                        "(default: PROMPT_VARIANT)")
+    args = parser.parse_args()
+
+    summary = asyncio.run(main_async(args))
+    overall = summary["overall"]
+    print(f"\n📊 {overall['conversations']} conversations in {summary['elapsedSeconds']}s "
+          f"({overall['errors']} errors)")
+    print(json.dumps({k: v for k, v in summary["byScenario"].items()}, indent=2))
+    print(f"📄 Transcripts and summary written to {args.out_dir}/")
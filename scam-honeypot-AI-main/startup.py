@@ -0,0 +1,99 @@
+import asyncio
+import importlib
+import inspect
+import os
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# =========================================================
+# CONFIG
+# =========================================================
+# Pre-warm in the background after start-up: finish the deferred imports
+# and open the pooled LLM and callback connections before real traffic.
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1") == "1"
+# /readyz turns ready after this long even if a warm-up step still hangs
+# (an unreachable provider should not keep an instance out of rotation).
+STARTUP_WARMUP_TIMEOUT = float(os.getenv("STARTUP_WARMUP_TIMEOUT", "10"))
+
+# Imported on first use rather than with main.py (see llm_client,
+# callbacks, cassette): together they are most of a cold import after
+# FastAPI itself.
+DEFERRED_IMPORTS = ("groq", "requests")
+
+
+def import_deferred(modules: Iterable[str] = DEFERRED_IMPORTS):
+    for name in modules:
+        importlib.import_module(name)
+
+# =========================================================
+# WARM-UP
+# =========================================================
+class Warmup:
+    """
+    Start-up work that should not hold up the first health check.
+
+    start() schedules every step on the running loop and returns at once.
+    Steps are plain callables, run on the threadpool, or coroutine
+    functions; they run concurrently, a failure is logged and recorded,
+    and `ready` turns true when all have finished or the timeout passed.
+    """
+
+    def __init__(self, timeout: float = STARTUP_WARMUP_TIMEOUT, enabled: bool = STARTUP_WARMUP):
+        self.timeout = timeout
+        self.enabled = enabled
+        self.steps: Dict[str, dict] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        if self.finished_at is not None:
+            return True
+        return self.started_at is not None and time.monotonic() - self.started_at >= self.timeout
+
+    def start(self, steps: Iterable[Tuple[str, Optional[Callable]]]):
+        self.started_at = time.monotonic()
+        steps = [(name, fn) for name, fn in steps if fn is not None]
+        if not self.enabled or not steps:
+            self.finished_at = self.started_at
+            return
+        self._task = asyncio.ensure_future(self._run(steps))
+
+    async def _run(self, steps):
+        await asyncio.wait([asyncio.ensure_future(self._step(name, fn)) for name, fn in steps],
+                           timeout=self.timeout)
+        self.finished_at = time.monotonic()
+        took = (self.finished_at - self.started_at) * 1000
+        failed = [name for name, step in self.steps.items() if not step.get("ok")]
+        print(f"🔥 Warm-up finished in {took:.0f} ms" + (f" (failed: {', '.join(failed)})" if failed else ""))
+
+    async def _step(self, name: str, fn: Callable):
+        start = time.perf_counter()
+        self.steps[name] = {"ok": None}
+        try:
+            if inspect.iscoroutinefunction(fn):
+                result = await fn()
+            else:
+                result = await asyncio.to_thread(fn)
+            ok = result is not False
+        except Exception as e:
+            print(f"⚠️ Warm-up step {name} failed: {e}")
+            ok = False
+        self.steps[name] = {"ok": ok, "ms": round((time.perf_counter() - start) * 1000, 1)}
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "warmupMs": round((self.finished_at - self.started_at) * 1000, 1)
+            if self.finished_at is not None and self.started_at is not None else None,
+            "steps": dict(self.steps),
+        }
@@ -0,0 +1,151 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.append(os.getcwd())
+
+from admission import AdmissionController, Overloaded, parse_key_limits
+
+
+class TestAdmissionController(unittest.TestCase):
+    def test_queue_then_shed(self):
+        async def run():
+            ctl = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5, key_limits={})
+            first = await ctl.admit("k")
+            queued = asyncio.ensure_future(ctl.admit("k"))
+            await asyncio.sleep(0)
+            self.assertEqual(ctl.queue_depth, 1)
+
+            with self.assertRaises(Overloaded) as cm:
+                await ctl.admit("k")
+            self.assertEqual((cm.exception.reason, cm.exception.status_code), ("queue_full", 503))
+            self.assertEqual(cm.exception.headers, {"Retry-After": "5"})
+
+            first.release()
+            first.release()  # twice is harmless
+            second = await queued
+            self.assertEqual((ctl.in_flight, ctl.queue_depth), (1, 0))
+            second.release()
+            self.assertEqual(ctl.in_flight, 0)
+            return ctl.snapshot_stats()
+
+        stats = asyncio.run(run())
+        self.assertEqual((stats["admitted"], stats["queued"], stats["shed"]), (2, 1, 1))
+
+    def test_queue_timeout(self):
+        async def run():
+            ctl = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=0.02, key_limits={})
+            held = await ctl.admit()
+            with self.assertRaises(Overloaded) as cm:
+                await ctl.admit()
+            self.assertEqual(cm.exception.reason, "queue_timeout")
+            self.assertEqual(ctl.queue_depth, 0)
+            held.release()
+            self.assertEqual(ctl.in_flight, 0)
+            (await ctl.admit()).release()
+
+        asyncio.run(run())
+
+    def test_per_key_quota(self):
+        async def run():
+            ctl = AdmissionController(max_in_flight=10, key_limit=1, key_limits={"big": 2})
+            a = await ctl.admit("small")
+            with self.assertRaises(Overloaded) as cm:
+                await ctl.admit("small")
+            self.assertEqual(cm.exception.status_code, 429)
+            b1, b2 = await ctl.admit("big"), await ctl.admit("big")
+            with self.assertRaises(Overloaded):
+                await ctl.admit("big")
+            for t in (a, b1, b2):
+                t.release()
+            (await ctl.admit("small")).release()
+            return ctl.stats
+
+        self.assertEqual(asyncio.run(run())["quota"], 2)
+        self.assertEqual(parse_key_limits("a=1, b=2,bad"), {"a": 1, "b": 2})
+
+    def test_degraded_mode_holds_then_recovers(self):
+        now = [0.0]
+        wait = [0.0]
+        ctl = AdmissionController(degrade_wait=3, degrade_hold=5, wait_probe=lambda: wait[0], clock=lambda: now[0])
+        self.assertFalse(ctl.degraded())
+        wait[0] = 4.0
+        self.assertTrue(ctl.degraded())
+        wait[0] = 0.0
+        now[0] = 4.0
+        self.assertTrue(ctl.degraded())
+        now[0] = 6.0
+        self.assertFalse(ctl.degraded())
+        self.assertEqual(ctl.stats["degradedPeriods"], 1)
+
+
+class TestAdmissionEndpoints(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from unittest.mock import patch
+        with patch.dict(os.environ, {"GROQ_API_KEY": "fake_key"}):
+            import main
+        cls.main = main
+
+    def test_shed_and_degraded_turns(self):
+        from unittest.mock import AsyncMock, MagicMock, patch
+        from fastapi.testclient import TestClient
+        from classifier import DEGRADED_REPLIES, ScamClassifier
+
+        main = self.main
+        headers = {"x-api-key": main.API_KEY}
+        body = {"sessionId": "test-overload", "message": {"text": "Pay to scammer@okicici now"}}
+        llm = MagicMock(chat=AsyncMock(return_value="Which bank?"))
+        client = TestClient(main.app)
+
+        full = AdmissionController(max_in_flight=1, max_queue=0, key_limits={})
+        full.in_flight = 1
+        with patch.object(main, "admission", full), patch.object(main, "async_llm", llm):
+            r = client.post("/honey-pot-entry", headers=headers, json=body)
+            self.assertEqual(r.status_code, 503)
+            self.assertEqual(r.headers["retry-after"], "5")
+            self.assertEqual(client.post("/honey-pot-entry/stream", headers=headers, json=body).status_code, 503)
+            self.assertEqual(client.get("/stats", headers=headers).json()["admission"]["shed"], 2)
+
+        backed_up = AdmissionController(degrade_wait=1, wait_probe=lambda: 2.0, key_limits={})
+        with patch.object(main, "admission", backed_up), patch.object(main, "async_llm", llm), \
+                patch.object(main, "classifier", ScamClassifier({}, bias=5.0)), \
+                patch.object(main.callback_dispatcher, "submit") as submit:
+            r = client.post("/honey-pot-entry", headers=headers, json=body)
+            self.assertIn(r.json()["reply"], DEGRADED_REPLIES)
+            llm.chat.assert_not_awaited()
+            # Extraction and callbacks still run.
+            self.assertEqual(main.session_store.get("test-overload").intel.upiIds, ["scammer@okicici"])
+            submit.assert_called_once()
+            self.assertEqual(backed_up.in_flight, 0)
+            self.assertEqual(backed_up.stats["degradedReplies"], 1)
+            self.assertIn("honeypot_degraded 1", client.get("/metrics").text)
+
+    def test_batch_body_limit_and_slots(self):
+        from unittest.mock import patch
+        from fastapi.testclient import TestClient
+
+        main = self.main
+        headers = {"x-api-key": main.API_KEY}
+        client = TestClient(main.app)
+        body = b'"call 9876543210"\n' * 100
+
+        with patch.object(main.batch_extract, "BATCH_MAX_BODY_BYTES", 1000):
+            self.assertEqual(client.post("/extract/batch", headers=headers, content=body).status_code, 413)
+        self.assertEqual(main.batch_admission.in_flight, 0)
+
+        full = AdmissionController(max_in_flight=1, max_queue=0, key_limits={})
+        full.in_flight = 1
+        with patch.object(main, "batch_admission", full):
+            self.assertEqual(client.post("/extract/batch", headers=headers, content=body).status_code, 503)
+            # Live turns are admitted separately.
+            self.assertEqual(main.admission.in_flight, 0)
+
+        r = client.post("/extract/batch", headers=headers, content=body)
+        self.assertEqual(len(r.text.splitlines()), 100)
+        self.assertEqual(main.batch_admission.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import json
+import os
+import sys
+import unittest
+
+sys.path.append(os.getcwd())
+
+from api_models import EntryRequest, JSONBytesResponse, dumps, loads
+
+
+class TestEntryRequest(unittest.TestCase):
+    def test_full_body(self):
+        entry = EntryRequest.parse(json.dumps({
+            "sessionId": "abc",
+            "message": {"sender": "scammer", "text": "Pay to x@okaxis"},
+            "conversationHistory": [{"sender": "scammer", "text": "hi"}, {"sender": "user", "text": "hello"}],
+        }).encode())
+        self.assertEqual(entry.session_id, "abc")
+        self.assertEqual(entry.text, "Pay to x@okaxis")
+        self.assertEqual(entry.history_len, 2)
+        self.assertEqual(entry.history[0]["text"], "hi")
+
+    def test_malformed_bodies_fall_back_to_defaults(self):
+        for raw in (b"", b"{not json", b"[1, 2]", b'"just a string"', b"\xff\xfe"):
+            entry = EntryRequest.parse(raw)
+            self.assertEqual((entry.session_id, entry.text, entry.history), ("guvi-session", "Hello", []))
+
+    def test_lenient_fields(self):
+        entry = EntryRequest.parse(b'{"sessionId": 42, "message": "plain text", "conversationHistory": {"a": 1}}')
+        self.assertEqual(entry.session_id, "42")
+        self.assertEqual(entry.text, "plain text")
+        self.assertEqual(entry.history, [])
+        self.assertEqual(EntryRequest.parse(b'{"message": {"text": ""}}').text, "Hello")
+
+    def test_json_round_trip(self):
+        data = {"status": "success", "reply": "₹500 पे करो? 🙏"}
+        self.assertEqual(loads(dumps(data)), data)
+        self.assertEqual(json.loads(JSONBytesResponse(data).body), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.getcwd())
+
+import blocklist
+from blocklist import Blocklist, BloomFilter, blocklist_key, normalize_domain, normalize_phone, normalize_upi
+from extraction import Intelligence, extract_intelligence
+
+
+class TestNormalization(unittest.TestCase):
+    def test_domains(self):
+        cases = {
+            "HTTPS://login.Evil.co.in:8443/kyc?x=1": "evil.co.in",
+            "bad-link.com": "bad-link.com",
+            "www.bad-link.com/app.apk": "bad-link.com",
+            "http://user:pw@sbi.verify-now.xyz./": "verify-now.xyz",
+            "bücher.de/x": "xn--bcher-kva.de",
+            "XN--BCHER-KVA.DE": "xn--bcher-kva.de",
+            "http://192.168.1.20:8080/pay": "192.168.1.20",
+            "kyc.github.io": "kyc.github.io",
+            # Shared hosts keep the path: one short link is bad, not the shortener.
+            "https://bit.ly/3xYz?utm=1": "bit.ly/3xYz",
+            "www.Bit.ly/3xYz/": "bit.ly/3xYz",
+            "sites.google.com/view/sbi-kyc#top": "sites.google.com/view/sbi-kyc",
+            "bit.ly": "bit.ly",
+        }
+        for raw, expected in cases.items():
+            self.assertEqual(normalize_domain(raw), expected, raw)
+        for raw in ("localhost", "http://[::1]/", "", "https://"):
+            self.assertIsNone(normalize_domain(raw), raw)
+
+    def test_upi_and_phone(self):
+        self.assertEqual(normalize_upi(" Refund.Desk@OKAXIS "), "refund.desk@okaxis")
+        self.assertIsNone(normalize_upi("not a handle"))
+        for raw in ("+91 98765-43210", "919876543210", "09876543210", "9876543210"):
+            self.assertEqual(normalize_phone(raw), "9876543210", raw)
+        self.assertIsNone(normalize_phone("12345"))
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_compiled_lists_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            lists = {
+                "domain": ["# comment", "https://login.kyc-update.co.in/verify", "bad-link.com", "localhost",
+                           "https://bit.ly/3xYz"],
+                "upi": ["Refund.Desk@okaxis"],
+                "phone": ["+91 98765 43210"],
+            }
+            sources = {}
+            for kind, lines in lists.items():
+                path = os.path.join(tmp, kind + ".txt")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+                sources[kind] = [path]
+            out = os.path.join(tmp, "bl.bloom")
+            report = blocklist.compile_lists(sources, out)
+            self.assertEqual(report["entries"], 5)
+            self.assertEqual(report["skipped"]["domain"], 1)
+
+            bl = blocklist.load_blocklist(out)
+            self.assertEqual(bl.check("domain", "http://KYC-UPDATE.co.in/other"), "domain:kyc-update.co.in")
+            self.assertEqual(bl.check("upi", "refund.desk@OKAXIS"), "upi:refund.desk@okaxis")
+            self.assertIsNone(bl.check("upi", "someone@ybl"))
+            self.assertEqual(bl.check("domain", "bit.ly/3xYz"), "domain:bit.ly/3xYz")
+            self.assertIsNone(bl.check("domain", "bit.ly/other"))
+
+            intel = Intelligence()
+            extract_intelligence("Open bad-link.com/kyc or call +91-9876543210, pay someone@ybl", intel)
+            self.assertEqual(bl.check_intel(intel), ["domain:bad-link.com", "phone:9876543210"])
+            self.assertEqual(bl.snapshot_stats()["entries"], 5)
+            bl.bloom.close()
+
+            with open(out, "r+b") as f:
+                f.truncate(100)
+            self.assertIsNone(blocklist.load_blocklist(out).bloom)
+
+    def test_false_positive_rate_near_target(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bl.bloom")
+            keys = [blocklist_key("upi", f"user{i}@ybl") for i in range(20000)]
+            BloomFilter.write(path, iter(keys), len(keys), fp_rate=0.01)
+            bloom = BloomFilter(path)
+            self.assertTrue(all(k in bloom for k in keys))
+            false = sum(blocklist_key("upi", f"other{i}@ybl") in bloom for i in range(20000))
+            self.assertLess(false / 20000, 0.02)
+            bloom.close()
+
+    def test_cli(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "upi.txt")
+            with open(src, "w") as f:
+                f.write("win@okaxis\n")
+            out = os.path.join(tmp, "bl.bloom")
+            self.assertEqual(blocklist.main(["compile", "--upi", src, "-o", out]), 0)
+            self.assertIn("win@okaxis", Blocklist(BloomFilter(out)).check("upi", "WIN@okaxis"))
+
+    def test_missing_file_checks_nothing(self):
+        bl = blocklist.load_blocklist("/nonexistent/blocklist.bloom")
+        self.assertIsNone(bl.check("upi", "win@okaxis"))
+        self.assertEqual(bl.snapshot_stats(), {"loaded": False})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.append(os.getcwd())
+
+from callbacks import CallbackDispatcher
+from mock_callback_server import create_app
+from mock_llm_server import ServerThread
+
+
+class TestCallbackDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.spool = os.path.join(self.tmp.name, "spool.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_retries_until_delivered(self):
+        app = create_app(fail_first=2)
+        with ServerThread(app) as server:
+            dispatcher = CallbackDispatcher(
+                url=server.url + "/callback", workers=2, spool_path=self.spool, backoff_base=0.01
+            )
+            dispatcher.submit("s1", {"sessionId": "s1", "totalMessagesExchanged": 1})
+            self.assertTrue(dispatcher.flush(timeout=5))
+            dispatcher.stop()
+
+        self.assertEqual(app.state.received, [{"sessionId": "s1", "totalMessagesExchanged": 1}])
+        self.assertEqual(dispatcher.stats["retried"], 2)
+        self.assertEqual(dispatcher.stats["sent"], 1)
+
+    def test_spool_survives_restart_and_coalesces(self):
+        # Endpoint down: nothing gets delivered before the "crash".
+        down = CallbackDispatcher(
+            url="http://127.0.0.1:9/callback", workers=1, spool_path=self.spool,
+            backoff_base=60, max_attempts=100,
+        )
+        for count in (1, 2, 3):
+            down.submit("s1", {"sessionId": "s1", "totalMessagesExchanged": count})
+        down.submit("s2", {"sessionId": "s2", "totalMessagesExchanged": 1})
+        down.stop(timeout=1)
+
+        app = create_app()
+        with ServerThread(app) as server:
+            up = CallbackDispatcher(url=server.url + "/callback", workers=2, spool_path=self.spool)
+            up.start()
+            self.assertTrue(up.flush(timeout=5))
+            up.stop()
+
+        received = sorted(app.state.received, key=lambda p: p["sessionId"])
+        self.assertEqual(received, [
+            {"sessionId": "s1", "totalMessagesExchanged": 3},
+            {"sessionId": "s2", "totalMessagesExchanged": 1},
+        ])
+        with open(self.spool) as f:
+            self.assertEqual(f.read(), "")
+
+    def test_spool_is_written_off_the_caller_thread(self):
+        import threading
+        from unittest.mock import patch
+
+        dispatcher = CallbackDispatcher(url="http://127.0.0.1:9/callback", workers=0, spool_path=self.spool)
+        dispatcher.start()
+        writers = set()
+        write = dispatcher._spool.write
+
+        def record(data):
+            writers.add(threading.current_thread().name)
+            return write(data)
+
+        with patch.object(dispatcher._spool, "write", side_effect=record), \
+                patch("callbacks.SPOOL_COMPACT_RECORDS", 50):
+            for n in range(40):
+                dispatcher.submit(f"s{n % 5}", {"sessionId": f"s{n % 5}", "totalMessagesExchanged": n})
+            for _ in range(100):
+                if not dispatcher._spool_queue and writers:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(writers, {"guvi-callback-spool"})
+            # Past the threshold, the spool thread compacts to one put per session.
+            for n in range(40, 60):
+                dispatcher.submit(f"s{n % 5}", {"sessionId": f"s{n % 5}", "totalMessagesExchanged": n})
+            dispatcher.stop()
+        with open(self.spool) as f:
+            puts = [json.loads(line) for line in f]
+        self.assertEqual(sorted(p["payload"]["totalMessagesExchanged"] for p in puts), list(range(55, 60)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.append(os.getcwd())
+
+from groq import AsyncGroq, Groq
+
+import cassette
+from cassette import Cassette, CassetteMiss, fingerprint
+from mock_llm_server import ServerThread, create_app
+
+MESSAGES = [{"role": "user", "content": "Is my account really blocked?"}]
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_stable_and_scoped(self):
+        a = fingerprint({"model": "m", "messages": MESSAGES, "stream": None})
+        b = fingerprint({"messages": MESSAGES, "model": "m"})
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, fingerprint({"messages": MESSAGES, "model": "m", "seed": 1}))
+        self.assertNotEqual(a, fingerprint({"messages": MESSAGES, "model": "m"}, "Level 1/0"))
+
+
+class TestCassette(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.mock = ServerThread(create_app(latency=0.05, reply="Which branch are you calling from?")).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.mock.stop()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "llm.cassette")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def client(self, tape):
+        return tape.install(Groq(api_key="test", base_url=self.mock.url, max_retries=0))
+
+    def create(self, client, **kwargs):
+        return client.chat.completions.create(model="mock", messages=MESSAGES, **kwargs)
+
+    def test_record_then_replay(self):
+        tape = Cassette(self.path, "record")
+        recorded = [self.create(self.client(tape)).id for _ in range(2)]
+        tape.close()
+        self.assertEqual(tape.stats["recorded"], 2)
+
+        replay = Cassette(self.path, "replay", latency="0")
+        client = Groq(api_key="test", base_url="http://127.0.0.1:9", max_retries=0)  # nothing listens here
+        replay.install(client)
+        start = time.perf_counter()
+        replayed = [self.create(client).id for _ in range(2)]
+        self.assertLess(time.perf_counter() - start, 0.05)
+        # The nth identical request gets the nth recorded response.
+        self.assertEqual(replayed, recorded)
+        with self.assertRaises(CassetteMiss):
+            self.create(client)
+        replay.close()
+
+    def test_recorded_latency(self):
+        tape = Cassette(self.path, "record")
+        self.create(self.client(tape))
+        tape.close()
+        replay = Cassette(self.path, "replay", latency="recorded")
+        start = time.perf_counter()
+        self.create(self.client(replay))
+        self.assertGreaterEqual(time.perf_counter() - start, 0.04)
+        replay.close()
+
+    def test_auto_records_only_new_requests(self):
+        tape = Cassette(self.path, "auto")
+        self.create(self.client(tape))
+        tape.close()
+        tape = Cassette(self.path, "auto")
+        client = self.client(tape)
+        self.create(client)
+        self.create(client, temperature=0.1)
+        self.assertEqual(tape.stats, {"hits": 1, "misses": 1, "recorded": 1})
+        self.assertEqual(len(tape), 2)
+        tape.close()
+
+    def test_scope_separates_identical_requests(self):
+        tape = Cassette(self.path, "record")
+        client = self.client(tape)
+        with cassette.scope("a"):
+            first = self.create(client).id
+        with cassette.scope("b"):
+            second = self.create(client).id
+        tape.close()
+
+        replay = Cassette(self.path, "replay")
+        client = self.client(replay)
+        with cassette.scope("b"):
+            self.assertEqual(self.create(client).id, second)
+        with cassette.scope("a"):
+            self.assertEqual(self.create(client).id, first)
+        replay.close()
+
+    def test_stream(self):
+        tape = Cassette(self.path, "record")
+        text = "".join(c.choices[0].delta.content or "" for c in self.create(self.client(tape), stream=True))
+        tape.close()
+        replay = Cassette(self.path, "replay")
+        replayed = "".join(c.choices[0].delta.content or "" for c in self.create(self.client(replay), stream=True))
+        self.assertEqual(replayed, text)
+        self.assertEqual(text, "Which branch are you calling from?")
+        replay.close()
+
+    def test_async_client(self):
+        async def run(tape):
+            client = tape.install(AsyncGroq(api_key="test", base_url=self.mock.url, max_retries=0))
+            reply = await client.chat.completions.create(model="mock", messages=MESSAGES)
+            stream = await client.chat.completions.create(model="mock", messages=MESSAGES, stream=True)
+            chunks = [c.choices[0].delta.content or "" async for c in stream]
+            await client.close()
+            return reply.id, "".join(chunks)
+
+        tape = Cassette(self.path, "record")
+        recorded = asyncio.run(run(tape))
+        tape.close()
+        replay = Cassette(self.path, "replay")
+        self.assertEqual(asyncio.run(run(replay)), recorded)
+        self.assertEqual(replay.stats["hits"], 2)
+        replay.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
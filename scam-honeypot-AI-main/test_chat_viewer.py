@@ -0,0 +1,125 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.getcwd())
+
+from generate_chat_viewer import detect_encoding, generate_viewer, parse_logs, repair_mojibake
+from transcript_store import TranscriptStore
+
+LOG = """🚀 Starting Auto-Chat Simulation...
+
+============================================================
+STARTING LEVEL 1: LOTTERY SCAM
+============================================================
+
+🔴 SPAMMER: You won! Pay the fee to winner@upi.
+🟢 HONEYPOT: Oh really? How do I pay?
+------------------------------
+🔴 SPAMMER: Pay now.
+
+Use the link below.
+🟢 HONEYPOT: Which link, beta?
+------------------------------
+⚠️ Rate limit hit. Retrying in 2s...
+
+============================================================
+STARTING LEVEL 2: TECH SUPPORT SCAM
+============================================================
+
+🔴 SPAMMER: Your computer has a virus. Café support here.
+🟢 HONEYPOT: Oh no!
+"""
+
+
+def as_powershell_capture(text):
+    """What `python runner.py > log.txt` produces in Windows PowerShell."""
+    return text.replace("\n", "\r\n").encode("utf-8").decode("cp437").encode("utf-16")
+
+
+class TestChatViewer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_repair_mojibake(self):
+        self.assertEqual(repair_mojibake("≡ƒö┤ SPAMMER: hi"), "🔴 SPAMMER: hi")
+        self.assertEqual(repair_mojibake("Café"), "Café")
+        self.assertEqual(repair_mojibake("plain"), "plain")
+
+    def test_detect_encoding(self):
+        self.assertEqual(detect_encoding(self.write("a.txt", LOG.encode("utf-16"))), "utf-16")
+        self.assertEqual(detect_encoding(self.write("b.txt", LOG.encode("utf-16-le"))), "utf-16-le")
+        self.assertEqual(detect_encoding(self.write("c.txt", LOG.encode("utf-8"))), "utf-8")
+
+    def test_parses_utf16_mojibake_and_utf8_alike(self):
+        for data in (as_powershell_capture(LOG), LOG.encode("utf-8")):
+            levels = parse_logs(self.write("log.txt", data))
+            self.assertEqual([l["title"] for l in levels], ["LEVEL 1: LOTTERY SCAM", "LEVEL 2: TECH SUPPORT SCAM"])
+            chats = levels[0]["chats"]
+            self.assertEqual(len(chats), 4)
+            # Multi-line messages keep their continuation lines.
+            self.assertEqual(chats[2]["msg"], "Pay now.\n\nUse the link below.")
+            # The rate-limit notice after the separator is not part of a message.
+            self.assertEqual(chats[3]["msg"], "Which link, beta?")
+            self.assertEqual(levels[1]["chats"][0]["msg"], "Your computer has a virus. Café support here.")
+
+    def test_standalone_log_format(self):
+        log = ("-" * 60 + "\n🎬 SCENARIO: Level 1: Lottery Scam\n" + "-" * 60 +
+               "\n🔴 SPAMMER: Pay\n🟢 HONEYPOINT: How?\n")
+        levels = parse_logs(self.write("s.txt", as_powershell_capture(log)))
+        self.assertEqual(levels[0]["title"], "Level 1: Lottery Scam")
+        self.assertEqual([c["role"] for c in levels[0]["chats"]], ["Spammer", "Honeypot"])
+
+    def test_paginated_viewer(self):
+        path = self.write("log.txt", as_powershell_capture(LOG * 3))
+        index = os.path.join(self.tmp.name, "viewer.html")
+        writer = generate_viewer([path], index, page_size=3)
+
+        # 3 runs of level 1 (4 bubbles -> 2 pages) and 3 of level 2 (1 page).
+        self.assertEqual(writer.runs, 6)
+        self.assertEqual(writer.pages, 9)
+        pages = sorted(os.listdir(os.path.join(self.tmp.name, "viewer")))
+        self.assertEqual(len(pages), 9)
+        with open(index, encoding="utf-8") as f:
+            html = f.read()
+        self.assertIn("LEVEL 1: LOTTERY SCAM", html)
+        self.assertIn("3 run(s), 12 messages", html)
+        self.assertIn('href="viewer/page-00001.html"', html)
+        with open(os.path.join(self.tmp.name, "viewer", pages[0]), encoding="utf-8") as f:
+            first = f.read()
+        self.assertEqual(first.count("chat-bubble spammer") + first.count("chat-bubble honeypot"), 3)
+        self.assertIn('href="page-00002.html"', first)
+        with open(os.path.join(self.tmp.name, "viewer", pages[-1]), encoding="utf-8") as f:
+            self.assertNotIn("Next", f.read())
+
+    def test_viewer_from_transcript_store(self):
+        path = os.path.join(self.tmp.name, "turns.jsonl")
+        store = TranscriptStore(path, flush_interval=0.01)
+        for sid in ("a", "b"):
+            store.append(sid, "scammer", "Pay to win@okaxis", hits={"upiIds": ["win@okaxis"]}, scenario="Level 1")
+            store.append(sid, "honeypot", "Which app?", latency_ms=812.0, scenario="Level 1")
+        store.stop()
+
+        index = os.path.join(self.tmp.name, "viewer.html")
+        writer = generate_viewer([path], index)
+        self.assertEqual(writer.runs, 2)
+        with open(index, encoding="utf-8") as f:
+            self.assertIn("2 run(s), 4 messages", f.read())
+        with open(os.path.join(self.tmp.name, "viewer", "page-00001.html"), encoding="utf-8") as f:
+            page = f.read()
+        self.assertIn("SPAMMER · upiIds: win@okaxis", page)
+        self.assertIn("HONEYPOT · 812 ms", page)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import math
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.getcwd())
+
+from classifier import (
+    BENIGN_REPLIES, REPEAT_REPLIES, ScamClassifier, _scale, detect_scam, fast_path_reply, features, is_repeat,
+    load_classifier,
+)
+from extraction import Intelligence, extract_intelligence
+
+SCAM = [
+    "Your account is blocked, pay the KYC fee now to unblock it",
+    "Urgent: verify your bank account today or it will be suspended",
+    "You won the lottery! Pay the processing fee to claim the prize",
+    "Share the OTP immediately to stop the blocked account",
+]
+BENIGN = [
+    "Hey, are we meeting for lunch tomorrow?",
+    "Happy birthday! Have a great day",
+    "Can you bring the charger when you come home",
+    "The movie starts at seven, see you there",
+]
+
+
+class TestScamClassifier(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        samples = [(t, 1) for t in SCAM] + [(t, 0) for t in BENIGN]
+        cls.model = ScamClassifier.train(samples, epochs=30)
+
+    def test_separates_training_classes(self):
+        for text in SCAM:
+            self.assertTrue(self.model.is_scam(text), text)
+        for text in BENIGN:
+            self.assertFalse(self.model.is_scam(text), text)
+        self.assertGreater(self.model.score("Pay the fee now or your account stays blocked"),
+                           self.model.score("See you at lunch tomorrow"))
+
+    def test_score_matches_feature_model(self):
+        # The cached per-word scorer must agree with the plain feature sum.
+        for text in SCAM + BENIGN + ["", "Rs 499 to win@okaxis http://x.in"]:
+            feats = features(text)
+            z = self.model.bias + _scale(len(feats)) * sum(self.model.weights.get(i, 0.0) for i in feats)
+            self.assertAlmostEqual(self.model.score(text), 1 / (1 + math.exp(-z)), places=9)
+
+    def test_numbers_share_features(self):
+        self.assertEqual(sorted(features("Pay Rs 499 now")), sorted(features("Pay Rs 999 now")))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.json")
+            self.model.save(path)
+            loaded = load_classifier(path)
+            self.assertAlmostEqual(loaded.score(SCAM[0]), self.model.score(SCAM[0]), places=4)
+            self.assertIsNone(load_classifier(os.path.join(tmp, "missing.json")))
+            with open(path, "w") as f:
+                f.write('{"format": "other", "version": 9}')
+            self.assertIsNone(load_classifier(path))
+
+
+class TestFastPath(unittest.TestCase):
+    def setUp(self):
+        self.model = ScamClassifier({}, bias=-5.0)  # everything scores as benign
+
+    def test_repeat_and_benign(self):
+        history = [{"sender": "scammer", "text": "Pay Rs 10 now!!"}, {"sender": "user", "text": "Why?"}]
+        self.assertTrue(is_repeat("pay rs 20 now!", history))
+        reason, reply = fast_path_reply(None, "PAY  Rs 10 now!", "s1", history)
+        self.assertEqual(reason, "repeat")
+        self.assertIn(reply, REPEAT_REPLIES)
+
+        reason, reply = fast_path_reply(self.model, "Hello", "s1")
+        self.assertEqual(reason, "benign")
+        self.assertIn(reply, BENIGN_REPLIES)
+
+    def test_indicators_and_scams_go_to_llm(self):
+        for text in ("Send it to win@okaxis", "Open http://kyc.in", "Call 9876543210"):
+            self.assertIsNone(fast_path_reply(self.model, text, "s1"))
+        self.assertIsNone(fast_path_reply(ScamClassifier({}, bias=5.0), "Hello", "s1"))
+        self.assertIsNone(fast_path_reply(None, "Hello", "s1"))
+
+
+class TestDetectScam(unittest.TestCase):
+    def intel(self, text):
+        intel = Intelligence()
+        extract_intelligence(text, intel)
+        return intel
+
+    def test_hard_indicators_override_the_classifier(self):
+        benign = ScamClassifier({}, bias=-5.0)
+        for text in ("Transfer to account 123456789012 IFSC SBIN0001234", "Pay to win@okaxis",
+                     "Open http://kyc.in"):
+            self.assertTrue(detect_scam(self.intel(text), [text], benign), text)
+        intel = self.intel("Hello")
+        intel.add("knownBadIndicators", "phone:9876543210")
+        self.assertTrue(detect_scam(intel, ["Hello"], benign))
+
+    def test_classifier_decides_keyword_and_phone_only(self):
+        text = "Urgent, call 9876543210 to verify"
+        self.assertFalse(detect_scam(self.intel(text), [text], ScamClassifier({}, bias=-5.0)))
+        self.assertTrue(detect_scam(self.intel(text), ["Hi", text], ScamClassifier({}, bias=5.0)))
+        self.assertTrue(detect_scam(self.intel(text), [text], None))
+        self.assertFalse(detect_scam(self.intel("Hello"), ["Hello"], None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import sys
+import unittest
+
+sys.path.append(os.getcwd())
+
+import batch_extract
+from extraction import Hit, Intelligence, extract_intelligence, scan
+
+
+class TestExtractionEngine(unittest.TestCase):
+    def test_hits_are_typed_deduplicated_and_ordered(self):
+        text = "Pay to scammer@okicici, again scammer@okicici. Urgent!"
+        self.assertEqual(scan(text), [
+            Hit("keyword", "pay", 0, 3),
+            Hit("upi", "scammer@okicici", 7, 22),
+            Hit("keyword", "urgent", 47, 53),
+        ])
+
+    def test_phone_numbers_with_and_without_country_code(self):
+        text = "Call +91-9876543210 or +918765432109 or 7654321098"
+        phones = [h.value for h in scan(text) if h.kind == "phone"]
+        self.assertEqual(phones, ["9876543210", "8765432109", "7654321098"])
+
+    def test_prefixed_phone_numbers_are_not_bank_accounts(self):
+        hits = scan("Call 09876543210 or 919876543211, account 91123456789 or 01234567890")
+        self.assertEqual([(h.kind, h.value) for h in hits if h.kind != "keyword"],
+                         [("phone", "9876543210"), ("phone", "9876543211"),
+                          ("bank_account", "91123456789"), ("bank_account", "01234567890")])
+
+    def test_bank_account_and_ifsc(self):
+        hits = scan("Send to A/C 123456789012 IFSC SBIN0001234 today")
+        self.assertIn(Hit("bank_account", "123456789012", 12, 24), hits)
+        self.assertIn(Hit("ifsc", "SBIN0001234", 30, 41), hits)
+
+    def test_url_trailing_punctuation_is_stripped(self):
+        hits = scan("Download from http://bad-link.com/app.")
+        self.assertEqual(hits, [Hit("url", "http://bad-link.com/app", 14, 37)])
+
+    def test_links_without_a_scheme(self):
+        hits = scan("Open bad-link.com/kyc. Or Evil.co.in, not a@gmail.com or file.pdf. I am done.In a minute")
+        self.assertEqual([(h.kind, h.value) for h in hits], [("url", "bad-link.com/kyc"), ("url", "Evil.co.in")])
+        # Inside a link with a scheme: reported once, as that link.
+        self.assertEqual([h.value for h in scan("http://x.in/a.com")], ["http://x.in/a.com"])
+
+    def test_bare_link_false_positives(self):
+        self.assertEqual([(h.kind, h.value) for h in scan("Send to claim.support@okaxis")],
+                         [("upi", "claim.support@okaxis")])
+        for text in ("Reply at my.work address", "version 1.2.app", "ping 10.0.0.1.com"):
+            self.assertEqual([h for h in scan(text) if h.kind == "url"], [], text)
+        # English-word TLDs count with "www.", a path, or a hyphen or digit in the host.
+        text = "Open www.kyc.support, kyc.online/verify or sbi-kyc24.site"
+        self.assertEqual([h.value for h in scan(text) if h.kind == "url"],
+                         ["www.kyc.support", "kyc.online/verify", "sbi-kyc24.site"])
+
+    def test_digits_inside_words_are_ignored(self):
+        self.assertEqual(scan("order id x9876543210 ref"), [])
+
+    def test_extract_intelligence_is_a_drop_in(self):
+        intel = Intelligence()
+        extract_intelligence("Your account is blocked, make payment to a.b@ybl", intel)
+        extract_intelligence("a.b@ybl is correct, pay now", intel)
+
+        self.assertTrue(intel.scamDetected)
+        self.assertEqual(intel.upiIds, ["a.b@ybl"])
+        self.assertEqual(intel.suspiciousKeywords, ["account", "blocked", "pay"])
+
+    def test_benign_text_is_not_flagged(self):
+        intel = Intelligence()
+        extract_intelligence("Okay thank you, I will wait for your reply.", intel)
+        self.assertFalse(intel.scamDetected)
+
+
+class TestBatchExtract(unittest.TestCase):
+    def test_parses_json_array_and_jsonl(self):
+        array = b'["Pay to a@ybl", {"sessionId": "s2", "message": {"text": "hi"}}]'
+        jsonl = b'{"id": 7, "text": "Pay to a@ybl"}\nplain sms line 9876543210\n\n'
+
+        self.assertEqual(batch_extract.parse_messages(array), [(None, "Pay to a@ybl"), ("s2", "hi")])
+        self.assertEqual(batch_extract.parse_messages(jsonl),
+                         [("7", "Pay to a@ybl"), (None, "plain sms line 9876543210")])
+
+    def test_batch_uses_the_live_detection_rule(self):
+        from classifier import ScamClassifier
+
+        saved = batch_extract._detection
+        try:
+            batch_extract.use_detection(ScamClassifier({}, bias=-5.0), None)  # everything scores benign
+            record = batch_extract.extract_record(0, None, "Transfer to account 123456789012 IFSC SBIN0001234")
+            self.assertTrue(record["scamDetected"])
+            self.assertFalse(batch_extract.extract_record(1, None, "Your account statement is ready")["scamDetected"])
+        finally:
+            batch_extract._detection = saved
+
+    def test_pool_stream_keeps_input_order(self):
+        # The server has threads running by then: no plain fork.
+        self.assertNotEqual(batch_extract._pool_context().get_start_method(), "fork")
+        items = [(str(i), f"call 98765432{i:02d}") for i in range(7)]
+
+        async def collect():
+            return "".join([block async for block in batch_extract.stream_ndjson(items, chunk_size=2)])
+
+        try:
+            records = [json.loads(line) for line in asyncio.run(collect()).splitlines()]
+        finally:
+            batch_extract.shutdown_pool()
+
+        self.assertEqual([r["index"] for r in records], list(range(7)))
+        self.assertEqual(records[3]["id"], "3")
+        self.assertEqual(records[3]["extractedIntelligence"]["phoneNumbers"], ["9876543203"])
+        self.assertEqual(set(records[0]["extractedIntelligence"]),
+                         {"bankAccounts", "upiIds", "phishingLinks", "phoneNumbers", "suspiciousKeywords"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.getcwd())
+
+from indicator_index import IndicatorIndex, normalize, transcript_paths, transcript_sizes
+from transcript_store import TranscriptStore
+
+
+class TestIndicatorIndex(unittest.TestCase):
+    def test_normalize(self):
+        self.assertEqual(normalize("upiIds", " Win@OKAXIS "), "win@okaxis")
+        self.assertEqual(normalize("phoneNumbers", "+91-98765 43210"), "9876543210")
+        self.assertEqual(normalize("bankAccounts", "1234 5678 9012"), "123456789012")
+        self.assertEqual(normalize("ifscCodes", "sbin0001234"), "SBIN0001234")
+        self.assertEqual(normalize("phishingLinks", "HTTPS://Evil.IN/KYC/"), "https://evil.in/KYC")
+        self.assertEqual(normalize("phishingLinks", "evil.in"), "http://evil.in")
+
+    def test_lookup_tracks_sessions_and_times(self):
+        index = IndicatorIndex()
+        index.add("a", {"upiIds": ["win@okaxis"], "phoneNumbers": ["9876543210"]}, ts=100.0)
+        index.add("b", {"upiIds": ["WIN@okaxis"]}, ts=200.0)
+        index.add("a", {"upiIds": ["win@okaxis"]}, ts=300.0)
+
+        [entry] = index.lookup("Win@OkAxis")
+        self.assertEqual(list(entry.sessions), ["a", "b"])
+        self.assertEqual((entry.hits, entry.first_seen, entry.last_seen), (3, 100.0, 300.0))
+        self.assertEqual(entry.to_dict()["sessions"], ["a", "b"])  # most recent first
+        self.assertEqual(index.lookup("+91 98765-43210")[0].field, "phoneNumbers")
+        self.assertEqual(index.lookup("9876543210", "upiIds"), [])
+
+    def test_top_orders_by_session_count(self):
+        index = IndicatorIndex()
+        for i in range(5):
+            index.add(f"s{i}", {"upiIds": ["common@ybl"]})
+        for i in range(3):
+            index.add(f"s{i}", {"phoneNumbers": ["9000000000"]})
+        index.add("s0", {"upiIds": ["once@ybl"]})
+        index.add("s0", {"upiIds": ["once@ybl"]})  # same session: no promotion
+
+        self.assertEqual([e.value for e in index.top(3)], ["common@ybl", "9000000000", "once@ybl"])
+        self.assertEqual([e.value for e in index.top(5, "phoneNumbers")], ["9000000000"])
+        self.assertEqual(index.snapshot_stats(), {"indicators": 3, "maxSessions": 5})
+
+    def test_rebuild_from_transcripts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "log.jsonl")
+            worker = os.path.join(tmp, "log.w1.jsonl")
+            for p, sid in ((path, "a"), (worker, "b")):
+                store = TranscriptStore(p, flush_interval=0.01)
+                store.append(sid, "scammer", "Pay win@okaxis", hits={"upiIds": ["win@okaxis"]})
+                store.append(sid, "honeypot", "Which app?")
+                store.stop()
+            with open(path, "ab") as f:
+                f.write(b'{"sessionId": "torn", "hits": {"upiIds": ["x@y')
+
+            self.assertEqual(transcript_paths(path), [path, worker])
+            index = IndicatorIndex()
+            self.assertEqual(index.rebuild(transcript_paths(path)), 2)
+            self.assertEqual(sorted(index.lookup("win@okaxis")[0].sessions), ["a", "b"])
+
+            # Up to the sizes taken at start-up: turns indexed live meanwhile are not counted twice.
+            sizes = transcript_sizes(path)
+            with open(path, "ab") as f:
+                f.write(b'\n{"sessionId": "c", "hits": {"upiIds": ["win@okaxis"]}}\n')
+            index = IndicatorIndex()
+            self.assertEqual(index.rebuild(list(sizes), sizes), 2)
+            self.assertTrue(index.ready)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.getcwd())
+
+from groq._streaming import AsyncStream
+
+from llm_client import AsyncLLMClient, UsageLedger
+from llm_scheduler import LLMScheduler
+from mock_llm_server import ServerThread, create_app
+
+MESSAGES = [{"role": "user", "content": "Is my account really blocked?"}]
+
+
+class TestAsyncLLMClientStream(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.mock = ServerThread(create_app(latency=0.01, token_delay=0.05,
+                                           reply="Which branch are you calling from sir?")).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.mock.stop()
+
+    def client(self):
+        return AsyncLLMClient(api_key="test", base_url=self.mock.url, max_concurrency=2,
+                              scheduler=LLMScheduler(), ledger=UsageLedger(log=False))
+
+    def test_stopping_early_closes_the_provider_stream(self):
+        client = self.client()
+        closed = []
+        original = AsyncStream.close
+
+        async def close(stream):
+            closed.append(stream)
+            await original(stream)
+
+        async def run():
+            pieces = client.stream(MESSAGES)
+            first = await pieces.__anext__()
+            await pieces.aclose()
+            await client.aclose()
+            return first
+
+        with patch.object(AsyncStream, "close", close):
+            first = asyncio.run(run())
+        self.assertEqual(first, "Which")
+        self.assertEqual(len(closed), 1)
+        self.assertEqual(client.in_flight, 0)
+        self.assertEqual(client._semaphore._value, 2)
+        self.assertEqual(client.ledger.snapshot_stats()["unversioned"]["calls"], 1)
+
+    def test_full_stream(self):
+        client = self.client()
+
+        async def run():
+            try:
+                return "".join([piece async for piece in client.stream(MESSAGES)])
+            finally:
+                await client.aclose()
+
+        self.assertEqual(asyncio.run(run()).strip(), "Which branch are you calling from sir?")
+        self.assertEqual(client._semaphore._value, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+sys.path.append(os.getcwd())
+
+from llm_router import LLMRouter
+
+
+class FakeProvider:
+    """Stand-in provider with injected latency and failures."""
+
+    def __init__(self, name, latency=0.0, fail=False, reply=None):
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+        self.reply = reply or f"reply from {name}"
+        self.in_flight = 0
+        self.calls = 0
+        self.cancelled = 0
+
+    async def chat(self, messages, **kwargs):
+        self.calls += 1
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self.latency)
+            if self.fail:
+                raise RuntimeError(f"{self.name} is down")
+            return self.reply
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    async def stream(self, messages, **kwargs):
+        text = await self.chat(messages)
+        for word in text.split(" "):
+            yield word + " "
+
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+class TestLLMRouter(unittest.TestCase):
+    def run_chat(self, router):
+        start = time.perf_counter()
+        reply = asyncio.run(router.chat(MESSAGES))
+        return reply, time.perf_counter() - start
+
+    def test_fast_primary_is_not_hedged(self):
+        primary, backup = FakeProvider("a", 0.01), FakeProvider("b", 0.01)
+        reply, _ = self.run_chat(LLMRouter([primary, backup], hedge_delay=0.2))
+        self.assertEqual(reply, "reply from a")
+        self.assertEqual(backup.calls, 0)
+
+    def test_slow_primary_is_hedged_and_cancelled(self):
+        primary, backup = FakeProvider("a", 2.0), FakeProvider("b", 0.02)
+        router = LLMRouter([primary, backup], hedge_delay=0.05)
+        reply, elapsed = self.run_chat(router)
+        self.assertEqual(reply, "reply from b")
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(primary.cancelled, 1)
+        stats = router.snapshot_stats()
+        self.assertEqual((stats["hedged"], stats["hedge_wins"]), (1, 1))
+        self.assertEqual(stats["providers"]["a"]["cancelled"], 1)
+
+    def test_failure_fails_over_without_waiting_for_hedge(self):
+        primary, backup = FakeProvider("a", fail=True), FakeProvider("b", 0.01)
+        router = LLMRouter([primary, backup], hedge_delay=5.0)
+        reply, elapsed = self.run_chat(router)
+        self.assertEqual(reply, "reply from b")
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(router.snapshot_stats()["failovers"], 1)
+
+    def test_all_failing_raises_last_error(self):
+        router = LLMRouter([FakeProvider("a", fail=True), FakeProvider("b", fail=True)], hedge_delay=0.01)
+        with self.assertRaises(RuntimeError):
+            asyncio.run(router.chat(MESSAGES))
+
+    def test_hedging_disabled(self):
+        primary, backup = FakeProvider("a", 0.1), FakeProvider("b", 0.0)
+        reply, _ = self.run_chat(LLMRouter([primary, backup], hedge_delay=-1))
+        self.assertEqual(reply, "reply from a")
+        self.assertEqual(backup.calls, 0)
+
+    def test_routes_to_the_faster_provider_over_time(self):
+        primary, backup = FakeProvider("a", 0.3), FakeProvider("b", 0.01)
+        router = LLMRouter([primary, backup], hedge_delay=0.02, alpha=0.5)
+        for _ in range(3):
+            self.run_chat(router)
+        self.assertEqual(router.ranked()[0].name, "b")
+        calls_before = primary.calls
+        reply, _ = self.run_chat(router)
+        self.assertEqual(reply, "reply from b")
+        self.assertEqual(primary.calls, calls_before)
+
+    def test_stream_races_to_first_token(self):
+        primary, backup = FakeProvider("a", 2.0), FakeProvider("b", 0.02, reply="hi there")
+        router = LLMRouter([primary, backup], hedge_delay=0.05)
+
+        async def collect():
+            return [piece async for piece in router.stream(MESSAGES)]
+
+        start = time.perf_counter()
+        pieces = asyncio.run(collect())
+        self.assertEqual("".join(pieces).strip(), "hi there")
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(primary.cancelled, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+from types import SimpleNamespace
+
+sys.path.append(os.getcwd())
+
+from fakes import FakeClock
+from llm_scheduler import (
+    PRIORITY_LIVE, PRIORITY_SIMULATION, LLMScheduler, QueueTimeout, TokenBucket, retry_after_of,
+)
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_refill_and_wait(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock)  # 1 per second
+        bucket.consume(60, clock())
+        self.assertAlmostEqual(bucket.wait_time(1, clock()), 1.0)
+        clock.now = 0.5
+        self.assertAlmostEqual(bucket.wait_time(1, clock()), 0.5)
+        clock.now = 120
+        self.assertEqual(bucket.wait_time(60, clock()), 0.0)
+        self.assertEqual(bucket.level, 60)  # capped at one minute's worth
+
+    def test_oversized_request_is_clamped(self):
+        clock = FakeClock()
+        bucket = TokenBucket(100, clock)
+        self.assertEqual(bucket.wait_time(10_000, clock()), 0.0)
+
+    def test_zero_disables(self):
+        bucket = TokenBucket(0, FakeClock())
+        bucket.consume(10**9, 0)
+        self.assertEqual(bucket.wait_time(10**9, 0), 0.0)
+
+
+class TestScheduler(unittest.TestCase):
+    def test_retry_after_parsing(self):
+        self.assertEqual(retry_after_of(ProviderError(429, {"retry-after": "3"})), 3.0)
+        self.assertEqual(retry_after_of(ProviderError(429, {"retry-after-ms": "250"})), 0.25)
+        date = ProviderError(429, {"retry-after": "Wed, 21 Oct 2015 07:28:10 GMT"})
+        self.assertAlmostEqual(retry_after_of(date, now=1445412480.0), 10.0)
+        self.assertIsNone(retry_after_of(ProviderError(429)))
+
+    def test_live_calls_jump_the_queue(self):
+        scheduler = LLMScheduler(rpm=1200, tpm=0, max_wait=0)  # one admission per 50 ms
+        scheduler.requests.level = 0
+        order = []
+
+        async def run():
+            async def call(name, priority):
+                async def fn():
+                    order.append(name)
+                await scheduler.acall(fn, priority=priority)
+
+            sims = [asyncio.ensure_future(call(f"sim{i}", PRIORITY_SIMULATION)) for i in range(3)]
+            await asyncio.sleep(0)
+            live = [asyncio.ensure_future(call(f"live{i}", PRIORITY_LIVE)) for i in range(2)]
+            await asyncio.gather(*sims, *live)
+
+        asyncio.run(run())
+        self.assertEqual(order, ["live0", "live1", "sim0", "sim1", "sim2"])
+        self.assertEqual(scheduler.stats["admitted"], 5)
+
+    def test_rate_limit_honours_retry_after(self):
+        scheduler = LLMScheduler(rpm=0, tpm=0, max_retries=3, max_wait=0)
+        calls = []
+
+        def fn():
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                raise ProviderError(429, {"retry-after": "0.2"})
+            return "ok"
+
+        self.assertEqual(scheduler.call(fn), "ok")
+        self.assertGreaterEqual(calls[1] - calls[0], 0.19)
+        self.assertEqual(scheduler.stats["rate_limited"], 1)
+        self.assertEqual(scheduler.stats["retried"], 1)
+
+    def test_transient_errors_retry_then_give_up(self):
+        scheduler = LLMScheduler(rpm=0, tpm=0, max_retries=2, max_wait=0, backoff_base=0.01)
+        calls = []
+
+        def fn():
+            calls.append(1)
+            raise ProviderError(503)
+
+        with self.assertRaises(ProviderError):
+            scheduler.call(fn)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(scheduler.stats["failed"], 1)
+
+    def test_client_errors_are_not_retried(self):
+        scheduler = LLMScheduler(rpm=0, tpm=0, max_wait=0)
+        calls = []
+
+        def fn():
+            calls.append(1)
+            raise ProviderError(400)
+
+        with self.assertRaises(ProviderError):
+            scheduler.call(fn)
+        self.assertEqual(len(calls), 1)
+
+    def test_queue_timeout(self):
+        scheduler = LLMScheduler(rpm=60, tpm=0, max_wait=0.05)
+        scheduler.requests.level = 0  # next slot is a second away
+        start = time.monotonic()
+        with self.assertRaises(QueueTimeout):
+            scheduler.call(lambda: "never")
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(scheduler.snapshot_stats()["queue_depth"], 0)
+
+    def test_oldest_wait_counts_live_calls_only(self):
+        clock = FakeClock()
+        scheduler = LLMScheduler(rpm=60, tpm=0, clock=clock)
+        scheduler._enqueue(1, PRIORITY_SIMULATION)
+        clock.now = 2.0
+        live = scheduler._enqueue(1, PRIORITY_LIVE)
+        clock.now = 3.5
+        self.assertAlmostEqual(scheduler.oldest_wait(), 1.5)
+        self.assertAlmostEqual(scheduler.oldest_wait(PRIORITY_SIMULATION), 3.5)
+        scheduler._cancel(live)
+        self.assertEqual(scheduler.oldest_wait(), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.append(os.getcwd())
+
+from metrics import Counter, Gauge, Histogram, Registry
+
+with patch.dict(os.environ, {"GROQ_API_KEY": "fake_key"}):
+    import main
+
+
+class TestMetricTypes(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        h = registry.register(Histogram("t_seconds", "Test.", ("stage",), buckets=(0.1, 1.0)))
+        child = h.labels("llm")
+        for value in (0.05, 0.5, 0.5, 3.0):
+            child.observe(value)
+        text = registry.render()
+        self.assertIn('t_seconds_bucket{stage="llm",le="0.1"} 1', text)
+        self.assertIn('t_seconds_bucket{stage="llm",le="1"} 3', text)
+        self.assertIn('t_seconds_bucket{stage="llm",le="+Inf"} 4', text)
+        self.assertIn('t_seconds_count{stage="llm"} 4', text)
+        self.assertIn('t_seconds_sum{stage="llm"} 4.05', text)
+        self.assertIn("# TYPE t_seconds histogram", text)
+
+    def test_counter_and_gauges(self):
+        registry = Registry()
+        c = registry.register(Counter("t_total", "Test."))
+        g = registry.register(Gauge("t_in_flight", "Test."))
+        f = registry.register(Gauge("t_pending", "Test.", fn=lambda: 7))
+        c.inc()
+        c.inc(2)
+        g.inc()
+        g.inc()
+        g.dec()
+        text = registry.render()
+        self.assertIn("t_total 3", text)
+        self.assertIn("t_in_flight 1", text)
+        self.assertIn("t_pending 7", text)
+        with self.assertRaises(ValueError):
+            registry.register(Counter("t_total", "Duplicate."))
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def setUp(self):
+        main.reply_cache = main.ReplyCache(pool_size=2)
+
+    def scrape(self, client) -> str:
+        r = client.get("/metrics")
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        return r.text
+
+    def sample(self, text: str, name: str) -> float:
+        for line in text.splitlines():
+            if line.startswith(name + " "):
+                return float(line.split()[-1])
+        self.fail(f"{name} not in scrape")
+
+    def test_stages_and_error_counters(self):
+        from fastapi.testclient import TestClient
+
+        main.async_llm = MagicMock(in_flight=0)
+        main.async_llm.chat = AsyncMock(side_effect=RuntimeError("boom"))
+        headers = {"x-api-key": main.API_KEY}
+        body = {"sessionId": "metrics-1", "message": {"text": "Your account is blocked"}}
+
+        with patch.object(main.callback_dispatcher, "submit"), TestClient(main.app) as client:
+            before = self.scrape(client)
+            r = client.post("/honey-pot-entry", json=body, headers=headers)
+            self.assertEqual(r.json()["reply"], main.FALLBACK_REPLY)
+            after = self.scrape(client)
+
+        for name in ("honeypot_llm_errors_total", "honeypot_fallback_replies_total"):
+            self.assertEqual(self.sample(after, name) - self.sample(before, name), 1)
+        for stage in ("parse", "extraction", "llm"):
+            key = f'honeypot_stage_seconds_count{{stage="{stage}"}}'
+            self.assertEqual(self.sample(after, key) - self.sample(before, key), 1)
+        key = 'honeypot_request_seconds_count{endpoint="honey-pot-entry"}'
+        self.assertEqual(self.sample(after, key) - self.sample(before, key), 1)
+        self.assertEqual(self.sample(after, "honeypot_requests_in_flight"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
+import asyncio
+import json
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 import sys
 import os
 
@@ -22,6 +24,16 @@ class TestHoneypot(unittest.TestCase):
         
         main.groq_client = self.mock_client
 
+        self.mock_async_llm = MagicMock()
+        self.mock_async_llm.chat = AsyncMock(return_value="I am a confused victim.")
+        main.async_llm = self.mock_async_llm
+        main.reply_cache = main.ReplyCache(pool_size=2)
+        # These tests exercise the LLM path; the shipped model would answer
+        # "Hello" from the benign fast path. Classifier tests patch their own.
+        classifier_patch = patch.object(main, "classifier", None)
+        classifier_patch.start()
+        self.addCleanup(classifier_patch.stop)
+
     def test_intelligence_extraction(self):
         print("\nTesting Intelligence Extraction...")
         intel = main.Intelligence()
@@ -42,5 +54,206 @@ class TestHoneypot(unittest.TestCase):
         self.assertEqual(reply, "I am a confused victim.")
         print("✅ AI Reply Generation Passed")
 
+    def test_async_ai_reply_generation(self):
+        print("\nTesting Async AI Reply Generation...")
+        reply = asyncio.run(main.generate_ai_reply_async("Hello"))
+
+        self.mock_async_llm.chat.assert_awaited_once()
+        messages = self.mock_async_llm.chat.await_args.args[0]
+        self.assertEqual(messages[-1], {"role": "user", "content": "Hello"})
+        self.assertEqual(reply, "I am a confused victim.")
+        print("✅ Async AI Reply Generation Passed")
+
+    def test_async_ai_reply_fallback(self):
+        print("\nTesting Async AI Reply Fallback...")
+        self.mock_async_llm.chat.side_effect = RuntimeError("boom")
+        reply = asyncio.run(main.generate_ai_reply_async("Hello"))
+
+        self.assertEqual(reply, "I'm having some network trouble, can you repeat that?")
+        print("✅ Async AI Reply Fallback Passed")
+
+    def test_session_intelligence_accumulates_across_turns(self):
+        print("\nTesting Session Intelligence Aggregation...")
+        from fastapi.testclient import TestClient
+
+        headers = {"x-api-key": main.API_KEY}
+        turns = [
+            "Pay to my UPI scammer@okicici immediately.",
+            "Again: scammer@okicici, or call 9876543210",
+            "Are you there?",
+        ]
+        with patch.object(main.callback_dispatcher, "submit") as submit:
+            client = TestClient(main.app)
+            for text in turns:
+                r = client.post("/honey-pot-entry", headers=headers, json={
+                    "sessionId": "test-multi-turn", "message": {"text": text}
+                })
+                self.assertEqual(r.status_code, 200)
+
+        intel = main.session_store.get("test-multi-turn").intel
+        self.assertEqual(intel.upiIds, ["scammer@okicici"])
+        self.assertEqual(intel.phoneNumbers, ["9876543210"])
+        # Third turn found nothing new, so no third callback.
+        self.assertEqual(submit.call_count, 2)
+        self.assertEqual(submit.call_args.args[1]["totalMessagesExchanged"], 3)
+        print("✅ Session Intelligence Aggregation Passed")
+
+    def test_turns_are_written_to_transcript_store(self):
+        print("\nTesting Transcript Store...")
+        import tempfile
+        from fastapi.testclient import TestClient
+        from transcript_store import TranscriptReader, TranscriptStore
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "turns.jsonl")
+            store = TranscriptStore(path, flush_interval=0.01)
+            with patch.object(main, "transcript_store", store), patch.object(main.callback_dispatcher, "submit"):
+                client = TestClient(main.app)
+                for text in ("Pay to scammer@okicici now", "Hurry up"):
+                    r = client.post("/honey-pot-entry", headers={"x-api-key": main.API_KEY},
+                                    json={"sessionId": "test-transcript", "message": {"text": text}})
+                    self.assertEqual(r.status_code, 200)
+                store.stop()
+
+            with TranscriptReader(path) as reader:
+                turns = reader.conversation("test-transcript")
+            self.assertEqual([t["role"] for t in turns], ["scammer", "honeypot", "scammer", "honeypot"])
+            self.assertEqual(turns[0]["hits"], {"upiIds": ["scammer@okicici"]})
+            self.assertEqual(turns[1]["text"], "I am a confused victim.")
+            self.assertIn("latencyMs", turns[1])
+        print("✅ Transcript Store Passed")
+
+    def test_indicator_lookup_across_sessions(self):
+        from fastapi.testclient import TestClient
+        from indicator_index import IndicatorIndex
+
+        headers = {"x-api-key": main.API_KEY}
+        with patch.object(main, "indicator_index", IndicatorIndex()), \
+                patch.object(main.callback_dispatcher, "submit"):
+            client = TestClient(main.app)
+            for sid in ("test-ioc-1", "test-ioc-2"):
+                client.post("/honey-pot-entry", headers=headers,
+                            json={"sessionId": sid, "message": {"text": "Pay to Repeat@OKAXIS now"}})
+
+            r = client.get("/indicators/repeat@okaxis", headers=headers)
+            self.assertEqual(r.status_code, 200)
+            match = r.json()["matches"][0]
+            self.assertEqual(match["type"], "upiIds")
+            self.assertEqual(sorted(match["sessions"]), ["test-ioc-1", "test-ioc-2"])
+
+            top = client.get("/indicators/top", headers=headers, params={"n": 1}).json()["indicators"]
+            self.assertEqual(top[0]["value"], "repeat@okaxis")
+            self.assertEqual(client.get("/indicators/nobody@ybl", headers=headers).status_code, 404)
+            self.assertEqual(client.get("/indicators/top").status_code, 401)
+
+    def test_classifier_drives_detection_and_fast_path(self):
+        from fastapi.testclient import TestClient
+        from classifier import BENIGN_REPLIES, ScamClassifier
+
+        headers = {"x-api-key": main.API_KEY}
+        client = TestClient(main.app)
+        with patch.object(main, "classifier", ScamClassifier({}, bias=-5.0)), \
+                patch.object(main.callback_dispatcher, "submit") as submit:
+            # "account" used to be enough for scamDetected and a callback.
+            r = client.post("/honey-pot-entry", headers=headers,
+                            json={"sessionId": "test-benign", "message": {"text": "Your account statement is ready"}})
+            self.assertIn(r.json()["reply"], BENIGN_REPLIES)
+            self.mock_async_llm.chat.assert_not_awaited()
+            self.assertFalse(main.session_store.get("test-benign").intel.scamDetected)
+            submit.assert_not_called()
+
+            # Payment details are a scam whatever the classifier says.
+            client.post("/honey-pot-entry", headers=headers, json={
+                "sessionId": "test-hard", "message": {"text": "Transfer to account 123456789012 IFSC SBIN0001234"}
+            })
+            self.assertTrue(main.session_store.get("test-hard").intel.scamDetected)
+            submit.assert_called_once()
+
+        with patch.object(main, "classifier", ScamClassifier({}, bias=5.0)), \
+                patch.object(main.callback_dispatcher, "submit") as submit:
+            r = client.post("/honey-pot-entry", headers=headers,
+                            json={"sessionId": "test-scam", "message": {"text": "Your account is blocked"}})
+            self.assertEqual(r.json()["reply"], "I am a confused victim.")
+            self.assertTrue(main.session_store.get("test-scam").intel.scamDetected)
+            submit.assert_called_once()
+
+    def test_blocklisted_indicator_marks_scam(self):
+        import tempfile
+        from fastapi.testclient import TestClient
+        from blocklist import Blocklist, BloomFilter, blocklist_key
+        from classifier import ScamClassifier
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bl.bloom")
+            BloomFilter.write(path, [blocklist_key("domain", "kyc-update.co.in")], 1)
+            with patch.object(main, "blocklist", Blocklist(BloomFilter(path))), \
+                    patch.object(main, "classifier", ScamClassifier({}, bias=-5.0)), \
+                    patch.object(main.callback_dispatcher, "submit") as submit:
+                TestClient(main.app).post("/honey-pot-entry", headers={"x-api-key": main.API_KEY}, json={
+                    "sessionId": "test-blocklist", "message": {"text": "Please open login.kyc-update.co.in/verify"}
+                })
+                main.blocklist.bloom.close()
+
+        intel = main.session_store.get("test-blocklist").intel
+        self.assertEqual(intel.phishingLinks, ["login.kyc-update.co.in/verify"])
+        self.assertEqual(intel.knownBadIndicators, ["domain:kyc-update.co.in"])
+        self.assertTrue(intel.scamDetected)
+        self.assertIn("On known-bad lists: domain:kyc-update.co.in.", submit.call_args.args[1]["agentNotes"])
+
+    def test_oversized_and_malformed_bodies(self):
+        from fastapi.testclient import TestClient
+
+        client = TestClient(main.app)
+        headers = {"x-api-key": main.API_KEY, "content-type": "application/json"}
+        with patch("api_models.MAX_BODY_BYTES", 1024):
+            r = client.post("/honey-pot-entry", headers=headers, content=b'{"message": "' + b"x" * 2048 + b'"}')
+            self.assertEqual(r.status_code, 413)
+        # Malformed JSON still gets a reply, as before.
+        r = client.post("/honey-pot-entry", headers=headers, content=b"{broken")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json(), {"status": "success", "reply": "I am a confused victim."})
+
+    def test_reply_cache_serves_repeated_scripts(self):
+        print("\nTesting Reply Cache...")
+        self.mock_async_llm.chat.side_effect = ["Which lottery?", "Is this real?"]
+        opener = "CONGRATULATIONS! You won $1,000,000!"
+        variant = "congratulations!!  you won $5,000,000!"
+
+        replies = [asyncio.run(main.generate_ai_reply_async(t)) for t in (opener, variant, opener, variant)]
+
+        self.assertEqual(self.mock_async_llm.chat.await_count, 2)
+        self.assertEqual(replies, ["Which lottery?", "Is this real?", "Which lottery?", "Is this real?"])
+        self.assertEqual(main.reply_cache.stats["hits"], 2)
+        print("✅ Reply Cache Passed")
+
+    def test_failed_replies_are_not_cached(self):
+        self.mock_async_llm.chat.side_effect = RuntimeError("boom")
+        asyncio.run(main.generate_ai_reply_async("Hello"))
+        self.assertEqual(main.reply_cache.stats["fills"], 0)
+
+    def test_streaming_entry_emits_tokens_then_intelligence(self):
+        print("\nTesting Streaming Entry...")
+        from fastapi.testclient import TestClient
+
+        async def fake_stream(messages):
+            for piece in ["Which ", "app ", "sir?"]:
+                yield piece
+        self.mock_async_llm.stream = fake_stream
+
+        with patch.object(main.callback_dispatcher, "submit"):
+            r = TestClient(main.app).post("/honey-pot-entry/stream", headers={"x-api-key": main.API_KEY}, json={
+                "sessionId": "test-stream", "message": {"text": "Send OTP to 9876543210"}
+            })
+
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.headers["content-type"].startswith("text/event-stream"))
+        events = [block.split("\n", 1) for block in r.text.strip().split("\n\n")]
+        self.assertEqual([e[0] for e in events], ["event: token"] * 3 + ["event: done"])
+        done = json.loads(events[-1][1][len("data: "):])
+        self.assertEqual(done["reply"], "Which app sir?")
+        self.assertEqual(done["extractedIntelligence"]["phoneNumbers"], ["9876543210"])
+        self.assertIn("ttftMs", done["timing"])
+        print("✅ Streaming Entry Passed")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+sys.path.append(os.getcwd())
+
+import prompts
+from context_manager import estimate_tokens
+from llm_client import UsageLedger
+from prompts import PROMPTS, estimate_prompt_tokens, get_prompt, prompt_id
+
+
+class TestPromptVariants(unittest.TestCase):
+    def test_full_variant_is_the_original_prompt(self):
+        full = get_prompt("full")
+        # The hand-written SYSTEM_PROMPT this module replaced. If the text
+        # changes on purpose, bump VARIANTS["full"]'s version and this pin.
+        self.assertEqual(full.fingerprint, "eb899e377610")
+        self.assertEqual(full.id, "full-v1")
+        self.assertTrue(full.text.startswith("\nYou are an advanced Agentic AI Honeypot"))
+        self.assertIn("B) SAFETY & HARD LIMITS (NON-NEGOTIABLE)", full.text)
+
+    def test_compact_variant_keeps_the_rules_without_decoration(self):
+        compact = get_prompt("compact")
+        self.assertLess(compact.tokens * 2, get_prompt("full").tokens)
+        self.assertTrue(compact.text.isascii())
+        for rule in ("OTPs", "CVV / PIN", "Aadhaar / PAN / SSN", "placeholders", "EXIT HONEYPOT MODE",
+                     "no calling them scammers", "Never include emojis"):
+            self.assertIn(rule, compact.text)
+        # Compiling again gives the same bytes: a stable prefix for provider caching.
+        self.assertEqual(prompts.compile_prompts()["compact"], compact)
+
+    def test_prompt_id_and_unknown_variant(self):
+        for compiled in PROMPTS.values():
+            self.assertEqual(prompt_id([{"role": "system", "content": compiled.text}]), compiled.id)
+        self.assertEqual(prompt_id([{"role": "system", "content": "You are a scammer."}]), "unversioned")
+        self.assertEqual(prompt_id([]), "unversioned")
+        with self.assertRaises(ValueError):
+            get_prompt("tiny")
+
+    def test_default_variant_is_full(self):
+        self.assertEqual(prompts.PROMPT_VARIANT, os.getenv("PROMPT_VARIANT", "full"))
+        self.assertEqual(prompts.SYSTEM_PROMPT, get_prompt().text)
+
+    def test_token_counts(self):
+        # One estimator for budgeting and accounting: context_manager's.
+        self.assertEqual(get_prompt("full").tokens, estimate_tokens(get_prompt("full").text))
+        messages = [{"role": "system", "content": get_prompt("compact").text}, {"role": "user", "content": "hi"}]
+        self.assertEqual(estimate_prompt_tokens(messages), get_prompt("compact").tokens + 1 + 8)
+
+
+class TestUsageLedger(unittest.TestCase):
+    def test_reported_and_estimated_usage(self):
+        ledger = UsageLedger(log=False)
+        messages = [{"role": "system", "content": get_prompt("full").text}, {"role": "user", "content": "hi"}]
+        completion = SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=900, completion_tokens=12),
+            choices=[SimpleNamespace(message=SimpleNamespace(content="Which bank sir?"))],
+        )
+        ledger.record_completion(messages, completion, 0.5)
+        ledger.record(messages, None, None, 0.25, "Which bank sir?")
+        ledger.record([{"role": "user", "content": "hi"}], 5, 3, 0.1)
+
+        stats = ledger.snapshot_stats()
+        full = stats["full-v1"]
+        self.assertEqual((full["calls"], full["estimatedCalls"]), (2, 1))
+        self.assertEqual(full["promptTokens"], 900 + estimate_prompt_tokens(messages))
+        self.assertEqual(full["completionTokens"], 12 + estimate_tokens("Which bank sir?"))
+        self.assertEqual(full["callMsAvg"], 375.0)
+        self.assertEqual(stats["unversioned"]["promptTokens"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.getcwd())
+
+import bench_corpus
+import scam_corpus
+from scam_corpus import INDICATOR_FIELDS, Sample, generate, read_corpus
+
+
+class TestScamCorpus(unittest.TestCase):
+    def test_same_seed_same_corpus(self):
+        self.assertEqual(list(generate(300, seed=3, max_long_kb=8)), list(generate(300, seed=3, max_long_kb=8)))
+        self.assertNotEqual(list(generate(50, seed=3)), list(generate(50, seed=4)))
+
+    def test_planted_indicators_are_in_the_text(self):
+        categories = set()
+        for sample in generate(2000, seed=1, max_long_kb=8):
+            categories.add(sample.category)
+            self.assertTrue(set(sample.expected) <= set(INDICATOR_FIELDS))
+            if sample.category == "hard_formats":
+                continue  # written in a form the extractor misses, on purpose
+            for values in sample.expected.values():
+                for value in values:
+                    self.assertIn(value, sample.text)
+        self.assertTrue({"benign", "hard_formats", "adversarial_long", "lottery", "kyc"} <= categories)
+
+    def test_round_trip_through_a_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "corpus.jsonl")
+            report = scam_corpus.write_corpus(path, 100, seed=2, max_long_kb=8)
+            self.assertEqual(report["messages"], 100)
+            self.assertEqual(list(read_corpus(path)), list(generate(100, seed=2, max_long_kb=8)))
+
+
+class TestBenchCorpus(unittest.TestCase):
+    def test_scoring(self):
+        samples = [
+            Sample(0, "kyc", "Pay to refund@okaxis or call +91-9876543210", {"upiIds": ["refund@okaxis"],
+                   "phoneNumbers": ["9876543210"]}),
+            Sample(1, "benign", "Mail me at priya@gmail.com", {}),
+            Sample(2, "hard_formats", "Call 98765 43210", {"phoneNumbers": ["9876543210"]}),
+        ]
+        result = bench_corpus.run(samples)
+        self.assertEqual(result["messages"], 3)
+        self.assertEqual(result["accuracy"]["upiIds"], {"tp": 1, "fp": 1, "fn": 0, "precision": 0.5,
+                                                        "recall": 1.0, "f1": 0.66667})
+        self.assertEqual(result["accuracy"]["phoneNumbers"]["recall"], 0.5)
+        self.assertEqual(result["byCategory"]["kyc"]["precision"], 1.0)
+        self.assertEqual(result["memory"]["largestMessageChars"], len(samples[0].text))
+
+    def test_gate(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = os.path.join(tmp, "base.json")
+            argv = ["--messages", "200", "--max-long-kb", "8", "--seed", "5"]
+            self.assertEqual(bench_corpus.main(argv + ["-o", baseline]), 0)
+            with open(baseline) as f:
+                base = json.load(f)
+
+            self.assertEqual(bench_corpus.gate(base, base, 0.15, 0.0), [])
+            worse = json.loads(json.dumps(base))
+            worse["messagesPerSecond"] = base["messagesPerSecond"] * 0.5
+            worse["accuracy"]["upiIds"]["recall"] -= 0.01
+            failures = bench_corpus.gate(worse, base, 0.15, 0.0005)
+            self.assertEqual(len(failures), 2)
+            self.assertIn("throughput", failures[0])
+            self.assertIn("upiIds recall", failures[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
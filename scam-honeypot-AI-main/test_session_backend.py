@@ -0,0 +1,159 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.getcwd())
+
+from extraction import Intelligence, extract_intelligence
+from fakes import FakeClock
+from session_backend import SQLiteSessionStore, build_session_store, dump_intel, load_intel
+from session_store import SessionStore
+
+
+class TestSQLiteSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "sessions.db")
+        self.clock = FakeClock(1000.0)
+        self.stores = []
+
+    def tearDown(self):
+        for store in self.stores:
+            store.close()
+        self.tmp.cleanup()
+
+    def open(self, **kwargs):
+        kwargs.setdefault("flush_interval", 0.001)
+        store = SQLiteSessionStore(Intelligence, self.path, clock=self.clock, **kwargs)
+        self.stores.append(store)
+        return store
+
+    def test_intel_roundtrip(self):
+        intel = Intelligence()
+        extract_intelligence("Urgent! Pay to kyc.update@okaxis or call +91-9876543210", intel)
+        intel.callback_sent = True
+        again = load_intel(Intelligence, dump_intel(intel))
+        self.assertEqual(again.extracted(), intel.extracted())
+        self.assertEqual(again.scamDetected, intel.scamDetected)
+        self.assertTrue(again.callback_sent)
+
+    def test_reads_own_writes_before_flush(self):
+        store = self.open(flush_interval=60)
+        state, created = store.get_or_create("a")
+        self.assertTrue(created)
+        state.intel.add("upiIds", "win@okaxis")
+        state.message_count = 2
+        store.save(state)
+
+        again, created = store.get_or_create("a")
+        self.assertFalse(created)
+        self.assertEqual(again.message_count, 2)
+        self.assertEqual(again.intel.upiIds, ["win@okaxis"])
+
+    def test_shared_between_stores(self):
+        # Two stores on one file stand in for two worker processes.
+        first, second = self.open(), self.open()
+        state, _ = first.get_or_create("a")
+        extract_intelligence("Send the OTP to win@okaxis", state.intel)
+        state.message_count = 2
+        first.save(state)
+        self.assertTrue(first.flush())
+
+        state, created = second.get_or_create("a")
+        self.assertFalse(created)
+        self.assertEqual(state.message_count, 2)
+        self.assertEqual(state.intel.upiIds, ["win@okaxis"])
+        self.assertEqual(len(second), 1)
+
+    def test_message_count_never_goes_back(self):
+        first, second = self.open(), self.open()
+        state, _ = first.get_or_create("a")
+        stale, _ = second.get_or_create("a")
+        state.message_count = 4
+        first.save(state)
+        first.flush()
+        stale.message_count = 2
+        second.save(stale)
+        second.flush()
+        self.assertEqual(self.open().get("a").message_count, 4)
+
+    def test_interleaved_saves_merge_intel(self):
+        a, b = self.open(flush_interval=0.05), self.open(flush_interval=0.05)
+        # Two workers load the same session before either one commits.
+        state_a, _ = a.get_or_create("s")
+        state_b, _ = b.get_or_create("s")
+        extract_intelligence("Pay to first@okaxis", state_a.intel)
+        extract_intelligence("Or call 9876543210", state_b.intel)
+        a.save(state_a)
+        b.save(state_b)
+        # Then a second turn on worker a, in the same flush window, from a stale copy.
+        stale = a.get("s")
+        stale.intel = Intelligence()
+        extract_intelligence("Account 123456789012", stale.intel)
+        a.save(stale)
+        self.assertTrue(a.flush() and b.flush())
+
+        intel = self.open().get("s").intel
+        self.assertEqual(intel.upiIds, ["first@okaxis"])
+        self.assertEqual(intel.phoneNumbers, ["9876543210"])
+        self.assertEqual(intel.bankAccounts, ["123456789012"])
+
+    def test_concurrent_saves_are_batched(self):
+        store = self.open(flush_interval=0.02)
+
+        def worker(n):
+            for i in range(50):
+                state, _ = store.get_or_create(f"s{n}-{i}")
+                state.message_count = 2
+                store.save(state)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertTrue(store.flush())
+        self.assertEqual(len(store), 200)
+        self.assertLess(store.stats["batches"], store.stats["saves"])
+
+    def test_prunes_idle_and_excess_sessions(self):
+        store = self.open(ttl=60, max_sessions=2, prune_interval=0)
+        for sid in ("a", "b", "c"):
+            store.get_or_create(sid)
+            self.clock.now += 1
+        store.flush()
+        self.clock.now += 1
+        store.get_or_create("d")  # wakes the writer, which prunes after the batch
+        store.flush()
+        store.close()
+        self.assertEqual(sorted(s.session_id for s in map(self.open().get, "abcd") if s), ["c", "d"])
+
+        self.clock.now += 120
+        store = self.open(ttl=60, prune_interval=0)
+        store.get_or_create("e")
+        store.flush()
+        store.close()
+        self.assertEqual(len(self.open()), 1)
+
+    def test_failed_writes_back_off(self):
+        store = self.open(backoff_base=0.05, backoff_max=0.1)
+        with patch("session_backend.UPSERT_SESSION", "INSERT INTO missing VALUES (?, ?, ?, ?, ?)"):
+            store.get_or_create("a")
+            time.sleep(0.3)
+            # 0.05 + 0.1 + 0.1 ...: a handful of attempts, not a busy loop.
+            self.assertLessEqual(store.stats["writeErrors"], 5)
+        self.assertTrue(store.flush())
+        self.assertEqual(len(store), 1)
+
+    def test_build_session_store(self):
+        self.assertIsInstance(build_session_store(Intelligence, "memory"), SessionStore)
+        with self.assertRaises(ValueError):
+            build_session_store(Intelligence, "redis")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.getcwd())
+
+from fakes import FakeClock
+from session_store import SessionStore
+
+
+class TestSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = SessionStore(dict, max_sessions=2, ttl=60, clock=self.clock)
+
+    def test_hit_and_miss_counters(self):
+        state, created = self.store.get_or_create("a")
+        self.assertTrue(created)
+        again, created = self.store.get_or_create("a")
+        self.assertFalse(created)
+        self.assertIs(state, again)
+        self.assertEqual(self.store.stats["hits"], 1)
+        self.assertEqual(self.store.stats["misses"], 1)
+
+    def test_lru_eviction_drops_least_recently_used(self):
+        self.store.get_or_create("a")
+        self.store.get_or_create("b")
+        self.store.get_or_create("a")  # "b" is now the oldest
+        self.store.get_or_create("c")
+
+        self.assertIsNotNone(self.store.get("a"))
+        self.assertIsNone(self.store.get("b"))
+        self.assertEqual(self.store.stats["evictions_lru"], 1)
+
+    def test_idle_sessions_expire(self):
+        self.store.get_or_create("a")
+        self.clock.now = 30
+        self.store.get_or_create("b")
+        self.clock.now = 75
+
+        self.assertIsNone(self.store.get("a"))
+        self.assertIsNotNone(self.store.get("b"))
+        self.assertEqual(self.store.stats["evictions_ttl"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.getcwd())
+
+from simulation_engine import AgentTarget, SpammerAgent, aggregate, run_simulations
+
+SCENARIOS = {
+    "Level 1: Test Scam": {"system": "scam", "first_message": "You won a prize, reply now!"},
+    "Level 2: Other Scam": {"system": "scam", "first_message": "Your account is blocked."},
+}
+
+
+class ScriptedLLM:
+    """Stand-in LLM: the spammer gives a UPI ID on its second message."""
+
+    def __init__(self, latency=0.01):
+        self.latency = latency
+        self.active = 0
+        self.peak = 0
+
+    async def chat(self, messages, priority=None, seed=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.active -= 1
+        if messages[0]["content"] == "scam":
+            sent = sum(1 for m in messages if m["role"] == "assistant")
+            return "Pay the fee to winner.desk@okaxis now" if sent == 2 else "Hurry up, sir"
+        return "Oh no, what should I do?"
+
+
+class TestSimulationEngine(unittest.TestCase):
+    def run_sims(self, llm, seeds, concurrency, path=None):
+        return asyncio.run(run_simulations(
+            AgentTarget(llm), SpammerAgent(llm), SCENARIOS, seeds,
+            turns=4, concurrency=concurrency, transcripts_path=path,
+        ))
+
+    def test_metrics_and_transcripts(self):
+        llm = ScriptedLLM()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "transcripts.jsonl")
+            results = self.run_sims(llm, [0, 1, 2], concurrency=4, path=path)
+            with open(path, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+
+        self.assertEqual(len(results), 6)
+        self.assertEqual(len(lines), 6)
+        # Written in (scenario, seed) order with timings stripped.
+        self.assertEqual([(l["scenario"], l["seed"]) for l in lines],
+                         [(r["scenario"], r["seed"]) for r in results])
+        self.assertNotIn("latencyMs", lines[0]["turns"][0])
+        self.assertEqual(lines[0]["sessionId"], "sim-level1-s0")
+        first = results[0]
+        self.assertIsNone(first["error"])
+        self.assertEqual(first["metrics"]["turns"], 4)
+        # Opening message, one filler reply, then the UPI ID on turn 3.
+        self.assertEqual(first["metrics"]["turnsToFirstExtraction"], 3)
+        self.assertEqual(first["turns"][2]["newIndicators"], [{"type": "upiIds", "value": "winner.desk@okaxis"}])
+        self.assertEqual(first["extractedIntelligence"]["upiIds"], ["winner.desk@okaxis"])
+
+        summary = aggregate(results)
+        self.assertEqual(summary["extractionRate"], 1.0)
+        self.assertEqual(summary["indicatorsByType"]["upiIds"], 6)
+        self.assertEqual(summary["turns"], 24)
+
+    def test_concurrency_limit(self):
+        llm = ScriptedLLM(latency=0.02)
+        self.run_sims(llm, list(range(10)), concurrency=3)
+        self.assertLessEqual(llm.peak, 3)
+        self.assertGreater(llm.peak, 1)
+
+    def test_spammer_calls_the_llm_once(self):
+        calls = []
+
+        class Unseeded:
+            async def chat(self, messages, priority=None):
+                calls.append(messages)
+                raise TypeError("bad chunk")  # a bug inside chat, not a missing parameter
+
+        self.assertFalse(SpammerAgent(Unseeded()).seeded)
+        self.assertTrue(SpammerAgent(ScriptedLLM()).seeded)
+        with self.assertRaises(TypeError):
+            asyncio.run(SpammerAgent(Unseeded()).next_message("scam", [], seed=1))
+        self.assertEqual(len(calls), 1)
+
+    def test_target_failure_is_recorded(self):
+        class Broken:
+            async def reply(self, *args):
+                raise RuntimeError("down")
+
+            async def aclose(self):
+                pass
+
+        results = asyncio.run(run_simulations(
+            Broken(), SpammerAgent(ScriptedLLM()), SCENARIOS, [0], turns=3, concurrency=2,
+        ))
+        self.assertTrue(all(r["error"].startswith("turn 1") for r in results))
+        self.assertEqual(aggregate(results)["errors"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
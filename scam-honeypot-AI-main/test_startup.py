@@ -0,0 +1,119 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.getcwd())
+
+from startup import Warmup
+
+
+class TestWarmup(unittest.TestCase):
+    def test_steps_run_and_failures_are_recorded(self):
+        async def run():
+            async def ok():
+                return True
+
+            def sync_ok():
+                return None
+
+            async def broken():
+                raise RuntimeError("down")
+
+            warmup = Warmup(timeout=5, enabled=True)
+            self.assertFalse(warmup.ready)
+            warmup.start([("a", ok), ("b", sync_ok), ("c", broken), ("d", lambda: False), ("skipped", None)])
+            self.assertFalse(warmup.ready)
+            await warmup._task
+            return warmup
+
+        warmup = asyncio.run(run())
+        snap = warmup.snapshot()
+        self.assertTrue(snap["ready"])
+        self.assertEqual({k: v["ok"] for k, v in snap["steps"].items()},
+                         {"a": True, "b": True, "c": False, "d": False})
+
+    def test_ready_after_timeout(self):
+        async def run():
+            async def hang():
+                await asyncio.sleep(10)
+
+            warmup = Warmup(timeout=0.05, enabled=True)
+            warmup.start([("hang", hang)])
+            await asyncio.sleep(0.1)
+            self.assertTrue(warmup.ready)
+            await warmup.stop()
+
+        asyncio.run(run())
+
+    def test_disabled_is_ready_at_once(self):
+        async def run():
+            warmup = Warmup(enabled=False)
+            warmup.start([("never", lambda: 1 / 0)])
+            return warmup
+
+        warmup = asyncio.run(run())
+        self.assertTrue(warmup.ready)
+        self.assertEqual(warmup.snapshot()["steps"], {})
+
+
+class TestProbes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with patch.dict(os.environ, {"GROQ_API_KEY": "fake_key"}):
+            import main
+        cls.main = main
+
+    def test_healthz_readyz_and_source_code(self):
+        from fastapi.testclient import TestClient
+
+        main = self.main
+        self.assertEqual(TestClient(main.app).get("/healthz").json(), {"status": "ok"})
+
+        with patch.object(main, "warmup", Warmup(timeout=60, enabled=True)):
+            main.warmup.started_at = 0.0
+            with patch("startup.time.monotonic", return_value=1.0):
+                self.assertEqual(TestClient(main.app).get("/readyz").status_code, 503)
+            main.warmup.finished_at = 1.0
+            r = TestClient(main.app).get("/readyz")
+            self.assertEqual(r.status_code, 200)
+            self.assertTrue(r.json()["ready"])
+
+        r = TestClient(main.app).get("/source_code")
+        with open(main.__file__, "r") as f:
+            self.assertEqual(r.text, f.read())
+        self.assertIs(main.source_code(), main.source_code())
+
+    def test_indicator_index_is_rebuilt_off_the_loop(self):
+        from fastapi.testclient import TestClient
+        from indicator_index import IndicatorIndex
+
+        main = self.main
+        headers = {"x-api-key": main.API_KEY}
+        index = IndicatorIndex()
+        index.ready = False
+        with patch.object(main, "indicator_index", index):
+            r = TestClient(main.app).get("/indicators/top", headers=headers)
+            self.assertEqual(r.status_code, 503)
+            self.assertEqual(r.headers["retry-after"], "5")
+
+            # Runs with warm-up disabled too, and /indicators answers once it is done.
+            with patch.object(main, "warmup", Warmup(enabled=False)), TestClient(main.app) as client:
+                for _ in range(100):
+                    if index.ready:
+                        break
+                    time.sleep(0.01)
+                self.assertEqual(client.get("/indicators/top", headers=headers).status_code, 200)
+
+    def test_sync_client_is_built_lazily(self):
+        main = self.main
+        with patch.object(main, "groq_client", None):
+            client = main.get_groq_client()
+            self.assertIsNotNone(client)
+            self.assertIs(main.get_groq_client(), client)
+
+
+if __name__ == "__main__":
+    unittest.main()
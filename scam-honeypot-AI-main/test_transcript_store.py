@@ -0,0 +1,96 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.getcwd())
+
+from transcript_store import TranscriptReader, TranscriptStore
+
+
+class TestTranscriptStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "turns.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def fill(self, sessions=5, turns=40, **kwargs):
+        store = TranscriptStore(self.path, flush_interval=0.01, **kwargs)
+        for i in range(turns):
+            for s in range(sessions):
+                store.append(f"s{s}", "scammer" if i % 2 == 0 else "honeypot", f"turn {i} ₹500",
+                             hits={"upiIds": ["a@ok"]} if i == 0 else None)
+        store.stop()
+        return store
+
+    def test_append_and_read_back(self):
+        store = self.fill(batch_size=16)
+        self.assertEqual(store.stats["written"], 200)
+        self.assertGreater(store.stats["batches"], 1)
+
+        reader = TranscriptReader(self.path)
+        self.assertEqual(reader.sessions(), [f"s{s}" for s in range(5)])
+        turns = reader.conversation("s3")
+        self.assertEqual([t["text"] for t in turns], [f"turn {i} ₹500" for i in range(40)])
+        self.assertEqual(turns[0]["hits"], {"upiIds": ["a@ok"]})
+        self.assertEqual(turns[0]["sessionId"], "s3")
+        self.assertEqual(reader.conversation("missing"), [])
+        reader.close()
+
+    def test_index_is_rebuilt_when_missing_or_behind(self):
+        self.fill()
+        with open(self.path + ".idx", "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        # Lose the last index line, as if the process died before writing it.
+        with open(self.path + ".idx", "w", encoding="utf-8") as f:
+            f.writelines(lines[:-1])
+        with TranscriptReader(self.path) as reader:
+            self.assertEqual(len(reader.conversation("s4")), 40)
+
+        os.remove(self.path + ".idx")
+        with TranscriptReader(self.path) as reader:
+            self.assertEqual(len(reader.conversation("s4")), 40)
+
+    def test_reopen_appends_and_skips_torn_record(self):
+        self.fill(sessions=1, turns=3)
+        with open(self.path, "ab") as f:
+            f.write(b'{"sessionId": "s0", "role": "scam')  # crash mid-write
+        store = TranscriptStore(self.path, flush_interval=0.01)
+        store.append("s0", "honeypot", "after restart", latency_ms=12.34)
+        store.flush()
+        turns = store.conversation("s0")
+        store.stop()
+        self.assertEqual(len(turns), 4)
+        self.assertEqual(turns[-1]["latencyMs"], 12.3)
+        with TranscriptReader(self.path) as reader:
+            self.assertEqual(len(reader.conversation("s0")), 4)
+
+    def test_records_written_while_stopped_reach_the_sidecar(self):
+        store = TranscriptStore(self.path, flush_interval=0.01)
+        store.append("s0", "scammer", "a")
+        store.stop()
+        with open(self.path, "ab") as f:
+            f.write(b'{"sessionId": "s0", "role": "scammer", "text": "b"}\n')  # data file only
+        store = TranscriptStore(self.path, flush_interval=0.01)
+        store.append("s0", "scammer", "c")
+        store.stop()
+        with TranscriptReader(self.path) as reader:
+            self.assertEqual([t["text"] for t in reader.conversation("s0")], ["a", "b", "c"])
+        self.addCleanup(store.close)  # conversation() maps the data file again
+        self.assertEqual([t["text"] for t in store.conversation("s0")], ["a", "b", "c"])
+        self.assertEqual(store.sessions(), ["s0"])
+        self.assertEqual(store._index, {})  # the writer reads spans from the sidecar
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        store = TranscriptStore(self.path, max_pending=2)
+        store._running = True  # no writer thread: nothing drains the queue
+        for i in range(5):
+            store.append("s0", "scammer", str(i))
+        self.assertEqual(store.stats["appended"], 2)
+        self.assertEqual(store.stats["dropped"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
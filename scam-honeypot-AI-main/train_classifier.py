@@ -0,0 +1,340 @@
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Sequence, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from classifier import CLASSIFIER_MODEL, ScamClassifier, fast_path_reply
+from extraction import Intelligence, extract_intelligence
+from generate_chat_viewer import parse_logs
+from load_test import SCRIPT
+from scenarios import SCENARIOS
+from transcript_store import SIM_TRANSCRIPT_LOG
+
+# =========================================================
+# OFFLINE TRAINING FOR THE FAST-PATH CLASSIFIER
+# =========================================================
+# Builds a labelled set from the scammer turns of the simulation logs and
+# transcripts (positive), everyday messages from benign_messages.txt and
+# any --benign files (negative), plus the seed messages below, reports 5-fold cross-validated precision/recall against
+# the old "any extraction hit" rule and the share of scammer turns the
+# fast path would have answered without Groq, then trains on everything
+# and writes the model.
+#
+#   python train_classifier.py                       # logs + default transcripts
+#   python train_classifier.py --transcripts sim_results/*/turns.jsonl -o classifier_model.json
+#   python train_classifier.py --benign exported_chats.txt   # more real benign text
+#
+# The honeypot's own replies are not used as negatives: they are all one
+# persona, so a model trained on them learns "persona vs scammer" rather
+# than "scam vs what people normally receive".
+
+BENIGN_MESSAGES = "benign_messages.txt"
+
+# Scripted openers and hard cases the simulations do not cover.
+SCAM_SEED = [scenario["first_message"] for scenario in SCENARIOS.values()] + list(SCRIPT) + [
+    "Your electricity connection will be disconnected tonight at 9.30 pm. Contact officer immediately.",
+    "Dear user, you have received a cashback of Rs 5000. Click the link to claim before it expires.",
+    "Your parcel is held at customs. Pay the clearance fee now to release it.",
+    "This is the cyber crime department. A case is registered against your Aadhaar. Cooperate or you will be arrested.",
+    "Congratulations! You are selected for a work from home job. Pay registration fee to start earning daily.",
+    "Your PAN card is deactivated. Update KYC now or your account will be suspended.",
+    "Sir I am calling from your bank, please tell me the OTP you just received to stop the fraud transaction.",
+    "Your credit card reward points expire today. Redeem now by sharing your card number and CVV.",
+    "Invest 10000 today and get 50000 in one week, guaranteed returns, limited slots.",
+    "We noticed unusual activity on your account. Verify your identity immediately to avoid blocking.",
+    "Your SIM card will be blocked in 24 hours. Complete e-KYC by calling customer care.",
+    "You have won a brand new iPhone in our lucky draw. Pay delivery charges to receive it.",
+    "Refund of your income tax is pending. Share your bank details to receive the amount.",
+    "Urgent: your Netflix subscription payment failed. Update payment details or lose access.",
+    "Madam your son has been arrested, send money immediately for bail, don't tell anyone.",
+    "Hi dear, I am stuck at the airport abroad, please send money urgently, I will return it.",
+    "Final notice: pending traffic challan, pay the fine now to avoid legal action.",
+    "Your loan is pre-approved at 0% interest. Pay processing fee to get instant disbursal.",
+    "Scan this QR code to receive the payment for the item you listed.",
+    "Your account is blocked. Download AnyDesk so our executive can fix it remotely.",
+    "Why are you not responding? Pay now or your account will be frozen permanently.",
+    "Sir do fast, time is running out, just send the money and share the screenshot.",
+    "Don't waste time, I told you already, transfer the fee and you will get the prize.",
+    "Open the link and enter your net banking password to complete verification.",
+    "Dear customer your KYC is pending, your account will be blocked today. Update immediately.",
+    "Your bank account has been temporarily suspended due to suspicious activity. Verify now.",
+    "You have been selected for a government subsidy of Rs 25000. Pay the registration fee to receive it.",
+    "Part time job offer: earn 5000 daily by liking videos. Pay a small joining fee to begin.",
+    "Your courier contains illegal items. A police officer will call you, do not disconnect.",
+    "Your mobile number will be deactivated in 2 hours. Press 9 to speak to customer care.",
+    "Congratulations, your number won 25 lakh in the KBC lottery. Pay the tax to claim the prize.",
+    "Sir this is from the electricity board, your bill is unpaid, pay now or power will be cut tonight.",
+    "Your UPI is blocked due to wrong KYC. Share the OTP sent to your phone to reactivate.",
+    "Please share your card details and expiry date to process your refund.",
+    "Madam I am from customs, your gift parcel from abroad is held, pay the duty to release it.",
+    "Final warning: your account will be frozen in one hour. Act now.",
+    "You are under digital arrest. Stay on the video call and do not inform your family.",
+    "Earn guaranteed 3x returns on crypto in 7 days, send the amount to start trading.",
+    "Your insurance policy bonus is ready, pay the processing charge to release the money.",
+    "We are from the bank fraud team. Tell me the code you received so we can block the transaction.",
+    "Your Aadhaar is linked to money laundering. Transfer your savings to a safe account for verification.",
+    "Sir why are you delaying, the offer closes in 10 minutes, make the payment quickly.",
+    "Install the support app from the link I sent and give me the code shown on screen.",
+    "Your refund could not be processed. Enter your UPI PIN to receive the money.",
+    "Hello dear, I sent you a gift but the delivery company needs a clearance fee, please pay it.",
+    "Your gas connection will be disconnected, update your details urgently with the agent.",
+    "You have an outstanding loan. Pay today or our recovery agents will visit your home.",
+    "Friend, I lost my wallet while travelling, please send some money, I will return it tomorrow.",
+]
+BENIGN_SEED = [
+    "Hello",
+    "Hi, how are you?",
+    "Good morning!",
+    "Hey, are we still meeting for lunch tomorrow?",
+    "Can you call me when you are free?",
+    "Happy birthday! Have a great year ahead.",
+    "I reached home safely.",
+    "What time does the movie start?",
+    "Please bring the charger when you come.",
+    "Thanks for your help yesterday.",
+    "Mom asked if you will come for dinner on Sunday.",
+    "The meeting has been moved to 4 pm.",
+    "Did you watch the match last night?",
+    "I'll be 10 minutes late, traffic is bad.",
+    "Can you send me the notes from class?",
+    "Let's plan a trip next month.",
+    "Your order has been delivered. Thank you for shopping with us.",
+    "Your appointment with Dr. Mehta is confirmed for Monday.",
+    "Reminder: your library book is due next week.",
+    "The electricity bill for this month has been generated and is available in the app.",
+    "Your account statement for March is now available in net banking.",
+    "Thank you for paying your bill. No action is needed.",
+    "Never share your OTP or password with anyone, including bank staff.",
+    "Your salary has been credited to your account.",
+    "I paid you back for the tickets, please check.",
+    "Did you get the money I sent for groceries?",
+    "Can you verify if the address on the invite is correct?",
+    "Is the shop open today?",
+    "Ok, see you soon.",
+    "Sure, no problem.",
+    "Who is this?",
+    "Sorry, wrong number.",
+    "Please send the photos from the wedding.",
+    "My phone battery is about to die, will text later.",
+    "The plumber will come at 11.",
+    "Congratulations on your new job!",
+    "We are out of milk, can you pick some up?",
+    "How was your exam?",
+    "Let me know when you are free to talk.",
+    "The school is closed tomorrow due to rain.",
+    "Can you help me fill this form?",
+    "I'm at the station, where are you?",
+    "Send me the recipe please.",
+    "The account for the society maintenance is the same as last year, pay whenever convenient.",
+    "Good night, talk tomorrow.",
+    "Your cab is arriving in 3 minutes.",
+    "Please review the document and share your comments.",
+    "Lunch is ready, come down.",
+    "Your feedback helps us improve. Rate your recent visit.",
+    "Hope you are feeling better now.",
+]
+
+# Lines the simulators print instead of a reply; not training data.
+_NOT_MESSAGES = ("[Error]", "[Spammer AI Error]", "System Error", "I'm having some network trouble")
+
+
+def is_message(text: str) -> bool:
+    return bool(text) and not text.startswith(_NOT_MESSAGES)
+
+# =========================================================
+# DATA
+# =========================================================
+def conversations_from_logs(paths: Sequence[str]) -> List[List[Tuple[str, str]]]:
+    """[(role, text)] per run; role is "scammer" or "honeypot"."""
+    runs = []
+    for path in paths:
+        for level in parse_logs(path):
+            run = []
+            for chat in level["chats"]:
+                if chat["role"] == "Spammer" and run and run[-1][0] == "honeypot" and chat["msg"] == level["chats"][0]["msg"]:
+                    runs.append(run)  # the opener again: a new run of the same level
+                    run = []
+                if is_message(chat["msg"]):
+                    run.append(("scammer" if chat["role"] == "Spammer" else "honeypot", chat["msg"]))
+            if run:
+                runs.append(run)
+    return runs
+
+
+def conversations_from_transcripts(paths: Sequence[str]) -> List[List[Tuple[str, str]]]:
+    sessions: Dict[str, List[Tuple[str, str]]] = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    role, text = record["role"], record["text"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if not is_message(text):
+                    continue
+                sessions.setdefault(f"{path}\t{record.get('sessionId')}", []).append((role, text))
+    return list(sessions.values())
+
+
+def benign_messages(paths: Sequence[str]) -> List[str]:
+    """One message per line; blank lines and "#" comments are skipped."""
+    messages = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            messages += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return messages
+
+
+def labelled(conversations: List[List[Tuple[str, str]]], benign: Sequence[str] = ()) -> List[Tuple[str, int]]:
+    samples = [(text, 1) for text in SCAM_SEED] + [(text, 0) for text in list(BENIGN_SEED) + list(benign)]
+    for run in conversations:
+        samples += [(text, 1) for role, text in run if role == "scammer"]
+    # One copy of each text; a line seen as both keeps the scam label.
+    unique: Dict[str, int] = {}
+    for text, label in samples:
+        unique[text] = max(unique.get(text, 0), label)
+    return sorted(unique.items())
+
+# =========================================================
+# EVALUATION
+# =========================================================
+def confusion(predicted: List[bool], labels: List[int]) -> dict:
+    tp = sum(1 for p, y in zip(predicted, labels) if p and y)
+    fp = sum(1 for p, y in zip(predicted, labels) if p and not y)
+    fn = sum(1 for p, y in zip(predicted, labels) if not p and y)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": round(precision, 3), "recall": round(recall, 3), "f1": round(f1, 3),
+            "tp": tp, "fp": fp, "fn": fn}
+
+
+def extraction_rule(text: str) -> bool:
+    intel = Intelligence()
+    extract_intelligence(text, intel)
+    return intel.scamDetected
+
+
+def cross_validate(samples: List[Tuple[str, int]], folds: int, epochs: int, seed: int) -> List[Tuple[str, int, float]]:
+    """Out-of-fold (text, label, score) for every sample."""
+    shuffled = list(samples)
+    random.Random(seed).shuffle(shuffled)
+    scored = []
+    for k in range(folds):
+        test = shuffled[k::folds]
+        train = [s for i, s in enumerate(shuffled) if i % folds != k]
+        model = ScamClassifier.train(train, epochs=epochs, seed=seed)
+        scored += [(text, label, model.score(text)) for text, label in test]
+    return scored
+
+
+def scripted_conversations(rounds: int = 2) -> List[List[Tuple[str, str]]]:
+    """A scripted bot cycling through its lines, like load_test.py's virtual users."""
+    run = []
+    for _ in range(rounds):
+        for line in SCRIPT:
+            run += [("scammer", line), ("honeypot", "Sorry, which app?")]
+    return [run]
+
+
+def llm_calls_saved(model: ScamClassifier, conversations: List[List[Tuple[str, str]]]) -> dict:
+    """Replays each conversation's scammer turns through the fast path."""
+    turns = benign = repeat = 0
+    for n, run in enumerate(conversations):
+        history = []
+        for role, text in run:
+            if role == "scammer":
+                turns += 1
+                hit = fast_path_reply(model, text, f"eval-{n}", history)
+                if hit:
+                    benign += hit[0] == "benign"
+                    repeat += hit[0] == "repeat"
+            history.append({"sender": "scammer" if role == "scammer" else "user", "text": text})
+    saved = benign + repeat
+    return {"scammerTurns": turns, "benign": benign, "repeat": repeat, "saved": saved,
+            "savedPct": round(100 * saved / turns, 1) if turns else 0.0}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Train the fast-path scam classifier.")
+    parser.add_argument("--logs", nargs="*", default=["simulation_log.txt", "standalone_log.txt"])
+    parser.add_argument("--transcripts", nargs="*",
+                        default=[SIM_TRANSCRIPT_LOG] + sorted(glob.glob("sim_results/*/turns.jsonl")))
+    parser.add_argument("--benign", nargs="*", default=[BENIGN_MESSAGES],
+                        help="text files of real benign messages, one per line")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-benign-threshold", type=float, default=0.2)
+    parser.add_argument("-o", "--output", default=CLASSIFIER_MODEL)
+    parser.add_argument("--report", default="classifier_report.json")
+    args = parser.parse_args(argv)
+
+    logs = [p for p in args.logs if os.path.exists(p)]
+    transcripts = [p for p in args.transcripts if p and os.path.exists(p)]
+    conversations = conversations_from_logs(logs) + conversations_from_transcripts(transcripts)
+    benign = benign_messages([p for p in args.benign if os.path.exists(p)])
+    samples = labelled(conversations, benign)
+    positives = sum(label for _, label in samples)
+    print(f"📚 {len(samples)} messages ({positives} scam, {len(samples) - positives} benign) "
+          f"from {len(logs)} log(s), {len(transcripts)} transcript file(s), {len(benign)} benign "
+          f"message(s) and the seed set")
+
+    scored = cross_validate(samples, args.folds, args.epochs, args.seed)
+    labels = [label for _, label, _ in scored]
+    model_cv = confusion([score >= 0.5 for _, _, score in scored], labels)
+    rule_cv = confusion([extraction_rule(text) for text, _, _ in scored], labels)
+    # "Clearly benign": below every out-of-fold scam score, with a margin.
+    lowest_scam = min((score for _, label, score in scored if label), default=1.0)
+    benign_threshold = round(min(args.max_benign_threshold, lowest_scam * 0.5), 4)
+    benign_cv = confusion([score < benign_threshold for _, _, score in scored], [1 - y for y in labels])
+
+    model = ScamClassifier.train(samples, epochs=args.epochs, seed=args.seed)
+    model.benign_threshold = benign_threshold
+    model.save(args.output)
+
+    for text, _ in samples:
+        model.score(text)  # warm the per-word caches, as a running worker has
+    start = time.perf_counter()
+    for text, _ in samples:
+        model.score(text)
+    score_us = (time.perf_counter() - start) / len(samples) * 1e6
+
+    report = {
+        "samples": len(samples),
+        "scam": positives,
+        "benign": len(samples) - positives,
+        "crossValidation": {"folds": args.folds, "classifier": model_cv, "extractionRule": rule_cv,
+                            "benignFastPath": benign_cv},
+        "thresholds": {"scam": model.scam_threshold, "benign": benign_threshold},
+        "llmCallsSaved": {
+            "simulations": llm_calls_saved(model, conversations),
+            "scriptedBot": llm_calls_saved(model, scripted_conversations()),
+            "benignMessages": llm_calls_saved(model, [[("scammer", text)] for text in list(BENIGN_SEED) + benign]),
+        },
+        "scoreMicroseconds": round(score_us, 1),
+        "features": len(model.weights),
+        "modelBytes": os.path.getsize(args.output),
+    }
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"🎯 classifier  P {model_cv['precision']:.3f}  R {model_cv['recall']:.3f}  F1 {model_cv['f1']:.3f}")
+    print(f"   extraction  P {rule_cv['precision']:.3f}  R {rule_cv['recall']:.3f}  F1 {rule_cv['f1']:.3f}")
+    print(f"   benign fast path (< {benign_threshold}): P {benign_cv['precision']:.3f}  R {benign_cv['recall']:.3f}")
+    for name, saved in report["llmCallsSaved"].items():
+        print(f"💸 LLM calls saved ({name}): {saved['saved']}/{saved['scammerTurns']} turns ({saved['savedPct']}%)")
+    print(f"⚡ {score_us:.1f} us per message, {len(model.weights)} features, {report['modelBytes']} bytes")
+    print(f"📄 Model written to {args.output}, report to {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
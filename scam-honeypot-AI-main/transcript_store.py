@@ -0,0 +1,362 @@
+import json
+import mmap
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# =========================================================
+# CONFIG
+# =========================================================
+# Where the API appends every turn; empty disables the store.
+TRANSCRIPT_LOG = os.getenv("TRANSCRIPT_LOG", "transcript_log.jsonl")
+# Where standalone_simulation.py and auto_chat_runner.py append theirs.
+SIM_TRANSCRIPT_LOG = os.getenv("SIM_TRANSCRIPT_LOG", "simulation_transcripts.jsonl")
+TRANSCRIPT_FLUSH_INTERVAL = float(os.getenv("TRANSCRIPT_FLUSH_INTERVAL", "0.5"))
+TRANSCRIPT_BATCH_SIZE = int(os.getenv("TRANSCRIPT_BATCH_SIZE", "512"))
+# Turns waiting for the writer. Past this, new turns are dropped rather
+# than blocking the request path.
+TRANSCRIPT_MAX_PENDING = int(os.getenv("TRANSCRIPT_MAX_PENDING", "100000"))
+
+INDICATOR_FIELDS = ("upiIds", "bankAccounts", "ifscCodes", "phoneNumbers", "phishingLinks")
+
+
+def indicator_hits(intel) -> Dict[str, List[str]]:
+    """The non-empty indicator lists of an Intelligence, for a turn record."""
+    return {f: list(getattr(intel, f)) for f in INDICATOR_FIELDS if getattr(intel, f)}
+
+
+def _key(session_id) -> str:
+    # The index is tab/newline separated, and an empty id marks a batch end.
+    return str(session_id).replace("\t", " ").replace("\n", " ") or "-"
+
+# =========================================================
+# READER
+# =========================================================
+class TranscriptReader:
+    """
+    Read side of a transcript store.
+
+    `<path>` holds one JSON record per turn. `<path>.idx` is an append-only
+    sidecar with one line per session per flushed batch, then a line
+    marking where the batch ends in the data file:
+
+        <sessionId>\\t<offset>:<length>,<offset>:<length>,...
+        \\t<end offset>
+
+    Loading it gives every session's record offsets, so a conversation is
+    a dict lookup plus slices of a memory map, whatever the log size.
+    Records past the last complete batch (a crash between the data write
+    and the index write, or a missing sidecar) are indexed by scanning.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path + ".idx"
+        self._lock = threading.RLock()
+        self._index: Dict[str, List[Tuple[int, int]]] = {}
+        self._indexed_to = 0
+        self._fh = None
+        self._mm = None
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.path):
+            return
+        size = os.path.getsize(self.path)
+        for end, batch in self._sidecar_batches(size):
+            self._merge(batch)
+            self._indexed_to = end
+        self._merge(self._catch_up(size))
+
+    def _sidecar_batches(self, size: int, only: Optional[set] = None
+                         ) -> Iterator[Tuple[int, Dict[str, List[Tuple[int, int]]]]]:
+        """
+        (end offset, {sessionId: spans}) per complete batch of the sidecar
+        that lies within the first `size` bytes of the data file. With
+        `only`, spans of other sessions are skipped without parsing.
+        """
+        if not os.path.exists(self.index_path):
+            return
+        batch: Dict[str, List[Tuple[int, int]]] = {}
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # torn last line; _catch_up covers it
+                sid, _, spans = line.rstrip("\n").partition("\t")
+                if sid:
+                    if only is None or sid in only:
+                        entries = batch.setdefault(sid, [])
+                        for span in spans.split(","):
+                            offset, _, length = span.partition(":")
+                            entries.append((int(offset), int(length)))
+                    continue
+                end = int(spans)
+                if end > size:
+                    break
+                yield end, batch
+                batch = {}
+
+    def _merge(self, found: Dict[str, List[Tuple[int, int]]]):
+        for sid, spans in found.items():
+            self._index.setdefault(sid, []).extend(spans)
+
+    def _catch_up(self, size: int) -> Dict[str, List[Tuple[int, int]]]:
+        """Spans of complete records between the end of the index and `size`."""
+        found: Dict[str, List[Tuple[int, int]]] = {}
+        if self._indexed_to >= size:
+            return found
+        with open(self.path, "rb") as f:
+            f.seek(self._indexed_to)
+            offset = self._indexed_to
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    sid = _key(json.loads(line)["sessionId"])
+                except (ValueError, KeyError, TypeError):
+                    sid = None
+                if sid is not None:
+                    found.setdefault(sid, []).append((offset, len(line) - 1))
+                offset += len(line)
+            self._indexed_to = offset
+        return found
+
+    def refresh(self):
+        """Picks up records appended by another process since loading."""
+        with self._lock:
+            if os.path.exists(self.path):
+                self._merge(self._catch_up(os.path.getsize(self.path)))
+
+    def _map(self, end: int):
+        if self._mm is not None and len(self._mm) >= end:
+            return self._mm
+        if self._mm is not None:
+            self._mm.close()
+        if self._fh is None:
+            self._fh = open(self.path, "rb")
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mm
+
+    def sessions(self) -> List[str]:
+        """Session ids in order of first appearance."""
+        with self._lock:
+            return list(self._index)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index)
+
+    def _spans(self, key: str) -> List[Tuple[int, int]]:
+        return list(self._index.get(key, ()))
+
+    def conversation(self, session_id) -> List[dict]:
+        """Every turn recorded for a session, oldest first."""
+        with self._lock:
+            spans = self._spans(_key(session_id))
+            if not spans:
+                return []
+            mm = self._map(max(o + n for o, n in spans))
+            return [json.loads(mm[o:o + n]) for o, n in spans]
+
+    def iter_conversations(self) -> Iterator[Tuple[str, List[dict]]]:
+        for sid in self.sessions():
+            yield sid, self.conversation(sid)
+
+    def __enter__(self) -> "TranscriptReader":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self._mm is not None:
+                self._mm.close()
+                self._mm = None
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+# =========================================================
+# STORE (WRITER)
+# =========================================================
+class TranscriptStore(TranscriptReader):
+    """
+    Append-only turn log. append() only enqueues; a background thread
+    writes batches of up to `batch_size` records every `flush_interval`
+    seconds (or sooner when a batch fills), then appends their offsets to
+    the sidecar index. One writer process per file.
+
+    The writer keeps no spans in memory, however long it runs: only the
+    offset the sidecar covers. Reads through the store (conversation(),
+    sessions()) scan the sidecar; use a TranscriptReader for many lookups.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = TRANSCRIPT_FLUSH_INTERVAL,
+        batch_size: int = TRANSCRIPT_BATCH_SIZE,
+        max_pending: int = TRANSCRIPT_MAX_PENDING,
+    ):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        super().__init__(path)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._running = False
+        self._data = None
+        self._idx = None
+        self.stats = {"appended": 0, "written": 0, "dropped": 0, "batches": 0}
+
+    # -----------------------------------------------------
+    # Lifecycle
+    # -----------------------------------------------------
+    def start(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._data = open(self.path, "ab")
+            if self._data.tell() > self._indexed_to:
+                # A torn last record from a crash: terminate it so it is skipped.
+                self._data.write(b"\n")
+                self._data.flush()
+            self._idx = open(self.index_path, "a", encoding="utf-8")
+            # Index whatever a previous run (or anyone else) wrote past the
+            # sidecar, before the first new batch lands after it.
+            self._write_index(self._catch_up(self._data.tell()))
+            self._thread = threading.Thread(target=self._writer, name="transcript-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Writes everything queued so far, then closes the files."""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+        with self._lock:
+            self._data.close()
+            self._idx.close()
+            self._data = self._idx = None
+        self.close()
+
+    def append(self, session_id, role: str, text: str, hits: Optional[dict] = None,
+               latency_ms: Optional[float] = None, **fields):
+        """Queues one turn. Never blocks on I/O."""
+        if not self._running:
+            self.start()
+        record = {"ts": round(time.time(), 3), "sessionId": str(session_id), "role": role, "text": text}
+        if hits:
+            record["hits"] = hits
+        if latency_ms is not None:
+            record["latencyMs"] = round(latency_ms, 1)
+        record.update(fields)
+        try:
+            self._queue.put_nowait(record)
+            self.stats["appended"] += 1
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Waits until every queued turn is on disk and indexed."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._queue.unfinished_tasks == 0:
+                return True
+            time.sleep(0.01)
+        return False
+
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    # -----------------------------------------------------
+    # Writer
+    # -----------------------------------------------------
+    def _writer(self):
+        stopping = False
+        while not stopping:
+            try:
+                items = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            # Gather the rest of the batch; a shutdown (None) drains the queue.
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                stopping = stopping or items[-1] is None
+                if not stopping and len(items) >= self.batch_size:
+                    break
+                try:
+                    if stopping:
+                        items.append(self._queue.get_nowait())
+                    else:
+                        items.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch([r for r in items if r is not None])
+            except Exception as e:
+                print(f"⚠️ Transcript write failed: {e}")
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: List[dict]):
+        if not batch:
+            return
+        lines = [json.dumps(r, ensure_ascii=False).encode("utf-8") for r in batch]
+        with self._lock:
+            offset = self._data.tell()
+            found: Dict[str, List[Tuple[int, int]]] = {}
+            for record, line in zip(batch, lines):
+                found.setdefault(_key(record["sessionId"]), []).append((offset, len(line)))
+                offset += len(line) + 1
+            self._data.write(b"\n".join(lines) + b"\n")
+            self._data.flush()
+            self._indexed_to = offset
+            self._write_index(found)
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+
+    def _write_index(self, found: Dict[str, List[Tuple[int, int]]]):
+        if not found:
+            return
+        self._idx.write("".join(
+            f"{sid}\t{','.join(f'{o}:{n}' for o, n in spans)}\n" for sid, spans in found.items()
+        ) + f"\t{self._indexed_to}\n")
+        self._idx.flush()
+
+    # -----------------------------------------------------
+    # Reads (from the sidecar)
+    # -----------------------------------------------------
+    def _load_index(self):
+        # Only find where the sidecar ends; start() indexes anything past it.
+        if os.path.exists(self.path):
+            for end, _ in self._sidecar_batches(os.path.getsize(self.path), only=set()):
+                self._indexed_to = end
+
+    def _merge(self, found: Dict[str, List[Tuple[int, int]]]):
+        pass
+
+    def _spans(self, key: str) -> List[Tuple[int, int]]:
+        return [span for _, batch in self._sidecar_batches(self._indexed_to, only={key})
+                for span in batch.get(key, ())]
+
+    def sessions(self) -> List[str]:
+        with self._lock:
+            seen: Dict[str, None] = {}
+            for _, batch in self._sidecar_batches(self._indexed_to):
+                seen.update(dict.fromkeys(batch))
+            return list(seen)
+
+    def __len__(self) -> int:
+        return len(self.sessions())
+
+    def snapshot_stats(self) -> dict:
+        return dict(self.stats, pending=self.pending(), indexedBytes=self._indexed_to)